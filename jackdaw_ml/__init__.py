@@ -3,5 +3,5 @@ from logging import NullHandler
 
 logging.getLogger(__name__).addHandler(NullHandler())
 
-from jackdaw_ml.loads import loads
-from jackdaw_ml.saves import saves
+from jackdaw_ml.loads import aloads, loads
+from jackdaw_ml.saves import asaves, saves, saves_background
@@ -5,8 +5,9 @@ __all__ = ["AccessInterface", "DefaultAccessInterface", "DictAccessInterface"]
 import inspect
 import logging
 from abc import ABC
-from typing import (TYPE_CHECKING, Any, Dict, Generic, Iterable, List,
-                    Optional, Tuple, Type, TypeVar, Union)
+from types import FunctionType
+from typing import (TYPE_CHECKING, Any, Dict, Generic, Hashable, Iterable,
+                    List, Optional, Set, Tuple, Type, TypeVar, Union)
 
 C = TypeVar("C")
 T = TypeVar("T")
@@ -55,21 +56,37 @@ class AccessInterface(ABC, Generic[C, T]):
     def _from_dict(d: Dict[str, T]) -> C:
         raise NotImplementedError
 
+    @classmethod
+    def _stamp(cls, container: C) -> Hashable:
+        """
+        Cheap stand-in for the structure of the container - the key and type of every item - which changes when items
+        are added, removed, or replaced by an item of another type.
+        """
+        return tuple(
+            (name, *_item_stamp(item)) for (name, item) in cls._items(container).items()
+        )
+
+    @classmethod
+    def _named_items(cls, container: C) -> Iterable[Tuple[str, T]]:
+        """Each key in the container alongside its item, reading each item once"""
+        return ((key, cls.get_artefact(container, key)) for key in cls._keys(container))
+
     @classmethod
     def list_artefacts(
         cls,
         model: "SupportsArtefacts",
         artefact_detectors: "List[ArtefactDetector]",
     ) -> Iterable[Tuple[str, Any, "Serializable"]]:
-        possible_artefact_names = cls._keys(model)
+        from jackdaw_ml.detectors.dispatch import artefact_dispatch
+
+        # Detectors are resolved once per type of attribute, rather than run against every attribute
+        dispatch = artefact_dispatch(artefact_detectors)
         artefact_slots = getattr(model, "__artefact_slots__", dict())
-        for artefact_name in set(possible_artefact_names) - set(artefact_slots.keys()):
-            for detector in artefact_detectors:
-                if detector.is_artefact(cls.get_artefact(model, artefact_name)):
-                    yield artefact_name, cls.get_artefact(
-                        model, artefact_name
-                    ), detector.serializer
-                    break
+        for (artefact_name, artefact) in cls._named_items(model):
+            if artefact_name in artefact_slots:
+                continue
+            if (serializer := dispatch.serializer(artefact)) is not None:
+                yield artefact_name, artefact, serializer
         for artefact_name, serializer in artefact_slots.items():
             yield artefact_name, cls.get_artefact(model, artefact_name), serializer
 
@@ -80,25 +97,19 @@ class AccessInterface(ABC, Generic[C, T]):
         child_detectors: "List[ChildDetector]",
         artefact_detectors: "List[ArtefactDetector]",
     ) -> Iterable[Tuple[str, Type[AccessInterface]]]:
-        identified_children = []
-        for child_name in [a for a in cls._keys(model)]:
+        from jackdaw_ml.detectors.dispatch import child_dispatch
+
+        detectors: List[Union[ChildDetector, ArtefactDetector]] = [
+            *child_detectors,
+            *artefact_detectors,
+        ]
+        dispatch = child_dispatch(detectors)
+        for (child_name, child) in list(cls._named_items(model)):
             if child_name is None or child_name == "__dict__":
                 # This is self-referential - implying that the artefacts/children on the class are a child class.
                 continue
-            detectors: List[Union[ChildDetector, ArtefactDetector]] = [
-                *child_detectors,
-                *artefact_detectors,
-            ]
-            for detector in detectors:
-                if (
-                    child_interface := detector.get_child_interface(
-                        cls.get_artefact(model, child_name)
-                    )
-                ) is not None:
-                    identified_children.append(child_name)
-                    yield child_name, child_interface
-                    # Break detection loop - move to next child_name
-                    break
+            if (child_interface := dispatch.child_interface(child)) is not None:
+                yield child_name, child_interface
 
     @classmethod
     def get_child(cls, model, child_name: str) -> "SupportsArtefacts":
@@ -123,16 +134,141 @@ class AccessInterface(ABC, Generic[C, T]):
             return False
 
 
+def _item_stamp(item: Any) -> Tuple[type, Optional[int]]:
+    # Plain containers may hold Child Models, so their length is part of the structure too
+    return type(item), len(item) if isinstance(item, (list, tuple, dict, set)) else None
+
+
+class _ClassMembers:
+    """
+    Public members of a class, split into methods - which are never artefacts, so are skipped without being read - and
+    every other member, which is read from each instance.
+    """
+
+    __slots__ = ("stamp", "methods", "attributes", "registries", "hidden", "custom_dir")
+
+    def __init__(
+        self, cls: type, registries: Tuple[str, ...], hidden: Optional[str] = None
+    ):
+        self.stamp = _class_stamp(cls)
+        self.methods: Set[str] = set()
+        self.attributes: List[str] = []
+        for name in dir(cls):
+            if name.startswith("_"):
+                continue
+            member = inspect.getattr_static(cls, name, None)
+            if isinstance(member, (FunctionType, classmethod)) or (
+                isinstance(member, staticmethod) and inspect.isfunction(member.__func__)
+            ):
+                self.methods.add(name)
+            else:
+                self.attributes.append(name)
+        # Registries of attributes that a framework keeps outside of `__dict__`, and lists through `__dir__`
+        self.registries = registries
+        self.hidden = hidden
+        self.custom_dir = not registries and cls.__dir__ is not object.__dir__
+
+
+def _class_stamp(cls: type) -> Tuple[int, ...]:
+    # Members are added to classes at runtime, i.e. by `@artefacts`
+    return tuple(len(vars(base)) for base in cls.__mro__)
+
+
 class DefaultAccessInterface(AccessInterface[Dict[str, T], T]):
+    _attribute_registries: Dict[type, Tuple[Tuple[str, ...], Optional[str]]] = dict()
+    _class_members: Dict[type, _ClassMembers] = dict()
+
+    @classmethod
+    def add_attribute_registry(
+        cls, base: type, registries: Tuple[str, ...], hidden: Optional[str] = None
+    ) -> None:
+        """
+        Register the dictionaries that instances of `base` keep attributes in, in place of `__dir__`.
+
+        i.e. `nn.Module` keeps Parameters, Buffers and Modules in `_parameters`, `_buffers` and `_modules`, which its
+        `__dir__` adds to the attributes in `__dict__`. `hidden` names the collection of attributes in those
+        dictionaries that aren't part of an instance's state, i.e. `nn.Module`'s `_non_persistent_buffers_set`.
+        """
+        cls._attribute_registries[base] = (registries, hidden)
+        cls._class_members.clear()
+
+    @classmethod
+    def _members(cls, model_class: type) -> _ClassMembers:
+        members = cls._class_members.get(model_class)
+        if members is None or members.stamp != _class_stamp(model_class):
+            (registries, hidden) = next(
+                (
+                    registries
+                    for (base, registries) in cls._attribute_registries.items()
+                    if issubclass(model_class, base)
+                    and model_class.__dir__ is base.__dir__
+                ),
+                ((), None),
+            )
+            members = cls._class_members[model_class] = _ClassMembers(
+                model_class, registries, hidden
+            )
+        return members
+
+    @classmethod
+    def _names(cls, container: Any) -> List[str]:
+        if isinstance(container, type) or not hasattr(container, "__dict__"):
+            return [name for name in dir(container) if not name.startswith("_")]
+        members = cls._members(type(container))
+        instance_names = [name for name in vars(container) if not name.startswith("_")]
+        if members.custom_dir:
+            names = {name for name in dir(container) if not name.startswith("_")}
+        else:
+            names = {*members.attributes, *members.methods, *instance_names}
+            for registry in members.registries:
+                names.update(
+                    name
+                    for name in vars(container).get(registry, ())
+                    if not name.startswith("_") and not name[0].isdigit()
+                )
+            if members.hidden is not None:
+                names.difference_update(vars(container).get(members.hidden, ()))
+        # Methods are only read when an instance attribute hides them
+        return sorted(names - (members.methods - set(instance_names)))
+
+    @classmethod
+    def _stamp(cls, container: Any) -> Hashable:
+        # Instance attributes are only ever set in `__dict__` or the registries, so their entries stand in for reading
+        #   every name from `_names` - properties and other class members aren't read. Private keys are skipped, as
+        #   Jackdaw keeps its own state on the instance.
+        if isinstance(container, type) or not hasattr(container, "__dict__"):
+            return tuple((name, *_item_stamp(item)) for (name, item) in cls._named_items(container))
+        members = cls._members(type(container))
+        if members.custom_dir:
+            return tuple((name, *_item_stamp(item)) for (name, item) in cls._named_items(container))
+        attributes = vars(container)
+        return (
+            members.stamp,
+            tuple(
+                (name, *_item_stamp(item))
+                for (name, item) in attributes.items()
+                if not name.startswith("_")
+            ),
+            *(
+                tuple(
+                    (name, *_item_stamp(item))
+                    for (name, item) in attributes.get(registry, {}).items()
+                )
+                for registry in members.registries
+            ),
+            frozenset(attributes.get(members.hidden, ())) if members.hidden else None,
+        )
+
+    @classmethod
+    def _named_items(cls, container: Dict[str, T]) -> Iterable[Tuple[str, T]]:
+        for name in cls._names(container):
+            item = cls._get_item(container, name)
+            if not inspect.ismethod(item) and not inspect.isfunction(item):
+                yield name, item
+
     @classmethod
     def _keys(cls, container: Dict[str, T]) -> List[str]:
-        return [
-            name
-            for name in dir(container)
-            if not name.startswith("_")
-            and not inspect.ismethod(cls._get_item(container, name))
-            and not inspect.isfunction(cls._get_item(container, name))
-        ]
+        return [name for (name, _) in cls._named_items(container)]
 
     @staticmethod
     def _get_item(container: Dict[str, T], key: str) -> Optional[T]:
@@ -38,6 +38,23 @@ class SupportsArtefacts(Protocol):
     __artefact_detectors__: List[ArtefactDetector]
 
 
+def _model_access_interface(model_class: SupportsArtefacts) -> Type[AccessInterface]:
+    """
+    AccessInterface for the top level of a model. The model's own Child Detectors may give it an AccessInterface that
+    extends `DefaultAccessInterface`, i.e. so that a model that is itself a Torch Module is saved as a single artefact.
+    """
+    from jackdaw_ml.detectors.dispatch import child_dispatch
+
+    access_interface = child_dispatch(model_class.__child_detectors__).child_interface(
+        model_class
+    )
+    if access_interface is not None and issubclass(
+        access_interface, DefaultAccessInterface
+    ):
+        return access_interface
+    return DefaultAccessInterface
+
+
 def _detect_artefact_annotations(
     model_class: SupportsArtefacts,
     child_slots: Set[str],
@@ -59,9 +76,9 @@ def _detect_artefacts(
     artefact_detectors: List[ArtefactDetector],
 ) -> Dict[str, Serializable]:
     if isinstance(model_class, SupportsArtefacts):
-        access_interface = DefaultAccessInterface
+        access_interface = _model_access_interface(model_class)
         artefact_detectors = list(
-            set(artefact_detectors) | set(model_class.__artefact_detectors__)
+            dict.fromkeys([*artefact_detectors, *model_class.__artefact_detectors__])
         )
     elif isinstance(model_class, Tuple):
         (model_class, access_interface) = model_class
@@ -85,13 +102,19 @@ def _detect_children(
     artefact_detectors: List[ArtefactDetector],
     endpoint: ArtefactEndpoint,
 ) -> Dict[str, Type[AccessInterface]]:
+    """
+    Detect the Child Models on a single level of a model, marking each child as supporting artefacts.
+
+    Children of children are not detected - `ArtefactPlan` walks the model, running detection once per level.
+    """
     if isinstance(model_class, SupportsArtefacts):
-        access_interface = DefaultAccessInterface
+        access_interface = _model_access_interface(model_class)
+        # Detectors are tried in order, so the order they were given in is kept
         child_detectors = list(
-            set(child_detectors) | set(model_class.__child_detectors__)
+            dict.fromkeys([*child_detectors, *model_class.__child_detectors__])
         )
         artefact_detectors = list(
-            set(artefact_detectors) | set(model_class.__artefact_detectors__)
+            dict.fromkeys([*artefact_detectors, *model_class.__artefact_detectors__])
         )
     elif isinstance(model_class, Tuple):
         (model_class, access_interface) = model_class
@@ -114,15 +137,4 @@ def _detect_children(
             )
         except AttributeError:
             pass
-        if child_access_interface is DefaultAccessInterface and isinstance(
-            child, SupportsArtefacts
-        ):
-            _detect_children(child, child_detectors, artefact_detectors, endpoint)
-        else:
-            _detect_children(
-                (child, child_access_interface),
-                child_detectors,
-                artefact_detectors,
-                endpoint,
-            )
     return child_ids
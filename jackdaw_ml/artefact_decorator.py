@@ -3,10 +3,15 @@ from __future__ import annotations
 __all__ = ["artefacts", "find_artefacts", "format_class_name"]
 
 import logging
+import os
+import pathlib
 from functools import partial
-from typing import TYPE_CHECKING, Callable, Dict, List, Type, TypeVar, Union
+from typing import (TYPE_CHECKING, Any, Callable, Dict, List, Optional,
+                    Type, TypeVar, Union)
 from uuid import uuid4
 
+import numpy as np
+
 from jackdaw_ml.artefact_endpoint import ArtefactEndpoint
 from jackdaw_ml.detectors.hook import DefaultDetectors
 from jackdaw_ml.metric_logging import MetricLogger
@@ -100,20 +105,87 @@ def _add_artefacts(
     setattr(cls, "__artefact_endpoint__", endpoint)
 
 
-def _add_logger(cls, endpoint: ArtefactEndpoint) -> None:
-    def _log_metric(self, metric_name: str, metric_value: float) -> None:
-        if not hasattr(self, "_logger"):
-            model_uuid = uuid4()
+def _refresh_default_detectors(model: Any) -> bool:
+    """
+    Add default detectors registered since the model's class was decorated, i.e. as frameworks have been imported.
+
+    Returns whether any detectors were added.
+    """
+    cls = model if isinstance(model, type) else type(model)
+    default_detectors = getattr(cls, "__default_detectors__", None)
+    if default_detectors is None:
+        return False
+    DefaultDetectors.activate()
+    if getattr(cls, "__detector_generation__", None) == DefaultDetectors.generation:
+        return False
+    (default_artefact_detectors, default_child_detectors) = default_detectors
+    added = False
+    for (uses_defaults, attribute, defaults) in (
+        (
+            default_artefact_detectors,
+            "__artefact_detectors__",
+            DefaultDetectors.artefact_detectors,
+        ),
+        (
+            default_child_detectors,
+            "__child_detectors__",
+            DefaultDetectors.child_detectors,
+        ),
+    ):
+        if not uses_defaults:
+            continue
+        detectors = getattr(cls, attribute)
+        # Defaults are ordered with Specific detectors before Generic ones, which each new detector keeps to
+        order = {detector: index for (index, detector) in enumerate(defaults())}
+        new_detectors = [detector for detector in order if detector not in detectors]
+        if new_detectors:
+            detectors = list(detectors)
+            for detector in new_detectors:
+                position = next(
+                    (
+                        index
+                        for (index, existing) in enumerate(detectors)
+                        if order.get(existing, -1) > order[detector]
+                    ),
+                    len(detectors),
+                )
+                detectors.insert(position, detector)
+            setattr(cls, attribute, detectors)
+            added = True
+    setattr(cls, "__detector_generation__", DefaultDetectors.generation)
+    return added
+
+
+def _add_logger(
+    cls, endpoint: ArtefactEndpoint, wal_directory: Optional[pathlib.Path] = None
+) -> None:
+    def _get_logger(self) -> MetricLogger:
+        # Loggers inherited from a parent process are replaced, as their background threads don't survive a fork
+        if not hasattr(self, "_logger") or getattr(self, "_logger").pid != os.getpid():
+            model_uuid = getattr(self, "_model_uuid", None) or uuid4()
             setattr(self, "_model_uuid", model_uuid)
             setattr(
                 cls,
                 "_logger",
-                MetricLogger(getattr(cls, "__model_name__"), model_uuid, endpoint),
+                MetricLogger(
+                    getattr(cls, "__model_name__"), model_uuid, endpoint, wal_directory
+                ),
             )
-        with getattr(self, "_logger") as logger:
-            logger.log(metric_name, metric_value)
+        return getattr(self, "_logger")
+
+    def _log_metric(self, metric_name: str, metric_value: float) -> None:
+        _get_logger(self).queue.log(metric_name, metric_value)
+
+    def _log_metrics(
+        self,
+        metric_name: str,
+        metric_values: np.ndarray,
+        steps: Optional[np.ndarray] = None,
+    ) -> None:
+        _get_logger(self).queue.log_many(metric_name, metric_values, steps)
 
     setattr(cls, "_log_metric", _log_metric)
+    setattr(cls, "_log_metrics", _log_metrics)
 
 
 def artefacts(
@@ -122,6 +194,7 @@ def artefacts(
     child_detectors: List[ChildDetector] = None,
     name: str = None,
     endpoint: ArtefactEndpoint = ArtefactEndpoint.default(),
+    wal_directory: Optional[pathlib.Path] = None,
 ) -> Callable[[T], T]:
     """
     Add Artefact Save & Load to a Model
@@ -133,8 +206,13 @@ def artefacts(
     :param endpoint: Target to save & load models - either local or remote
     :param name: Name to be associated with the saved model
     :param artefact_serializers: Dictionary mapping Serializers to Artefacts, i.e. {SerializerA: ['slot_a', 'slot_b']}
+    :param wal_directory: Directory to log metrics to before they're sent to the endpoint, so that they survive
+        failures to reach it - `~/.artefact_metric_log` by default
     """
     LOGGER.info(f"Initializing Artefacts with {endpoint=}")
+    # Detectors for frameworks imported after decoration are added to the defaults when the model is first saved or
+    #   loaded - see `_refresh_default_detectors`.
+    default_detectors = (artefact_detectors is None, child_detectors is None)
     if artefact_serializers is None:
         artefact_serializers = {}
     if artefact_detectors is None:
@@ -151,7 +229,10 @@ def artefacts(
             child_detectors,
             name=name,
         )
-        _add_logger(cls, endpoint)
+        if any(default_detectors):
+            setattr(cls, "__default_detectors__", default_detectors)
+            setattr(cls, "__detector_generation__", DefaultDetectors.generation)
+        _add_logger(cls, endpoint, wal_directory)
         return cls
 
     return artefact_decorator
@@ -2,12 +2,21 @@ from __future__ import annotations
 
 __all__ = ["ArtefactEndpoint"]
 
-from dataclasses import dataclass
-from typing import Union
+import contextlib
+import hashlib
+import pathlib
+import threading
+from dataclasses import dataclass, field
+from typing import ContextManager, Hashable, Optional, Union
+from uuid import uuid4
 
 from artefact_link import (LocalArtefactRegistry, LocalEndpoint,
                            ShareableAIEndpoint)
 
+# The local registry is a SQLite database, which fails rather than waits when written to concurrently.
+_LOCAL_REGISTRY_LOCK = threading.Lock()
+_REGISTRY_SUFFIX = ".sqlite"
+
 
 @dataclass
 class ArtefactEndpoint:
@@ -18,10 +27,47 @@ class ArtefactEndpoint:
     SAI Resources requires an API Key, but storing locally will just use default file locations
     from Home. 
     """
+    registry_path: Optional[pathlib.Path] = None
+    """ Path of the local SQLite registry - set by `local` and `default`, as it can't be read back from the registry """
+    api_key_digest: Optional[str] = None
+    """ SHA-256 digest of a remote Endpoint's API Key - set by `remote`, identifying the account without the key """
+    _instance_key: str = field(
+        default_factory=lambda: uuid4().hex, compare=False, repr=False
+    )
 
     @staticmethod
     def remote(api_key: str):
-        return ArtefactEndpoint(ShareableAIEndpoint(api_key))
+        return ArtefactEndpoint(
+            ShareableAIEndpoint(api_key),
+            api_key_digest=hashlib.sha256(api_key.encode()).hexdigest(),
+        )
+
+    @staticmethod
+    def local(
+        registry_path: Optional[pathlib.Path] = None,
+        storage_location: Optional[pathlib.Path] = None,
+    ) -> ArtefactEndpoint:
+        """
+        Create a local Artefact Endpoint, with its SQLite registry at `registry_path` and its storage at
+        `storage_location`, each in the default location if not given. The registry's path is given the `.sqlite`
+        suffix if it doesn't already have it.
+        """
+        if registry_path is None:
+            registry_path = _default_registry_path()
+        elif registry_path.suffix != _REGISTRY_SUFFIX:
+            registry_path = registry_path.with_name(
+                f"{registry_path.name}{_REGISTRY_SUFFIX}"
+            )
+        return ArtefactEndpoint(
+            LocalEndpoint(
+                # The registry adds the suffix to the path it's given
+                registry_endpoint=LocalArtefactRegistry(
+                    registry_path.with_suffix("")
+                ),
+                storage_location=storage_location,
+            ),
+            registry_path=registry_path,
+        )
 
     @staticmethod
     def default() -> ArtefactEndpoint:
@@ -31,8 +77,60 @@ class ArtefactEndpoint:
         the SQLite server at ~/.artefact_registry and the storage at
         ~/.artefact_storage
         """
-        return ArtefactEndpoint(
-            LocalEndpoint(
-                registry_endpoint=LocalArtefactRegistry(None), storage_location=None
+        return ArtefactEndpoint.local()
+
+    def registry_lock(self) -> ContextManager:
+        """
+        Lock to hold while accessing the Endpoint's registry, serializing access to local registries across threads.
+        """
+        if self.is_local():
+            return _LOCAL_REGISTRY_LOCK
+        return contextlib.nullcontext()
+
+    def identity(self) -> Optional[str]:
+        """
+        Identity of the registry behind this Endpoint, stable across Endpoints and processes - the path of a local
+        registry, or the account of a remote one. None for Endpoints built without `local` or `remote`.
+        """
+        registry_path = self.local_registry_path()
+        if registry_path is not None:
+            return f"local:{registry_path.resolve()}"
+        if not self.is_local() and self.api_key_digest is not None:
+            return f"shareableai:{self.api_key_digest}"
+        return None
+
+    def cache_key(self) -> Hashable:
+        """
+        Key identifying the registry behind this Endpoint, for caching results read from it. Endpoints of unknown
+        identity each have a key of their own, which is never reused.
+        """
+        identity = self.identity()
+        if identity is not None:
+            return identity
+        return ("endpoint", self._instance_key)
+
+    def is_local(self) -> bool:
+        return isinstance(self.endpoint, LocalEndpoint)
+
+    def local_registry_path(self) -> Optional[pathlib.Path]:
+        """
+        Path of the SQLite database behind a local Endpoint's registry. None for remote Endpoints, and for local
+        Endpoints built without `registry_path` - whose registry could be anywhere, so use `local` to build them.
+        """
+        if not self.is_local():
+            return None
+        return self.registry_path
+
+    def require_local_registry_path(self, purpose: str) -> pathlib.Path:
+        """`local_registry_path`, raising if it isn't known"""
+        registry_path = self.local_registry_path()
+        if registry_path is None:
+            raise NotImplementedError(
+                f"{purpose} from local endpoints whose registry path is known - build them with "
+                f"`ArtefactEndpoint.local`"
             )
-        )
+        return registry_path
+
+
+def _default_registry_path() -> pathlib.Path:
+    return pathlib.Path.home() / f".artefact_registry{_REGISTRY_SUFFIX}"
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+__all__ = ["ArtefactPlan"]
+
+import logging
+from dataclasses import dataclass
+from typing import (Any, Dict, Hashable, Iterable, Iterator, List, Optional,
+                    Tuple, Type, Union)
+
+from jackdaw_ml.access_interface import AccessInterface, DefaultAccessInterface
+from jackdaw_ml.artefact_container import (SupportsArtefacts,
+                                           _detect_artefact_annotations,
+                                           _detect_artefacts, _detect_children,
+                                           _model_access_interface)
+from jackdaw_ml.artefact_decorator import _refresh_default_detectors
+from jackdaw_ml.artefact_endpoint import ArtefactEndpoint
+from jackdaw_ml.detectors import ArtefactDetector, ChildDetector
+from jackdaw_ml.serializers import Serializable
+
+LOGGER = logging.getLogger(__name__)
+
+# Structure of a single level of a model - its type, whether it supports artefacts, a stamp of the key and type of
+#   each item reachable through its AccessInterface, and the type of each artefact in the plan. Stamps are taken from
+#   the instance's own attributes where possible, so checking a cached plan doesn't read properties and other class
+#   members.
+Signature = Tuple[Type[Any], bool, Hashable, Tuple[Type[Any], ...]]
+
+
+def _signature(
+    container: Any, access_interface: Type[AccessInterface], artefacts: Iterable[str]
+) -> Signature:
+    return (
+        type(container),
+        isinstance(container, SupportsArtefacts),
+        access_interface._stamp(container),
+        tuple(
+            type(access_interface.get_artefact(container, name)) for name in artefacts
+        ),
+    )
+
+
+@dataclass
+class ArtefactPlan:
+    """
+    Result of running detection over a Model, held as a tree.
+
+    Each level of the plan holds the AccessInterface used to reach items on that level, the Artefacts found on it
+    and the Serializer for each, and a plan for each Child Model. Plans are compiled once and cached on the model,
+    so that `saves`, `loads`, and `trace_artefacts` don't repeat detection. A cached plan is recompiled when the
+    structure of the model changes - when items are added or removed, or change type, at any level of the model.
+
+    Attributes
+    ----------
+    `access_interface`
+        AccessInterface used to get and set items on this level of the model
+
+    `artefacts`
+        Artefacts that are saved from this level of the model, and the Serializer used for each
+
+    `annotated_artefacts`
+        Artefacts found only via class annotations - these are restored on load, but may not exist to be saved
+
+    `children`
+        Plans for each Child Model, by the name of the slot the child is found in
+
+    `endpoint`
+        Endpoint that this level of the model is saved to and loaded from
+    """
+
+    access_interface: Type[AccessInterface]
+    artefacts: Dict[str, Type[Serializable]]
+    annotated_artefacts: Dict[str, Type[Serializable]]
+    children: Dict[str, ArtefactPlan]
+    endpoint: Optional[ArtefactEndpoint]
+    signature: Signature
+
+    @staticmethod
+    def for_model(model_class: SupportsArtefacts) -> ArtefactPlan:
+        """
+        Retrieve the plan for a model, compiling a new plan if the model has no plan or its structure has changed.
+        """
+        if not isinstance(model_class, SupportsArtefacts):
+            raise ValueError(
+                "Model Class provided must be initialised via @artefacts before calling loads or save"
+            )
+        if _refresh_default_detectors(model_class):
+            ArtefactPlan.invalidate(model_class)
+        plan: Optional[ArtefactPlan] = getattr(model_class, "__artefact_plan__", None)
+        if plan is not None and plan.matches(model_class):
+            return plan
+        plan = _compile(
+            model_class,
+            model_class.__artefact_endpoint__,
+            model_class.__artefact_detectors__,
+            model_class.__child_detectors__,
+        )
+        setattr(model_class, "__artefact_plan__", plan)
+        return plan
+
+    @staticmethod
+    def invalidate(model_class: SupportsArtefacts) -> None:
+        """
+        Drop the cached plan for a model, forcing detection to run again on the next save or load.
+        """
+        if getattr(model_class, "__artefact_plan__", None) is not None:
+            setattr(model_class, "__artefact_plan__", None)
+
+    def matches(self, container: Any) -> bool:
+        """
+        Check that the structure of `container`, and of each of its children, is unchanged since this plan was compiled.
+        """
+        try:
+            signature = _signature(container, self.access_interface, self.artefacts)
+            if signature != self.signature:
+                return False
+            return all(
+                child_plan.matches(self.access_interface.get_artefact(container, name))
+                for (name, child_plan) in self.children.items()
+            )
+        except (AttributeError, IndexError, KeyError):
+            return False
+
+    def load_artefacts(self) -> Dict[str, Type[Serializable]]:
+        """Artefacts to restore on this level of the model when loading"""
+        return self.artefacts | self.annotated_artefacts
+
+    def nodes(self, prefix: str = "") -> Iterator[Tuple[str, ArtefactPlan]]:
+        """
+        Flatten the plan, providing the dotted path to each level of the model alongside its plan.
+
+        The top level of the model has the path `prefix`, which is empty by default.
+        """
+        yield prefix, self
+        for (child_name, child_plan) in self.children.items():
+            yield from child_plan.nodes(_join(prefix, child_name))
+
+    def artefact_paths(self) -> Dict[str, Type[Serializable]]:
+        """
+        Flatten the plan, providing the dotted path to every artefact on the model alongside its Serializer.
+        """
+        return {
+            _join(path, artefact_name): serializer
+            for (path, node) in self.nodes()
+            for (artefact_name, serializer) in node.artefacts.items()
+        }
+
+
+def _join(prefix: str, name: str) -> str:
+    return f"{prefix}.{name}" if prefix else name
+
+
+def _compile(
+    model_class: Union[SupportsArtefacts, Tuple[Any, Type[AccessInterface]]],
+    endpoint: Optional[ArtefactEndpoint],
+    artefact_detectors: List[ArtefactDetector],
+    child_detectors: List[ChildDetector],
+) -> ArtefactPlan:
+    if isinstance(model_class, SupportsArtefacts):
+        access_interface = _model_access_interface(model_class)
+        child_detectors = model_class.__child_detectors__
+        artefact_detectors = model_class.__artefact_detectors__
+        existing_artefacts: Dict[
+            str, Type[Serializable]
+        ] = model_class.__artefact_slots__
+        model_children = _detect_children(
+            model_class, child_detectors, artefact_detectors, endpoint
+        )
+        # At this point, artefact_children have been picked up.
+        detected_artefacts = _detect_artefacts(
+            model_class, set(model_children.keys()), artefact_detectors
+        )
+        annotated_artefacts = _detect_artefact_annotations(
+            model_class, set(model_children.keys()), artefact_detectors
+        )
+        container = model_class
+    elif isinstance(model_class, Tuple):
+        model_children = _detect_children(
+            model_class, child_detectors, artefact_detectors, endpoint
+        )
+        detected_artefacts = _detect_artefacts(
+            model_class, set(model_children.keys()), artefact_detectors
+        )
+        annotated_artefacts = dict()
+        (container, access_interface) = model_class
+        existing_artefacts = dict()
+    else:
+        raise ValueError
+
+    children = {}
+    for (child_name, child_interface) in model_children.items():
+        child = access_interface.get_artefact(container, child_name)
+        if (
+            isinstance(child, SupportsArtefacts)
+            and child_interface is DefaultAccessInterface
+        ):
+            children[child_name] = _compile(
+                child,
+                child.__artefact_endpoint__,
+                artefact_detectors,
+                child_detectors,
+            )
+        else:
+            children[child_name] = _compile(
+                (child, child_interface),
+                endpoint,
+                artefact_detectors,
+                child_detectors,
+            )
+
+    artefacts = detected_artefacts | existing_artefacts
+    return ArtefactPlan(
+        access_interface=access_interface,
+        artefacts=artefacts,
+        annotated_artefacts={
+            name: serializer
+            for (name, serializer) in annotated_artefacts.items()
+            if name not in existing_artefacts
+        },
+        children=children,
+        endpoint=endpoint,
+        signature=_signature(container, access_interface, artefacts),
+    )
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+__all__ = [
+    "DELTA_PARENT_SLOT",
+    "chain_length",
+    "encode_delta",
+    "is_delta",
+    "load_artefact",
+]
+
+import struct
+from typing import Optional, Tuple, Union
+
+import numpy as np
+import pyarrow as pa  # type: ignore
+from artefact_link import (LocalEndpoint, ModelData, ShareableAIEndpoint,
+                           load_model_data)
+
+from jackdaw_ml.resource import Resource
+
+# Child slot holding the Model a delta-encoded Model's artefacts are relative to
+DELTA_PARENT_SLOT = "__delta_parent__"
+
+_MAGIC = b"JDDELTA\x00"
+# Length of the delta chain, and size of the artefact once rebuilt
+_HEADER = struct.Struct("<IQ")
+_CODEC = "zstd"
+
+
+def is_delta(resource: Resource) -> bool:
+    return bytes(resource.view()[: len(_MAGIC)]) == _MAGIC
+
+
+def chain_length(resource: Resource) -> int:
+    """Number of deltas that must be applied to rebuild the artefact, or 0 if it's stored in full"""
+    if not is_delta(resource):
+        return 0
+    (length, _) = _HEADER.unpack_from(resource.view(), len(_MAGIC))
+    return length
+
+
+def encode_delta(
+    resource: Resource, parent: Resource, parent_chain_length: int
+) -> Optional[Resource]:
+    """
+    Encode `resource` as a compressed XOR against `parent`, the full form of the same artefact in the parent Model.
+
+    Bytes unchanged since the parent XOR to zero, so small updates to a tensor compress to a fraction of its size.
+    Returns None if the artefacts differ in size, or the delta is no smaller than `resource`.
+    """
+    if len(resource) != len(parent):
+        return None
+    xor = np.bitwise_xor(
+        np.frombuffer(resource.view(), dtype=np.uint8),
+        np.frombuffer(parent.view(), dtype=np.uint8),
+    )
+    compressed = pa.compress(xor, codec=_CODEC, asbytes=True)
+    header = _MAGIC + _HEADER.pack(parent_chain_length + 1, len(resource))
+    if len(header) + len(compressed) >= len(resource):
+        return None
+    return Resource(header + compressed)
+
+
+def _apply_delta(delta: Resource, parent: Resource) -> Resource:
+    (_, size) = _HEADER.unpack_from(delta.view(), len(_MAGIC))
+    xor = pa.decompress(
+        delta.view()[len(_MAGIC) + _HEADER.size :],
+        decompressed_size=size,
+        codec=_CODEC,
+        asbytes=True,
+    )
+    return Resource(
+        np.bitwise_xor(
+            np.frombuffer(xor, dtype=np.uint8),
+            np.frombuffer(parent.view(), dtype=np.uint8),
+        ).tobytes()
+    )
+
+
+def load_artefact(
+    model_data: ModelData,
+    artefact_name: str,
+    endpoint: Union[LocalEndpoint, ShareableAIEndpoint],
+    memory_map: bool = False,
+) -> Tuple[Resource, int]:
+    """
+    Read an artefact from a saved Model, rebuilding it from the Model's delta parents if it's delta-encoded.
+
+    Provides the full artefact, alongside the length of the delta chain it was rebuilt from.
+    """
+    resource = Resource.from_artefact(
+        model_data.artefact_by_slot(artefact_name), memory_map=memory_map
+    )
+    length = chain_length(resource)
+    if length == 0:
+        return resource, 0
+    parent_id = model_data.child_id_by_slot(DELTA_PARENT_SLOT)
+    parent_data = load_model_data(
+        model_name=parent_id.name,
+        vcs_id=parent_id.vcs_id,
+        artefact_schema_id=parent_id.artefact_schema_id,
+        endpoint=endpoint,
+    )
+    (parent, _) = load_artefact(parent_data, artefact_name, endpoint)
+    return _apply_delta(resource, parent), length
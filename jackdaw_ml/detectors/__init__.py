@@ -2,11 +2,14 @@ __all__ = ["Detector"]
 
 from collections import OrderedDict
 from dataclasses import dataclass
-from typing import (Any, Dict, Generic, List, Optional, Set, Type, TypeVar,
-                    Union)
+from typing import (Any, Dict, FrozenSet, Generic, Iterable, List, Optional,
+                    Set, Type, TypeVar, Union)
 
 from jackdaw_ml.access_interface.list_interface import ListAccessInterface
 from jackdaw_ml.detectors.class_detector import ChildModelDetector
+from jackdaw_ml.detectors.container_types import (CONTAINER_TYPES,
+                                                  _instance_dependent,
+                                                  _is_subclass)
 from jackdaw_ml.serializers import Serializable
 
 T = TypeVar("T")
@@ -22,7 +25,27 @@ def _get_origin(obj: object) -> Optional[object]:
     return None
 
 
+def _elements_are(
+    element_types: FrozenSet[type], elements: Iterable[Any], typ: Type
+) -> bool:
+    if typ is Any:
+        return True
+    if _get_origin(typ) is None:
+        if all(_is_subclass(element_type, typ) for element_type in element_types):
+            return True
+        if not _instance_dependent(typ):
+            return False
+    # Nested generics, and types that accept instances of other types, are checked element by element
+    return all(is_type(x, typ) for x in elements)
+
+
 def is_type(obj: object, typ: Type) -> bool:
+    """
+    Whether `obj` is of type `typ`, which may be a generic list, set or dictionary.
+
+    Containers are rejected on their first element alone where possible, and otherwise checked against the types cached
+    for them in `CONTAINER_TYPES`.
+    """
     if typ is Any:
         return True
     origin = _get_origin(typ)
@@ -34,23 +57,35 @@ def is_type(obj: object, typ: Type) -> bool:
             return True
         if not isinstance(obj, dict):
             return False
-        return len(obj.items()) > 0 and all(
-            is_type(k, key) and is_type(v, value) for (k, v) in obj.items()
-        )
+        if len(obj) == 0:
+            return False
+        (first_key, first_value) = next(iter(obj.items()))
+        if not (is_type(first_key, key) and is_type(first_value, value)):
+            return False
+        (key_types, value_types) = CONTAINER_TYPES.element_types(obj)
+        return _elements_are(
+            key_types, CONTAINER_TYPES.sample(obj.keys()), key
+        ) and _elements_are(value_types, CONTAINER_TYPES.sample(obj.values()), value)
     elif origin is list or origin is List:
         if not (isinstance(obj, list) or isinstance(obj, List)):
             return False
         if len(obj) == 0:
             return False
         (list_type,) = typ.__args__
-        return all(is_type(x, list_type) for x in obj)
+        if not is_type(obj[0], list_type):
+            return False
+        (element_types,) = CONTAINER_TYPES.element_types(obj)
+        return _elements_are(element_types, CONTAINER_TYPES.sample(obj), list_type)
     elif origin is set or origin is Set:
         if not (isinstance(obj, set) or isinstance(obj, Set)):
             return False
         if len(obj) == 0:
             return False
         (set_type,) = typ.__args__
-        return all(is_type(x, set_type) for x in obj)
+        if not is_type(next(iter(obj)), set_type):
+            return False
+        (element_types,) = CONTAINER_TYPES.element_types(obj)
+        return _elements_are(element_types, CONTAINER_TYPES.sample(obj), set_type)
     else:
         raise NotImplementedError
 
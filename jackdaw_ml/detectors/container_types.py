@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+__all__ = ["ContainerTypeCache", "CONTAINER_TYPES"]
+
+import itertools
+import threading
+from abc import ABCMeta
+from collections import OrderedDict
+from typing import Any, Collection, FrozenSet, Iterable, Optional, Tuple, Type
+
+# The types of the elements of a list or set, or of the keys and values of a dictionary
+ElementTypes = Tuple[FrozenSet[type], ...]
+
+_TYPE_INSTANCE_CHECKS = (type.__instancecheck__, ABCMeta.__instancecheck__)
+
+
+def _instance_dependent(typ: Any) -> bool:
+    """
+    Whether `isinstance(item, typ)` depends on more than the type of `item` - i.e. runtime Protocols, or classes such
+    as `nn.Parameter` that accept instances of other types.
+    """
+    return (
+        not isinstance(typ, type)
+        or type(typ).__instancecheck__ not in _TYPE_INSTANCE_CHECKS
+    )
+
+
+def _is_subclass(item_type: Type[Any], typ: Any) -> bool:
+    try:
+        return issubclass(item_type, typ)
+    except TypeError:
+        return False
+
+
+class ContainerTypeCache:
+    """
+    LRU cache of the types found in lists, sets and dictionaries, so that checking a container against several generic
+    types, i.e. `List[nn.Module]` then `Dict[str, nn.Module]`, scans it once.
+
+    Containers are keyed on their `id` and length, and the types of their first and last elements are checked again on
+    each use. A container whose other elements are replaced in place, without changing its length, keeps its cached
+    types until it's evicted or the cache is cleared. Cached containers are kept alive until evicted, so that their
+    `id` can't be reused by another container.
+
+    If `sample_size` is set, at most that many elements of each container are checked - spread evenly across lists, and
+    the first elements of sets and dictionaries. Detection then no longer scales with the size of a container, but may
+    miss elements of other types.
+    """
+
+    def __init__(self, max_size: int = 256, sample_size: Optional[int] = None):
+        self.max_size = max_size
+        self.sample_size = sample_size
+        self._lock = threading.Lock()
+        self._types: OrderedDict[
+            Tuple[int, int, Optional[int]], Tuple[Any, ElementTypes]
+        ] = OrderedDict()
+
+    def sample(self, elements: Collection[Any]) -> Iterable[Any]:
+        """The elements of a list or set, or a view of a dictionary, to check"""
+        if self.sample_size is None or len(elements) <= self.sample_size:
+            return elements
+        if isinstance(elements, list):
+            return elements[:: -(-len(elements) // self.sample_size)]
+        return itertools.islice(elements, self.sample_size)
+
+    def element_types(self, container: Any) -> ElementTypes:
+        key = (id(container), len(container), self.sample_size)
+        with self._lock:
+            cached = self._types.get(key)
+            if cached is not None:
+                self._types.move_to_end(key)
+        if (
+            cached is not None
+            and cached[0] is container
+            and self._still_holds(container, cached[1])
+        ):
+            return cached[1]
+        if isinstance(container, dict):
+            element_types: ElementTypes = (
+                frozenset(map(type, self.sample(container.keys()))),
+                frozenset(map(type, self.sample(container.values()))),
+            )
+        else:
+            element_types = (frozenset(map(type, self.sample(container))),)
+        with self._lock:
+            self._types[key] = (container, element_types)
+            while len(self._types) > self.max_size:
+                self._types.popitem(last=False)
+        return element_types
+
+    @staticmethod
+    def _still_holds(container: Any, element_types: ElementTypes) -> bool:
+        if not container:
+            return True
+        if isinstance(container, dict):
+            (key, value) = next(iter(container.items()))
+            return type(key) in element_types[0] and type(value) in element_types[1]
+        if isinstance(container, list):
+            return (
+                type(container[0]) in element_types[0]
+                and type(container[-1]) in element_types[0]
+            )
+        return type(next(iter(container))) in element_types[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._types.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._types)
+
+
+CONTAINER_TYPES = ContainerTypeCache()
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+__all__ = ["ArtefactDispatch", "ChildDispatch", "artefact_dispatch", "child_dispatch"]
+
+from typing import (Any, Callable, Dict, Generic, Optional, Sequence, Tuple,
+                    Type, TypeVar, Union)
+
+from jackdaw_ml.access_interface import AccessInterface, DefaultAccessInterface
+from jackdaw_ml.detectors import (ArtefactDetector, ChildDetector,
+                                  ChildModelDetector, _get_origin)
+from jackdaw_ml.detectors.container_types import (_instance_dependent,
+                                                  _is_subclass)
+from jackdaw_ml.serializers import Serializable
+
+R = TypeVar("R")
+
+# Checks that can't be decided from the type of an item alone, run against the item itself
+Check = Callable[[Any], Optional[R]]
+# The checks to run against an item of a given type, in order, and the result if none of them match
+Route = Tuple[Tuple[Check[R], ...], Optional[R]]
+
+# Bounds on the number of dispatch tables, and of types within each, so that classes created at runtime aren't kept
+#   alive indefinitely.
+_MAX_TABLES = 256
+_MAX_TYPES = 4096
+
+# Items of these types are matched against generic detectors such as `List[nn.Module]` by their contents
+_CONTAINER_TYPES = (list, set, dict)
+
+
+class _DispatchTable(Generic[R]):
+    """
+    Memoizes the result of running a list of detectors against items of each type.
+
+    Each type is resolved once, through `issubclass` and so through its MRO, into a route. Where detection depends on
+    more than the type of an item, the route keeps those checks to run against each item in turn.
+    """
+
+    def __init__(self, resolve: Callable[[Type[Any]], Optional[Route[R]]]):
+        self._resolve = resolve
+        self._routes: Dict[Type[Any], Optional[Route[R]]] = dict()
+
+    def route(self, item_type: Type[Any]) -> Optional[Route[R]]:
+        try:
+            return self._routes[item_type]
+        except KeyError:
+            pass
+        route = self._resolve(item_type)
+        if len(self._routes) >= _MAX_TYPES:
+            self._routes.clear()
+        self._routes[item_type] = route
+        return route
+
+    def __len__(self) -> int:
+        return len(self._routes)
+
+
+def _matches(typ: Any, result: R) -> Check[R]:
+    return lambda item: result if isinstance(item, typ) else None
+
+
+def _matches_detector(is_artefact: Callable[[Any], bool], result: R) -> Check[R]:
+    return lambda item: result if is_artefact(item) else None
+
+
+def _model_detector_matches(
+    detector: ChildModelDetector,
+) -> Check[Type[AccessInterface]]:
+    return lambda item: DefaultAccessInterface if detector(item) else None
+
+
+def _run(route: Route[R], item: Any) -> Optional[R]:
+    (checks, result) = route
+    for check in checks:
+        if (matched := check(item)) is not None:
+            return matched
+    return result
+
+
+class ArtefactDispatch:
+    """Serializer for each artefact, from the first of `artefact_detectors` that detects it"""
+
+    def __init__(self, artefact_detectors: Sequence[ArtefactDetector]):
+        self.artefact_detectors = tuple(artefact_detectors)
+        self.table: _DispatchTable[Type[Serializable]] = _DispatchTable(self._resolve)
+
+    def _resolve(self, item_type: Type[Any]) -> Route[Type[Serializable]]:
+        checks = []
+        for detector in self.artefact_detectors:
+            if type(detector).is_artefact is not ArtefactDetector.is_artefact:
+                checks.append(
+                    _matches_detector(detector.is_artefact, detector.serializer)
+                )
+                continue
+            for artefact_type in detector.artefact_types:
+                if _is_subclass(item_type, artefact_type):
+                    return tuple(checks), detector.serializer
+                if _instance_dependent(artefact_type):
+                    checks.append(_matches(artefact_type, detector.serializer))
+        return tuple(checks), None
+
+    def serializer(self, item: Any) -> Optional[Type[Serializable]]:
+        route = self.table.route(type(item))
+        assert route is not None
+        return _run(route, item)
+
+
+class ChildDispatch:
+    """AccessInterface for each child, from the first of `detectors` that detects it"""
+
+    def __init__(self, detectors: Sequence[Union[ChildDetector, ArtefactDetector]]):
+        self.detectors = tuple(detectors)
+        self.table: _DispatchTable[Type[AccessInterface]] = _DispatchTable(
+            self._resolve
+        )
+
+    def _resolve(self, item_type: Type[Any]) -> Optional[Route[Type[AccessInterface]]]:
+        if issubclass(item_type, _CONTAINER_TYPES):
+            # Containers are detected by their contents, which can change between calls
+            return None
+        checks = []
+        for detector in self.detectors:
+            if type(detector) is ArtefactDetector:
+                # Artefact Detectors only detect containers of artefacts as children
+                continue
+            if type(detector) is not ChildDetector:
+                checks.append(detector.get_child_interface)
+                continue
+            for (child_type, child_interface) in detector.child_models.items():
+                if isinstance(child_type, ChildModelDetector):
+                    checks.append(_model_detector_matches(child_type))
+                elif child_type is Any:
+                    return tuple(checks), child_interface
+                elif _get_origin(child_type) is not None:
+                    # Generic containers never match items that aren't containers
+                    continue
+                elif _is_subclass(item_type, child_type):
+                    return tuple(checks), child_interface
+                elif _instance_dependent(child_type):
+                    checks.append(_matches(child_type, child_interface))
+        return tuple(checks), None
+
+    def child_interface(self, item: Any) -> Optional[Type[AccessInterface]]:
+        route = self.table.route(type(item))
+        if route is not None:
+            return _run(route, item)
+        for detector in self.detectors:
+            if (child_interface := detector.get_child_interface(item)) is not None:
+                return child_interface
+        return None
+
+
+_ARTEFACT_DISPATCH: Dict[Tuple[ArtefactDetector, ...], ArtefactDispatch] = dict()
+_CHILD_DISPATCH: Dict[
+    Tuple[Union[ChildDetector, ArtefactDetector], ...], ChildDispatch
+] = dict()
+
+
+def artefact_dispatch(
+    artefact_detectors: Sequence[ArtefactDetector],
+) -> ArtefactDispatch:
+    """The dispatch table of a list of Artefact Detectors, shared by every model detected with the same list"""
+    key = tuple(artefact_detectors)
+    dispatch = _ARTEFACT_DISPATCH.get(key)
+    if dispatch is None:
+        if len(_ARTEFACT_DISPATCH) >= _MAX_TABLES:
+            _ARTEFACT_DISPATCH.clear()
+        dispatch = _ARTEFACT_DISPATCH[key] = ArtefactDispatch(key)
+    return dispatch
+
+
+def child_dispatch(
+    detectors: Sequence[Union[ChildDetector, ArtefactDetector]],
+) -> ChildDispatch:
+    """The dispatch table of a list of Child and Artefact Detectors, shared by every model detected with the same list"""
+    key = tuple(detectors)
+    dispatch = _CHILD_DISPATCH.get(key)
+    if dispatch is None:
+        if len(_CHILD_DISPATCH) >= _MAX_TABLES:
+            _CHILD_DISPATCH.clear()
+        dispatch = _CHILD_DISPATCH[key] = ChildDispatch(key)
+    return dispatch
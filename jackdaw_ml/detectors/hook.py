@@ -1,10 +1,21 @@
 __all__ = ["DefaultDetectors", "DetectionLevel"]
 
+import importlib
+import logging
+import sys
+import threading
 from enum import Enum, auto
+from importlib.metadata import entry_points
 from typing import Dict, Union
 
 from jackdaw_ml.detectors import ArtefactDetector, ChildDetector, Detector
 
+LOGGER = logging.getLogger(__name__)
+
+# Entry point group for detectors from other packages. Each entry point is named after the module of the framework it
+#   detects, and points to the module that registers the detectors, i.e. `torch_geometric = my_package.detectors`.
+ENTRY_POINT_GROUP = "jackdaw_ml.detectors"
+
 
 class DetectionLevel(Enum):
     Specific = auto()
@@ -14,6 +25,20 @@ class DetectionLevel(Enum):
 class DefaultDetectors:
     _specific_detectors: Dict[Union[ArtefactDetector, ChildDetector], None] = dict()
     _generic_detectors: Dict[Union[ArtefactDetector, ChildDetector], None] = dict()
+    # Modules registering detectors, by the module of the framework they detect. Each is imported once its framework
+    #   has been imported, so that frameworks are never imported just to find their detectors.
+    _lazy_detectors: Dict[str, Dict[str, None]] = {
+        "jackdaw_ml": {"jackdaw_ml.detectors.child_architecture_detector": None},
+        "torch": {"jackdaw_ml.detectors.torch": None},
+        "keras": {"jackdaw_ml.detectors.keras": None},
+        "tensorflow": {"jackdaw_ml.detectors.keras": None},
+        "lightgbm": {"jackdaw_ml.detectors.lightgbm": None},
+        "sklearn": {"jackdaw_ml.detectors.sklearn": None},
+    }
+    _entry_points_loaded: bool = False
+    _lock = threading.RLock()
+    # Incremented as detectors are added, so that models can tell when the defaults have changed
+    generation: int = 0
 
     @staticmethod
     def add_detector(
@@ -25,32 +50,45 @@ class DefaultDetectors:
                 DefaultDetectors._generic_detectors[detector] = None
             case DetectionLevel.Specific:
                 DefaultDetectors._specific_detectors[detector] = None
+        DefaultDetectors.generation += 1
+
+    @staticmethod
+    def add_lazy_detector(framework: str, module: str) -> None:
+        """
+        Import `module`, which registers detectors via `add_detector`, once the `framework` module has been imported.
+        """
+        with DefaultDetectors._lock:
+            DefaultDetectors._lazy_detectors.setdefault(framework, dict())[
+                module
+            ] = None
+
+    @staticmethod
+    def activate() -> None:
+        """Register the detectors of every framework imported so far"""
+        with DefaultDetectors._lock:
+            if not DefaultDetectors._entry_points_loaded:
+                DefaultDetectors._entry_points_loaded = True
+                for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+                    DefaultDetectors.add_lazy_detector(
+                        entry_point.name, entry_point.value
+                    )
+            imported = [
+                framework
+                for framework in DefaultDetectors._lazy_detectors
+                if framework in sys.modules
+            ]
+            for framework in imported:
+                for module in DefaultDetectors._lazy_detectors.pop(framework, {}):
+                    if module in sys.modules:
+                        continue
+                    try:
+                        importlib.import_module(module)
+                    except (ImportError, NameError) as e:
+                        LOGGER.debug(f"Could not load detectors from {module}: {e}")
 
     @staticmethod
     def artefact_detectors() -> Dict[ArtefactDetector, None]:
-        try:
-            from jackdaw_ml.detectors.torch import (TorchDetector,
-                                                    TorchSeqDetector)
-        except (ImportError, NameError):
-            pass
-        try:
-            from jackdaw_ml.detectors.keras import (KerasDetector,
-                                                    KerasSeqDetector)
-        except (ImportError, NameError):
-            pass
-        try:
-            from jackdaw_ml.detectors.child_architecture_detector import \
-                ChildArchitectureDetector
-        except (ImportError, NameError):
-            pass
-        try:
-            from jackdaw_ml.detectors.lightgbm import LightGBMDetector
-        except (ImportError, NameError):
-            pass
-        try:
-            from jackdaw_ml.detectors.sklearn import SKLearnDetector
-        except (ImportError, NameError):
-            pass
+        DefaultDetectors.activate()
         return {
             detector: None
             for detector in (
@@ -62,21 +100,7 @@ class DefaultDetectors:
 
     @staticmethod
     def child_detectors() -> Dict[ChildDetector, None]:
-        try:
-            from jackdaw_ml.detectors.torch import (TorchDetector,
-                                                    TorchSeqDetector)
-        except (ImportError, NameError):
-            pass
-        try:
-            from jackdaw_ml.detectors.keras import (KerasDetector,
-                                                    KerasSeqDetector)
-        except (ImportError, NameError):
-            pass
-        try:
-            from jackdaw_ml.detectors.child_architecture_detector import \
-                ChildArchitectureDetector
-        except (ImportError, NameError):
-            pass
+        DefaultDetectors.activate()
         return {
             detector: None
             for detector in (
@@ -1,15 +1,24 @@
-__all__ = ["TorchSeqDetector", "TorchDetector"]
+__all__ = [
+    "TorchSeqDetector",
+    "TorchDetector",
+    "TorchModuleAccessInterface",
+    "TorchModuleDetector",
+]
 
-from typing import Dict, List, OrderedDict
+from typing import Any, Dict, Iterable, List, OrderedDict, Set, Tuple, Type
 
+import torch
 import torch.nn as nn
 
-from jackdaw_ml.access_interface import (DefaultAccessInterface,
+from jackdaw_ml.access_interface import (AccessInterface,
+                                         DefaultAccessInterface,
                                          DictAccessInterface)
 from jackdaw_ml.access_interface.list_interface import ListAccessInterface
 from jackdaw_ml.detectors import ArtefactDetector, ChildDetector
 from jackdaw_ml.detectors.hook import DefaultDetectors, DetectionLevel
-from jackdaw_ml.serializers.tensor import TorchSerializer
+from jackdaw_ml.serializers import Serializable
+from jackdaw_ml.serializers.tensor import (TorchModuleSerializer,
+                                           TorchModuleState, TorchSerializer)
 
 TorchSeqDetector = ChildDetector(
     child_models={
@@ -22,10 +31,79 @@ TorchSeqDetector = ChildDetector(
     },
 )
 
+# Plain tensors are found on Modules as persistent Buffers, such as BatchNorm's running statistics
 TorchDetector = ArtefactDetector(
-    artefact_types={nn.Parameter},
+    artefact_types={nn.Parameter, torch.Tensor},
     serializer=TorchSerializer,
 )
 
+
+class TorchModuleAccessInterface(DefaultAccessInterface):
+    """
+    Treats a Module and all of its children as a single artefact, holding every Parameter and persistent Buffer of the
+    Module tree - see `TorchModuleSerializer`.
+
+    Other attributes of the Module are reached as they are through `DefaultAccessInterface`, so a model that is itself
+    a Module keeps the rest of its artefacts and children.
+    """
+
+    STATE = "state"
+
+    @staticmethod
+    def _module_names(container: nn.Module) -> Set[str]:
+        """Names of the attributes held in the Module's state"""
+        return {*container._parameters, *container._buffers, *container._modules}
+
+    @staticmethod
+    def _get_item(container: nn.Module, key: str) -> Any:
+        if key == TorchModuleAccessInterface.STATE:
+            return TorchModuleState(container)
+        return DefaultAccessInterface._get_item(container, key)
+
+    @staticmethod
+    def _set_item(container: nn.Module, key: str, value: Any) -> None:
+        if key != TorchModuleAccessInterface.STATE:
+            DefaultAccessInterface._set_item(container, key, value)
+            return
+        if not isinstance(value, TorchModuleState):
+            raise TypeError(f"Received {value}, expected {TorchModuleState}")
+        if value.module is not container:
+            TorchModuleState(container).load(value.named_tensors())
+
+    @classmethod
+    def list_artefacts(
+        cls, model: nn.Module, artefact_detectors: Any
+    ) -> Iterable[Tuple[str, Any, Type[Serializable]]]:
+        yield cls.STATE, TorchModuleState(model), TorchModuleSerializer
+        module_names = cls._module_names(model)
+        for (name, item, serializer) in super().list_artefacts(
+            model, artefact_detectors
+        ):
+            if name not in module_names:
+                yield name, item, serializer
+
+    @classmethod
+    def list_children(
+        cls, model: nn.Module, child_detectors: Any, artefact_detectors: Any
+    ) -> Iterable[Tuple[str, Type[AccessInterface]]]:
+        # Child Modules are saved as part of the Module's own artefact
+        module_names = cls._module_names(model)
+        for (name, child_interface) in super().list_children(
+            model, child_detectors, artefact_detectors
+        ):
+            if name not in module_names:
+                yield name, child_interface
+
+
+# Not a default - opt in by placing it ahead of the other child detectors, i.e.
+#   `@artefacts(child_detectors=[TorchModuleDetector, *DefaultDetectors.child_detectors()])`. A model that is itself
+#   a Module is then saved as a single artefact as well.
+TorchModuleDetector = ChildDetector(
+    child_models={nn.Module: TorchModuleAccessInterface},
+)
+
+DefaultAccessInterface.add_attribute_registry(
+    nn.Module, ("_parameters", "_buffers", "_modules"), "_non_persistent_buffers_set"
+)
 DefaultDetectors.add_detector(TorchSeqDetector, DetectionLevel.Specific)
 DefaultDetectors.add_detector(TorchDetector)
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+__all__ = ["LazyArtefact", "LazyLoad"]
+
+import operator
+import threading
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Set, Type
+
+
+class LazyLoad:
+    """
+    Slots of a lazily loaded Model, and whether each has been loaded yet.
+
+    Slots are named by their dotted path from the top of the Model, as in `ArtefactPlan.artefact_paths`. A slot is
+    either a single Artefact, or a Child Model that's loaded as a whole the first time it's called.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._pending: Dict[str, Callable[[], None]] = dict()
+        self._materialized: Set[str] = set()
+        self._cancel: List[Callable[[], None]] = []
+
+    @property
+    def pending(self) -> Set[str]:
+        """Slots not yet loaded"""
+        with self._lock:
+            return set(self._pending.keys())
+
+    @property
+    def materialized(self) -> Set[str]:
+        """Slots loaded so far"""
+        with self._lock:
+            return set(self._materialized)
+
+    def defer(
+        self,
+        path: str,
+        load: Callable[[], None],
+        cancel: Optional[Callable[[], None]] = None,
+    ) -> None:
+        with self._lock:
+            self._pending[path] = load
+            if cancel is not None:
+                self._cancel.append(cancel)
+
+    def materialize(self, path: Optional[str] = None) -> None:
+        """
+        Load the slot at `path`, or every slot not yet loaded if no path is given.
+        """
+        with self._lock:
+            for pending_path in list(self._pending) if path is None else [path]:
+                load = self._pending.get(pending_path)
+                if load is None:
+                    continue
+                load()
+                del self._pending[pending_path]
+                self._materialized.add(pending_path)
+
+    def cancel(self) -> None:
+        """
+        Stop loading any slots not yet loaded, i.e. as the Model is being loaded again.
+        """
+        with self._lock:
+            for cancel in self._cancel:
+                cancel()
+            self._pending.clear()
+            self._cancel.clear()
+
+
+class LazyArtefact:
+    """
+    Stands in for an Artefact that hasn't been loaded, loading it the first time it's used.
+
+    Once loaded, the Artefact replaces the LazyArtefact on the Model. References to the LazyArtefact held elsewhere
+    continue to forward to the Artefact - including comparisons, arithmetic, truth testing and hashing, so that scalar
+    Artefacts behave as the values they stand in for.
+    """
+
+    __slots__ = ("_resolve",)
+
+    def __init__(self, resolve: Callable[[], Any]) -> None:
+        object.__setattr__(self, "_resolve", resolve)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._resolve(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._resolve(), name, value)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self._resolve()(*args, **kwargs)
+
+    def __getitem__(self, key: Any) -> Any:
+        return self._resolve()[key]
+
+    def __len__(self) -> int:
+        return len(self._resolve())
+
+    def __iter__(self) -> Any:
+        return iter(self._resolve())
+
+    def __contains__(self, item: Any) -> bool:
+        return item in self._resolve()
+
+    def __bool__(self) -> bool:
+        return bool(self._resolve())
+
+    def __hash__(self) -> int:
+        return hash(self._resolve())
+
+    def __str__(self) -> str:
+        return str(self._resolve())
+
+    def __format__(self, format_spec: str) -> str:
+        return format(self._resolve(), format_spec)
+
+    def __int__(self) -> int:
+        return int(self._resolve())
+
+    def __float__(self) -> float:
+        return float(self._resolve())
+
+    def __index__(self) -> int:
+        return operator.index(self._resolve())
+
+    def __repr__(self) -> str:
+        return f"LazyArtefact({self._resolve()!r})"
+
+
+class _PendingModule:
+    """
+    Mixed into the class of a Torch Module that's waiting to be loaded, so that reading its weights loads it first.
+
+    Parameters, buffers and child modules are read through `__getattr__`, and the methods below cover reading them in
+    bulk. The Module's own class is restored before it's loaded.
+    """
+
+    __jackdaw_module_class__: Type[Any]
+
+    def __getattr__(self, name: str) -> Any:
+        _materialize_module(self)
+        return getattr(self, name)
+
+
+# Methods reading, replacing or moving a Module's weights, i.e. `.parameters()` by way of `.named_parameters()` and
+#   `.to()` by way of `._apply()`
+_MODULE_METHODS = (
+    "state_dict",
+    "load_state_dict",
+    "named_parameters",
+    "named_buffers",
+    "_apply",
+)
+
+
+def _forward_module_method(name: str) -> Callable[..., Any]:
+    def forward(self: Any, *args: Any, **kwargs: Any) -> Any:
+        _materialize_module(self)
+        return getattr(self, name)(*args, **kwargs)
+
+    return forward
+
+
+for _name in _MODULE_METHODS:
+    setattr(_PendingModule, _name, _forward_module_method(_name))
+
+_PENDING_CLASSES: Dict[Type[Any], Type[Any]] = dict()
+_PENDING_MODULES: "weakref.WeakKeyDictionary[Any, Callable[[], None]]" = (
+    weakref.WeakKeyDictionary()
+)
+_PENDING_LOCK = threading.RLock()
+
+
+def defer_module(module: Any, load: Callable[[], None]) -> None:
+    """
+    Call `load` before `module`'s weights are first read, until `restore_module` is called.
+    """
+    with _PENDING_LOCK:
+        module_class = type(module)
+        pending_class = _PENDING_CLASSES.get(module_class)
+        if pending_class is None:
+            pending_class = type(
+                module_class.__name__,
+                (_PendingModule, module_class),
+                {
+                    "__module__": module_class.__module__,
+                    "__qualname__": module_class.__qualname__,
+                    "__jackdaw_module_class__": module_class,
+                },
+            )
+            _PENDING_CLASSES[module_class] = pending_class
+        _PENDING_MODULES[module] = load
+        module.__class__ = pending_class
+
+
+def restore_module(module: Any) -> None:
+    """
+    Give a Module deferred by `defer_module` back its own class.
+    """
+    with _PENDING_LOCK:
+        _PENDING_MODULES.pop(module, None)
+        if isinstance(module, _PendingModule):
+            module.__class__ = module.__jackdaw_module_class__
+
+
+def _materialize_module(module: Any) -> None:
+    with _PENDING_LOCK:
+        load = _PENDING_MODULES.get(module)
+    if load is not None:
+        load()
+    restore_module(module)
+
+
+def _forward_binary(operation: Callable[[Any, Any], Any]) -> Callable[..., Any]:
+    def forward(self: LazyArtefact, other: Any) -> Any:
+        return operation(self._resolve(), other)
+
+    return forward
+
+
+def _forward_reflected(operation: Callable[[Any, Any], Any]) -> Callable[..., Any]:
+    def forward(self: LazyArtefact, other: Any) -> Any:
+        return operation(other, self._resolve())
+
+    return forward
+
+
+def _forward_unary(operation: Callable[[Any], Any]) -> Callable[..., Any]:
+    def forward(self: LazyArtefact) -> Any:
+        return operation(self._resolve())
+
+    return forward
+
+
+for _name in ("eq", "ne", "lt", "le", "gt", "ge"):
+    setattr(LazyArtefact, f"__{_name}__", _forward_binary(getattr(operator, _name)))
+for _name in (
+    "add",
+    "sub",
+    "mul",
+    "truediv",
+    "floordiv",
+    "mod",
+    "pow",
+    "matmul",
+    "and",
+    "or",
+    "xor",
+    "lshift",
+    "rshift",
+):
+    _operation = getattr(operator, f"{_name}_" if _name in ("and", "or") else _name)
+    setattr(LazyArtefact, f"__{_name}__", _forward_binary(_operation))
+    setattr(LazyArtefact, f"__r{_name}__", _forward_reflected(_operation))
+for _name in ("neg", "pos", "abs", "invert"):
+    setattr(LazyArtefact, f"__{_name}__", _forward_unary(getattr(operator, _name)))
@@ -1,15 +1,18 @@
+import asyncio
 import logging
-from typing import Any, Dict, List, Tuple, Type, TypeVar, Union
+import sys
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from functools import partial
+from typing import Any, Dict, List, Optional, Type, TypeVar
 
-from artefact_link import PyModelID, load_model_data
+from artefact_link import ModelData, PyModelID, load_model_data
 
-from jackdaw_ml.access_interface import AccessInterface, DefaultAccessInterface
-from jackdaw_ml.artefact_container import (SupportsArtefacts,
-                                           _detect_artefact_annotations,
-                                           _detect_artefacts, _detect_children)
-from jackdaw_ml.artefact_endpoint import ArtefactEndpoint
-from jackdaw_ml.detectors import ArtefactDetector, ChildDetector, Detector
-from jackdaw_ml.resource import Resource
+from jackdaw_ml.access_interface import AccessInterface
+from jackdaw_ml.artefact_container import SupportsArtefacts
+from jackdaw_ml.artefact_plan import ArtefactPlan, _join
+from jackdaw_ml.delta import load_artefact
+from jackdaw_ml.lazy import LazyArtefact, LazyLoad, defer_module, restore_module
 from jackdaw_ml.serializers import Serializable
 
 T = TypeVar("T")
@@ -17,102 +20,406 @@ LOGGER = logging.getLogger(__name__)
 LOGGER.setLevel("INFO")
 
 
-def _loads(
-    model_class: Union[SupportsArtefacts, Tuple[Any, AccessInterface]],
-    model_id: PyModelID,
-    endpoint: ArtefactEndpoint,
-    artefact_detectors: List[ArtefactDetector],
-    child_detectors: List[ChildDetector],
-) -> None:
-    model_data = load_model_data(
+def _load_model_data(model_id: PyModelID, plan: ArtefactPlan) -> ModelData:
+    return load_model_data(
         model_name=model_id.name,
         vcs_id=model_id.vcs_id,
         artefact_schema_id=model_id.artefact_schema_id,
-        endpoint=endpoint.endpoint,
+        endpoint=plan.endpoint.endpoint,
     )
-    if isinstance(model_class, SupportsArtefacts):
-        access_interface = DefaultAccessInterface
-        child_detectors = model_class.__child_detectors__
-        artefact_detectors = model_class.__artefact_detectors__
-        existing_artefacts: Dict[
-            str, Type[Serializable]
-        ] = model_class.__artefact_slots__
-        model_children = _detect_children(
-            model_class, child_detectors, artefact_detectors, endpoint
+
+
+def _load_artefact(
+    plan: ArtefactPlan,
+    model_class: Any,
+    model_data: ModelData,
+    artefact_name: str,
+    serializer: Type[Serializable],
+    current_item: Any,
+    memory_map: bool,
+) -> None:
+    try:
+        item = _deserialize_artefact(
+            plan, model_data, artefact_name, serializer, current_item, memory_map
         )
-        detected_artefacts = _detect_artefacts(
-            model_class, set(model_children.keys()), artefact_detectors
+    # TODO: Change from Runtime Error to custom missing artefact error
+    except RuntimeError as e:
+        LOGGER.error(f"Failed to Load '{artefact_name}': {e}")
+        return
+    _set_loaded_artefact(plan, model_class, artefact_name, item)
+
+
+async def _aload_artefact(
+    plan: ArtefactPlan,
+    model_class: Any,
+    model_data: ModelData,
+    artefact_name: str,
+    serializer: Type[Serializable],
+    current_item: Any,
+    memory_map: bool,
+) -> None:
+    # Artefacts are deserialized on a worker thread, and set on the model from the event loop's thread
+    try:
+        item = await asyncio.to_thread(
+            _deserialize_artefact,
+            plan,
+            model_data,
+            artefact_name,
+            serializer,
+            current_item,
+            memory_map,
         )
-        detected_artefacts = detected_artefacts | _detect_artefact_annotations(
-            model_class, set(model_children.keys()), artefact_detectors
+    # TODO: Change from Runtime Error to custom missing artefact error
+    except RuntimeError as e:
+        LOGGER.error(f"Failed to Load '{artefact_name}': {e}")
+        return
+    _set_loaded_artefact(plan, model_class, artefact_name, item)
+
+
+def _deserialize_artefact(
+    plan: ArtefactPlan,
+    model_data: ModelData,
+    artefact_name: str,
+    serializer: Type[Serializable],
+    current_item: Any,
+    memory_map: bool,
+) -> Any:
+    return serializer.from_resource(
+        uninitialised_item=current_item,
+        buffer=load_artefact(
+            model_data, artefact_name, plan.endpoint.endpoint, memory_map
+        )[0],
+    )
+
+
+def _set_loaded_artefact(
+    plan: ArtefactPlan, model_class: Any, artefact_name: str, item: Any
+) -> None:
+    access_interface = plan.access_interface
+    # Serializers that load in place return the existing item, which is already set on the model
+    if item is not access_interface.get_artefact(model_class, artefact_name):
+        access_interface.set_artefact(model_class, artefact_name, item)
+
+
+@dataclass
+class _SlotFilter:
+    """
+    Glob patterns over the dotted paths of artefacts, selecting which are loaded.
+    """
+
+    include: Optional[List[str]] = None
+    exclude: Optional[List[str]] = None
+
+    def wants(self, path: str) -> bool:
+        if self.include is not None and not any(
+            fnmatchcase(path, pattern) for pattern in self.include
+        ):
+            return False
+        return not any(fnmatchcase(path, pattern) for pattern in self.exclude or [])
+
+    def wants_any(self, plan: ArtefactPlan, prefix: str) -> bool:
+        """Whether any artefact on the level of the model at `prefix`, or its children, is selected"""
+        return any(
+            self.wants(_join(path, artefact_name))
+            for (path, node) in plan.nodes(prefix)
+            for artefact_name in node.load_artefacts()
         )
-    elif isinstance(model_class, Tuple):
-        model_children = _detect_children(
-            model_class, child_detectors, artefact_detectors, endpoint
+
+
+def _saved_artefacts(
+    plan: ArtefactPlan, model_data: ModelData, slots: _SlotFilter, prefix: str
+) -> Dict[str, Type[Serializable]]:
+    """Artefacts on the level of the model at `prefix` that are selected, and held by the saved Model"""
+    saved = set(model_data.artefact_slots())
+    artefacts = dict()
+    for (artefact_name, serializer) in plan.load_artefacts().items():
+        path = _join(prefix, artefact_name)
+        if not slots.wants(path):
+            continue
+        if artefact_name not in saved:
+            # i.e. Buffers of Torch Modules, which weren't saved before plain tensors were detected
+            LOGGER.info(f"'{path}' isn't held by the saved Model, so is left as is")
+            continue
+        artefacts[artefact_name] = serializer
+    return artefacts
+
+
+def _loads(
+    plan: ArtefactPlan,
+    model_class: Any,
+    model_id: PyModelID,
+    memory_map: bool = False,
+    slots: _SlotFilter = _SlotFilter(),
+    prefix: str = "",
+) -> None:
+    model_data = _load_model_data(model_id, plan)
+    access_interface = plan.access_interface
+
+    for (artefact_name, serializer) in _saved_artefacts(
+        plan, model_data, slots, prefix
+    ).items():
+        _load_artefact(
+            plan,
+            model_class,
+            model_data,
+            artefact_name,
+            serializer,
+            access_interface.get_artefact(model_class, artefact_name),
+            memory_map,
         )
-        detected_artefacts = _detect_artefacts(
-            model_class, set(model_children.keys()), artefact_detectors
+
+    for (child_name, child_plan) in plan.children.items():
+        path = _join(prefix, child_name)
+        # Children without any selected artefacts aren't fetched at all
+        if not slots.wants_any(child_plan, path):
+            continue
+        _loads(
+            child_plan,
+            access_interface.get_artefact(model_class, child_name),
+            model_data.child_id_by_slot(child_name),
+            memory_map,
+            slots,
+            path,
         )
-        (model_class, access_interface) = model_class
-        existing_artefacts = dict()
-    else:
-        raise ValueError
 
-    for (artefact_name, serializer) in (
-        detected_artefacts | existing_artefacts
+
+async def _aloads(
+    plan: ArtefactPlan,
+    model_class: Any,
+    model_id: PyModelID,
+    memory_map: bool,
+    slots: _SlotFilter,
+    prefix: str = "",
+) -> None:
+    model_data = await asyncio.to_thread(_load_model_data, model_id, plan)
+    access_interface = plan.access_interface
+
+    loading = [
+        _aload_artefact(
+            plan,
+            model_class,
+            model_data,
+            artefact_name,
+            serializer,
+            access_interface.get_artefact(model_class, artefact_name),
+            memory_map,
+        )
+        for (artefact_name, serializer) in _saved_artefacts(
+            plan, model_data, slots, prefix
+        ).items()
+    ]
+    loading.extend(
+        _aloads(
+            child_plan,
+            access_interface.get_artefact(model_class, child_name),
+            model_data.child_id_by_slot(child_name),
+            memory_map,
+            slots,
+            _join(prefix, child_name),
+        )
+        for (child_name, child_plan) in plan.children.items()
+        if slots.wants_any(child_plan, _join(prefix, child_name))
+    )
+    await asyncio.gather(*loading)
+
+
+def _lazy_loads(
+    plan: ArtefactPlan,
+    model_class: Any,
+    model_id: PyModelID,
+    memory_map: bool,
+    lazy_load: LazyLoad,
+    slots: _SlotFilter,
+    prefix: str = "",
+) -> None:
+    model_data = _load_model_data(model_id, plan)
+    access_interface = plan.access_interface
+
+    for (artefact_name, serializer) in _saved_artefacts(
+        plan, model_data, slots, prefix
     ).items():
+        path = _join(prefix, artefact_name)
+        current_item = access_interface.get_artefact(model_class, artefact_name)
+        if isinstance(current_item, LazyArtefact):
+            current_item = None
+        lazy_load.defer(
+            path,
+            partial(
+                _load_artefact,
+                plan,
+                model_class,
+                model_data,
+                artefact_name,
+                serializer,
+                current_item,
+                memory_map,
+            ),
+        )
         try:
             access_interface.set_artefact(
                 model_class,
                 artefact_name,
-                serializer.from_resource(
-                    uninitialised_item=access_interface.get_artefact(
-                        model_class, artefact_name
-                    ),
-                    buffer=Resource.from_artefact(
-                        model_data.artefact_by_slot(artefact_name)
-                    ),
+                LazyArtefact(
+                    partial(
+                        _resolve_artefact,
+                        lazy_load,
+                        path,
+                        access_interface,
+                        model_class,
+                        artefact_name,
+                    )
                 ),
             )
-        # TODO: Change from Runtime Error to custom missing artefact error
-        except RuntimeError as e:
-            LOGGER.error(f"Failed to Load '{artefact_name}': {e}")
-            pass
+        except TypeError:
+            # Some containers only accept items of specific types, i.e. Torch Modules only accept Parameters in place
+            #   of Parameters. These are loaded immediately.
+            lazy_load.materialize(path)
 
-    for (child_name, child_interface) in model_children.items():
+    for (child_name, child_plan) in plan.children.items():
+        path = _join(prefix, child_name)
+        if not slots.wants_any(child_plan, path):
+            continue
         child = access_interface.get_artefact(model_class, child_name)
-        child_model_id = model_data.child_id_by_slot(child_name)
-        if (
-            isinstance(child, SupportsArtefacts)
-            and child_interface is DefaultAccessInterface
-        ):
-            _loads(
-                child,
-                child_model_id,
-                child.__artefact_endpoint__,
-                artefact_detectors,
-                child_detectors,
+        child_id = model_data.child_id_by_slot(child_name)
+        if _is_callable_module(child):
+            # Torch Modules are loaded as a whole the first time they're called, or their weights are read
+            hook = child.register_forward_pre_hook(
+                partial(_materialize_hook, lazy_load, path)
             )
-        else:
-            _loads(
-                (child, child_interface),
-                child_model_id,
-                endpoint,
-                artefact_detectors,
-                child_detectors,
+            defer_module(child, partial(lazy_load.materialize, path))
+            lazy_load.defer(
+                path,
+                partial(
+                    _load_hooked_child,
+                    hook,
+                    child_plan,
+                    child,
+                    child_id,
+                    memory_map,
+                    slots,
+                    path,
+                ),
+                partial(_cancel_hooked_child, hook, child),
             )
+        else:
+            _lazy_loads(child_plan, child, child_id, memory_map, lazy_load, slots, path)
+
+
+def _is_callable_module(item: Any) -> bool:
+    # Torch is only imported if the model uses it. Containers such as ModuleDict are indexed rather than called.
+    torch = sys.modules.get("torch")
+    return (
+        torch is not None
+        and isinstance(item, torch.nn.Module)
+        and type(item).forward is not torch.nn.Module.forward
+    )
+
+
+def _resolve_artefact(
+    lazy_load: LazyLoad,
+    path: str,
+    access_interface: Type[AccessInterface],
+    model_class: Any,
+    artefact_name: str,
+) -> Any:
+    lazy_load.materialize(path)
+    return access_interface.get_artefact(model_class, artefact_name)
+
+
+def _materialize_hook(lazy_load: LazyLoad, path: str, *_: Any) -> None:
+    lazy_load.materialize(path)
+
+
+def _load_hooked_child(
+    hook: Any,
+    plan: ArtefactPlan,
+    model_class: Any,
+    model_id: PyModelID,
+    memory_map: bool,
+    slots: _SlotFilter,
+    prefix: str,
+) -> None:
+    restore_module(model_class)
+    _loads(plan, model_class, model_id, memory_map, slots, prefix)
+    hook.remove()
+
+
+def _cancel_hooked_child(hook: Any, model_class: Any) -> None:
+    hook.remove()
+    restore_module(model_class)
+
+
+def _cancel_lazy_load(model_class: SupportsArtefacts) -> None:
+    previous_load: Optional[LazyLoad] = getattr(model_class, "__lazy_load__", None)
+    if previous_load is not None:
+        previous_load.cancel()
+        setattr(model_class, "__lazy_load__", None)
 
 
 # TODO: Rename loads to load_model to make clearer from the loads module.
 # TODO: Add typing to loads function
-def loads(model_class: SupportsArtefacts, model_id: PyModelID) -> None:
+def loads(
+    model_class: SupportsArtefacts,
+    model_id: PyModelID,
+    memory_map: bool = False,
+    lazy: bool = False,
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+) -> Optional[LazyLoad]:
+    """
+    Load a saved Model into `model_class`.
+
+    :param model_class: Model initialised via @artefacts
+    :param model_id: ID of the saved Model
+    :param memory_map: If set, artefacts are memory mapped rather than read into memory. Tensors are built directly
+        over the mapping, so processes loading the same model from a local endpoint share its memory through the OS
+        page cache. Artefacts from a remote endpoint are downloaded first, and each process maps its own copy.
+    :param lazy: If set, artefacts are only deserialized when first used, and Torch Modules only fetched when first
+        called or when their weights are first read, i.e. through `state_dict()` or `parameters()`. Returns a
+        `LazyLoad`, reporting which slots have been loaded so far.
+    :param include: If set, only artefacts whose dotted path matches one of these glob patterns are loaded, i.e.
+        `["encoder.*"]`. Paths are as provided by `ArtefactPlan.artefact_paths`. Child Models without any selected
+        artefacts aren't fetched, though the artefacts of each Model that is fetched are all downloaded.
+    :param exclude: Artefacts whose dotted path matches one of these glob patterns are not loaded.
+    """
     if isinstance(model_class, SupportsArtefacts):
-        _loads(
+        _cancel_lazy_load(model_class)
+        plan = ArtefactPlan.for_model(model_class)
+        slots = _SlotFilter(include, exclude)
+        if not lazy:
+            _loads(plan, model_class, model_id, memory_map, slots)
+            return None
+        lazy_load = LazyLoad()
+        setattr(model_class, "__lazy_load__", lazy_load)
+        _lazy_loads(plan, model_class, model_id, memory_map, lazy_load, slots)
+        return lazy_load
+    else:
+        raise ValueError(
+            "Model Class provided must be initialised via @artefacts before calling loads or save"
+        )
+
+
+async def aloads(
+    model_class: SupportsArtefacts,
+    model_id: PyModelID,
+    memory_map: bool = False,
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+) -> None:
+    """
+    Load a saved Model into `model_class` without blocking the event loop.
+
+    Artefacts are fetched and deserialized on worker threads, and set on the model from the event loop's thread.
+    Sibling children are loaded concurrently. Arguments are as for `loads`.
+    """
+    if isinstance(model_class, SupportsArtefacts):
+        _cancel_lazy_load(model_class)
+        await _aloads(
+            ArtefactPlan.for_model(model_class),
             model_class,
             model_id,
-            model_class.__artefact_endpoint__,
-            model_class.__artefact_detectors__,
-            model_class.__child_detectors__,
+            memory_map,
+            _SlotFilter(include, exclude),
         )
     else:
         raise ValueError(
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+__all__ = ["MetricCollector"]
+
+import logging
+import multiprocessing
+import threading
+from multiprocessing.context import BaseContext
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+
+from jackdaw_ml.artefact_endpoint import ArtefactEndpoint
+from jackdaw_ml.metric_logging import MetricLogger, MetricSink
+from jackdaw_ml.run_id import RunID
+
+LOGGER = logging.getLogger(__name__)
+
+
+class MetricCollector:
+    """
+    Gathers metrics logged by child processes, i.e. DataLoader workers, into the run of the parent process.
+
+    Child processes send their metrics in batches over a queue, and the collector sends them on to the endpoint from
+    the parent - so that training across many processes is recorded as one run, with one writer to the endpoint.
+
+    ```python
+    with MetricCollector() as collector:
+        loader = DataLoader(dataset, num_workers=4, worker_init_fn=collector.sink.attach)
+        ...
+    ```
+    """
+
+    def __init__(
+        self,
+        endpoint: Optional[ArtefactEndpoint] = None,
+        context: Optional[BaseContext] = None,
+    ):
+        self.endpoint = ArtefactEndpoint.default() if endpoint is None else endpoint
+        context = multiprocessing.get_context() if context is None else context
+        self.sink = MetricSink(context.Queue(), RunID.uuid(RunID.id(self.endpoint)))
+        self._loggers: Dict[Tuple[str, str], MetricLogger] = dict()
+        self._thread: Optional[threading.Thread] = None
+        self.collected = 0
+
+    def start(self) -> MetricCollector:
+        self.sink.attach()
+        self._thread = threading.Thread(
+            target=self._collect, name="jackdaw_metric_collector", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop collecting, sending every metric received so far to the endpoint. Child processes should have exited.
+        """
+        if self._thread is None:
+            return
+        self.sink.queue.put(None)
+        self._thread.join()
+        self._thread = None
+        MetricSink._attached = None
+        RunID._shared_id = None
+        for logger in self._loggers.values():
+            logger.queue.flush()
+
+    def _collect(self) -> None:
+        while True:
+            message = self.sink.queue.get()
+            if message is None:
+                return
+            (model_name, model_uuid, metrics) = message
+            logger = self._loggers.get((model_name, model_uuid))
+            if logger is None:
+                logger = MetricLogger(model_name, UUID(model_uuid), self.endpoint)
+                self._loggers[(model_name, model_uuid)] = logger
+            logger.queue.extend(metrics)
+            self.collected += len(metrics)
+
+    def __enter__(self) -> MetricCollector:
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
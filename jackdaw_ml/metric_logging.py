@@ -1,45 +1,356 @@
-__all__ = ["MetricLogger"]
+from __future__ import annotations
 
+__all__ = ["MetricLogger", "MetricSink"]
+
+import atexit
 import datetime
-from typing import List, Tuple
+import itertools
+import logging
+import multiprocessing.util
+import os
+import pathlib
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import UUID
 
+import numpy as np
 from artefact_link import PyModelRun
 
 from jackdaw_ml.artefact_endpoint import ArtefactEndpoint
+from jackdaw_ml.metric_wal import (MetricWAL, _RunInfo, default_wal_directory,
+                                   replay_metrics)
 from jackdaw_ml.run_id import RunID
 from jackdaw_ml.vcs import get_vcs_info
 
+LOGGER = logging.getLogger(__name__)
+
+# Longest wait between attempts to send metrics to an endpoint that's failing
+_MAX_RETRY_INTERVAL = 60.0
+
+Metric = Tuple[datetime.datetime, str, float]
+
 
 class MetricQueue:
     """
-    Queueing System to allow for remotely sending logs in batches, if required.
+    Queueing System to send logs to the endpoint in batches, from a background thread.
+
+    A batch is sent once `max_size` metrics are queued, or every `flush_interval` seconds, whichever comes first, and
+    any metrics still queued are sent when the process exits. Failed sends are retried with exponential backoff.
 
-    By default, has a max_size of 1 - acting like no queue exists at all.
+    Given a `wal`, each metric is also appended to it as it's queued, and the log is synced to disk once per batch
+    before the batch is sent. Metrics that fail to send, or are still queued when the process dies, are then sent on by
+    `replay_metrics`. If the endpoint can't keep up and `max_pending` metrics are queued, further metrics are only
+    written to the log, and read back into the queue as it drains - so memory stays bounded without holding up
+    training or losing metrics. Without a log, `log` instead blocks for up to `block_timeout` seconds for the queue to
+    drain, then drops the metrics it was given.
     """
 
     def __init__(
-        self, endpoint: ArtefactEndpoint, model_run: PyModelRun, max_size: int = 1
+        self,
+        endpoint: ArtefactEndpoint,
+        model_run: PyModelRun,
+        max_size: int = 1024,
+        flush_interval: float = 1.0,
+        max_pending: int = 1_000_000,
+        wal: Optional[MetricWAL] = None,
+        block_timeout: float = 10.0,
     ):
         self.model_run = model_run
+        self.wal = wal
         self.endpoint: ArtefactEndpoint = endpoint
-        self._inner: List[Tuple[datetime.datetime, str, float]] = list()
+        self._inner: List[Metric] = list()
         self._max_size: int = max_size
+        self._flush_interval: float = flush_interval
+        self._max_pending: int = max(max_pending, max_size)
+        self._block_timeout: float = block_timeout
+        self._dropped: int = 0
+        # Offset in the log of the first metric that's been written to the log, but not queued
+        self._spilled_from: Optional[int] = None
+        # Guards the queue; notified when it fills or drains
+        self._condition = threading.Condition()
+        # Held while a batch is sent, so that batches arrive in order
+        self._send_lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        self._closed = False
+        atexit.register(self.close)
 
     def flush(self) -> None:
-        self.model_run.save_metrics(self.endpoint.endpoint, self._inner)
-        self._inner = list()
+        """Send every queued metric to the endpoint"""
+        with self._send_lock:
+            with self._condition:
+                (batch, self._inner) = (self._inner, list())
+                wal_end = self._queued_end()
+                self._condition.notify_all()
+            if not batch:
+                return
+            try:
+                if self.wal is not None:
+                    self.wal.sync()
+                with self.endpoint.registry_lock():
+                    self.model_run.save_metrics(self.endpoint.endpoint, batch)
+            except Exception:
+                # Queue the batch to be sent again
+                with self._condition:
+                    self._inner[:0] = batch
+                raise
+            if self.endpoint.is_local():
+                from jackdaw_ml.search.cache import invalidate_metric_searches
+
+                # Searches filtered by metrics may now match other Models
+                invalidate_metric_searches()
+            if self.wal is not None:
+                with self._condition:
+                    moved = self.wal.commit(wal_end)
+                    if self._spilled_from is not None:
+                        self._spilled_from -= moved
+                        self._requeue_spilled()
+
+    def _queued_end(self) -> int:
+        """Offset in the log following the last queued metric"""
+        if self.wal is None:
+            return 0
+        return self._spilled_from if self._spilled_from is not None else self.wal.tell()
+
+    def _requeue_spilled(self) -> None:
+        (metrics, offset) = self.wal.read(
+            self._spilled_from, self._max_pending - len(self._inner)
+        )
+        self._inner.extend(metrics)
+        self._spilled_from = offset if offset < self.wal.tell() else None
+        if self._spilled_from is None:
+            LOGGER.info("Metric queue has caught up with the metric log")
 
     def log(self, metric_name: str, metric_value: float) -> None:
-        self._inner.append((datetime.datetime.now(), metric_name, metric_value))
-        if len(self._inner) >= self._max_size:
+        self.extend([(datetime.datetime.now(), metric_name, metric_value)])
+
+    def extend(self, metrics: List[Metric]) -> None:
+        """Queue metrics that have already been timestamped"""
+        with self._condition:
+            if self.wal is not None:
+                self._spill_or_queue(metrics)
+            elif self._wait_for_room(len(metrics)):
+                self._inner.extend(metrics)
+            else:
+                self._drop(metrics)
+                return
+            if self._flusher is None and not self._closed:
+                self._flusher = threading.Thread(
+                    target=self._flush_periodically,
+                    name="jackdaw_metric_flusher",
+                    daemon=True,
+                )
+                self._flusher.start()
+            if len(self._inner) >= self._max_size:
+                self._condition.notify_all()
+
+    def _full(self, count: int) -> bool:
+        # A queue that's empty takes `count` metrics however many there are
+        return bool(self._inner) and len(self._inner) + count > self._max_pending
+
+    def _spill_or_queue(self, metrics: List[Metric]) -> None:
+        if self._spilled_from is None and self._full(len(metrics)):
+            LOGGER.warning(
+                "Metric queue is full, holding further metrics in the metric log until the endpoint catches up"
+            )
+            self._spilled_from = self.wal.tell()
+        self.wal.append(metrics)
+        # Once metrics are spilled, later metrics are spilled too so that they're sent in order
+        if self._spilled_from is None:
+            self._inner.extend(metrics)
+
+    def _wait_for_room(self, count: int) -> bool:
+        """Wait for room in the queue for `count` metrics, returning whether there's room"""
+        deadline = time.monotonic() + self._block_timeout
+        while self._full(count):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self._condition.wait(remaining)
+        return True
+
+    def _drop(self, metrics: List[Metric]) -> None:
+        if not self._dropped:
+            LOGGER.warning(
+                f"Metric queue still full after {self._block_timeout}s, dropping metrics until the endpoint catches up"
+            )
+        self._dropped += len(metrics)
+
+    def log_many(
+        self,
+        metric_name: str,
+        metric_values: np.ndarray,
+        steps: Optional[np.ndarray] = None,
+    ) -> None:
+        """
+        Queue an array of values for one metric at once.
+
+        Every value is timestamped with the time it's logged. Values are queued in the order of `steps` where given,
+        and otherwise in the order of `metric_values`; the steps themselves aren't stored, as metrics hold no step.
+        """
+        values = np.asarray(metric_values, dtype=np.float64).ravel()
+        if steps is not None:
+            steps = np.asarray(steps).ravel()
+            if len(steps) != len(values):
+                raise ValueError(
+                    f"Received {len(values)} values for {len(steps)} steps of {metric_name}"
+                )
+            values = values[np.argsort(steps, kind="stable")]
+        # Conversion to Python objects happens in bulk, rather than per value
+        self.extend(
+            list(
+                zip(
+                    itertools.repeat(datetime.datetime.now()),
+                    itertools.repeat(metric_name),
+                    values.tolist(),
+                )
+            )
+        )
+
+    def close(self) -> None:
+        """Stop the background thread, sending any metrics still queued"""
+        with self._condition:
+            if self._closed and self._flusher is None:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        try:
             self.flush()
+            # Metrics spilled to the log are queued again as each batch is sent
+            while self._inner:
+                self.flush()
+        finally:
+            if self.wal is not None:
+                self.wal.close()
+            if self._dropped:
+                LOGGER.warning(
+                    f"Dropped {self._dropped} metrics while the queue was full"
+                )
 
+    def _flush_periodically(self) -> None:
+        failures = 0
+        while True:
+            with self._condition:
+                if not self._closed and len(self._inner) < self._max_size:
+                    self._condition.wait(self._flush_interval)
+                if self._closed:
+                    return
+            try:
+                self.flush()
+            except Exception:
+                failures += 1
+                retry_interval = min(
+                    self._flush_interval * 2**failures, _MAX_RETRY_INTERVAL
+                )
+                if failures == 1:
+                    LOGGER.exception("Failed to send metrics, retrying")
+                else:
+                    LOGGER.debug(
+                        f"Failed to send metrics {failures} times, retrying in {retry_interval}s",
+                        exc_info=True,
+                    )
+                # Not woken by metrics filling the queue, so that retries are only as frequent as the backoff allows
+                deadline = time.monotonic() + retry_interval
+                with self._condition:
+                    while (
+                        not self._closed
+                        and (remaining := deadline - time.monotonic()) > 0
+                    ):
+                        self._condition.wait(remaining)
+                continue
+            if failures:
+                LOGGER.info(f"Sent metrics after {failures} failed attempts")
+                failures = 0
 
-class MetricLogger:
-    def __init__(self, model_name: str, model_uuid: UUID, endpoint: ArtefactEndpoint):
-        run_id = RunID.id(endpoint)
-        vcs_info = get_vcs_info()
+
+def _replay_metrics(endpoint: ArtefactEndpoint, directory: pathlib.Path) -> None:
+    try:
+        replayed = replay_metrics(endpoint, directory)
+    except Exception:
+        LOGGER.exception("Failed to replay metrics from earlier runs")
+        return
+    if replayed:
+        LOGGER.info(f"Replayed {replayed} metrics from earlier runs")
+
+
+class MetricSink:
+    """
+    The end of a `MetricCollector` that child processes send their metrics to.
+
+    Once attached in a child process, metrics logged in that process are sent to the collector in the parent, rather
+    than to an endpoint. Child processes started by `fork` inherit the sink of a running collector; other child
+    processes need to call `attach` when they start, i.e. by passing `sink.attach` as a DataLoader's `worker_init_fn`.
+    """
+
+    _attached: Optional[MetricSink] = None
+
+    def __init__(self, queue: multiprocessing.Queue, run_id: str):
+        self.queue = queue
+        self.run_id = run_id
+        # Metrics logged in the collector's own process go to the endpoint directly
+        self.pid = os.getpid()
+
+    def attach(self, worker_id: Optional[int] = None) -> None:
+        """
+        Send metrics logged in this process to the collector. Accepts a worker ID so as to be usable as a
+        `worker_init_fn`.
+        """
+        MetricSink._attached = self
+        RunID._shared_id = self.run_id
+
+    @staticmethod
+    def attached() -> Optional[MetricSink]:
+        """The sink metrics logged in this process are sent to, if this is a child of a collecting process"""
+        sink = MetricSink._attached
+        return sink if sink is not None and sink.pid != os.getpid() else None
+
+
+class _ForwardingRun:
+    """Stands in for the `PyModelRun` of a child process, sending each batch of metrics on to the collector"""
+
+    def __init__(self, sink: MetricSink, model_name: str, model_uuid: UUID):
+        self.sink = sink
+        self.model_name = model_name
+        self.model_uuid = str(model_uuid)
+
+    def save_metrics(self, endpoint: Any, metrics: List[Metric]) -> None:
+        self.sink.queue.put((self.model_name, self.model_uuid, metrics))
+
+
+# Queues of each Model Run in this process. The endpoint registers a Model Run once per run, Model name and VCS Info,
+#   so every logger for the same Model in a run shares its queue.
+_MODEL_RUN_QUEUES: Dict[Tuple[str, str, str], MetricQueue] = dict()
+_MODEL_RUN_QUEUES_LOCK = threading.Lock()
+
+
+def _reset_model_run_queues_lock() -> None:
+    # A process forked while another thread creates a queue would otherwise inherit the lock held, and never
+    #   acquire it. The parent's queues are keyed on the parent's run, which the child doesn't share.
+    global _MODEL_RUN_QUEUES_LOCK
+    _MODEL_RUN_QUEUES_LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_model_run_queues_lock)
+
+
+def _model_run_queue(
+    model_name: str,
+    model_uuid: UUID,
+    endpoint: ArtefactEndpoint,
+    wal_directory: Optional[pathlib.Path],
+) -> MetricQueue:
+    run_id = RunID.id(endpoint)
+    vcs_info = get_vcs_info()
+    key = (RunID.uuid(run_id), model_name, vcs_info.id().as_hex_string())
+    with _MODEL_RUN_QUEUES_LOCK:
+        queue = _MODEL_RUN_QUEUES.get(key)
+        if queue is not None:
+            return queue
         model_run = PyModelRun(
             endpoint=endpoint.endpoint,
             run_id=run_id,
@@ -47,7 +358,46 @@ class MetricLogger:
             model_name=model_name,
             vcs=vcs_info,
         )
-        self.queue = MetricQueue(endpoint, model_run)
+        wal_directory = (
+            default_wal_directory() if wal_directory is None else wal_directory
+        )
+        wal = MetricWAL(
+            wal_directory / f"{uuid.uuid4()}.wal",
+            _RunInfo.from_run(
+                endpoint, run_id, str(model_uuid), model_name, vcs_info
+            ),
+        )
+        # Send on metrics left behind by earlier processes, without holding up this one
+        threading.Thread(
+            target=_replay_metrics,
+            args=(endpoint, wal_directory),
+            name="jackdaw_metric_replay",
+            daemon=True,
+        ).start()
+        queue = MetricQueue(endpoint, model_run, wal=wal)
+        _MODEL_RUN_QUEUES[key] = queue
+        return queue
+
+
+class MetricLogger:
+    def __init__(
+        self,
+        model_name: str,
+        model_uuid: UUID,
+        endpoint: ArtefactEndpoint,
+        wal_directory: Optional[pathlib.Path] = None,
+    ):
+        self.pid = os.getpid()
+        sink = MetricSink.attached()
+        if sink is not None:
+            self.queue = MetricQueue(
+                endpoint, _ForwardingRun(sink, model_name, model_uuid)
+            )
+            # Child processes of `multiprocessing` exit without running `atexit` handlers, so queued metrics are sent
+            #   on by a finalizer instead - ahead of the finalizer that flushes the queue to the collector.
+            multiprocessing.util.Finalize(None, self.queue.close, exitpriority=10)
+            return
+        self.queue = _model_run_queue(model_name, model_uuid, endpoint, wal_directory)
 
     def __enter__(self):
         return self.queue
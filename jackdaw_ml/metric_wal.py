@@ -0,0 +1,361 @@
+from __future__ import annotations
+
+__all__ = ["MetricWAL", "replay_metrics"]
+
+import datetime
+import itertools
+import json
+import logging
+import os
+import pathlib
+import struct
+import zlib
+from dataclasses import asdict, dataclass
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+from artefact_link import PyModelRun, PyRemoteRepository, PyRunID, PyVcsInfo
+
+from jackdaw_ml.artefact_endpoint import ArtefactEndpoint
+from jackdaw_ml.run_id import RunID
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore
+
+try:
+    import msvcrt
+except ImportError:  # pragma: no cover - everywhere but Windows
+    msvcrt = None  # type: ignore
+
+LOGGER = logging.getLogger(__name__)
+
+Metric = Tuple[datetime.datetime, str, float]
+
+_MAGIC = b"JDMWAL01"
+# Offset of the first record not yet sent to the endpoint, and the length of the encoded run
+_HEADER = struct.Struct("<QI")
+# Each record is a CRC of the rest of the record, then its timestamp in microseconds since the epoch, its value, and
+#   the length of the metric name that follows.
+_CRC = struct.Struct("<I")
+_RECORD = struct.Struct("<qdH")
+_COMMITTED = struct.Struct("<Q")
+_EPOCH = datetime.datetime(1970, 1, 1)
+# A record that never passes its CRC, ending the log wherever it's written
+_END_OF_LOG = bytes(_CRC.size + _RECORD.size)
+# Sent metrics are dropped from the front of a log once they take up this many bytes
+_COMPACT_SIZE = 1 << 20
+# Metrics are read back from a log in chunks of this many bytes
+_READ_SIZE = 1 << 20
+# Windows locks block reads of the locked range from other handles, so the byte locked is well past any record
+_WINDOWS_LOCK_OFFSET = 1 << 62
+
+
+def default_wal_directory() -> pathlib.Path:
+    return pathlib.Path.home() / ".artefact_metric_log"
+
+
+def _try_lock(file: BinaryIO) -> bool:
+    """Take an exclusive lock on a log without waiting, returning whether it was taken"""
+    if fcntl is not None:
+        try:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        return True
+    if msvcrt is not None:  # pragma: no cover - Windows
+        position = file.tell()
+        file.seek(_WINDOWS_LOCK_OFFSET)
+        try:
+            msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+        finally:
+            file.seek(position)
+        return True
+    return False
+
+
+@dataclass
+class _RunInfo:
+    """Everything needed to rebuild the `PyModelRun` that metrics in a WAL belong to, and the endpoint it's on"""
+
+    endpoint: Optional[str]
+    run_id: str
+    model_uuid: str
+    model_name: str
+    sha: str
+    branch: str
+    remote: Optional[Tuple[str, str, str]]
+
+    @staticmethod
+    def from_run(
+        endpoint: ArtefactEndpoint,
+        run_id: PyRunID,
+        model_uuid: str,
+        model_name: str,
+        vcs_info: PyVcsInfo,
+    ) -> _RunInfo:
+        remote = vcs_info.remote_repository
+        return _RunInfo(
+            endpoint=endpoint.identity(),
+            run_id=RunID.uuid(run_id),
+            model_uuid=model_uuid,
+            model_name=model_name,
+            sha=vcs_info.sha,
+            branch=vcs_info.branch,
+            remote=(remote.resource, remote.repository, remote.owner)
+            if remote is not None
+            else None,
+        )
+
+    def model_run(self, endpoint: ArtefactEndpoint) -> PyModelRun:
+        return PyModelRun(
+            endpoint=endpoint.endpoint,
+            run_id=PyRunID.from_existing(self.run_id),
+            model_uuid=self.model_uuid,
+            model_name=self.model_name,
+            vcs=PyVcsInfo(
+                self.sha,
+                self.branch,
+                PyRemoteRepository(*self.remote) if self.remote is not None else None,
+            ),
+        )
+
+
+class MetricWAL:
+    """
+    Local log of metrics, so that metrics survive failures to reach the endpoint and process crashes.
+
+    Each metric is appended as a compact binary record. Records are made durable in batches by `sync`, and marked as
+    sent by `commit` once they've reached the endpoint. Sent records are dropped from the log: it's truncated once
+    every record is sent, and otherwise compacted once `compact_size` bytes of sent records build up. Logs left behind
+    by a process that exited without sending every metric are sent on by `replay_metrics`.
+
+    The log starts with a header holding the offset of the first unsent record, and the run its metrics belong to.
+    """
+
+    def __init__(
+        self, path: pathlib.Path, run_info: _RunInfo, compact_size: int = _COMPACT_SIZE
+    ):
+        self.path = path
+        self.compact_size = compact_size
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # The log is only given its name once locked and complete, so that `replay_metrics` never sees it half written
+        partial_path = path.with_suffix(".partial")
+        self._file = open(partial_path, "w+b")
+        # Held for the life of the log, so that `replay_metrics` skips logs still in use
+        _try_lock(self._file)
+        encoded_run = json.dumps(asdict(run_info)).encode()
+        self._start = len(_MAGIC) + _HEADER.size + len(encoded_run)
+        self._file.write(_MAGIC + _HEADER.pack(self._start, len(encoded_run)))
+        self._file.write(encoded_run)
+        self._file.flush()
+        partial_path.rename(path)
+        self._end = self._start
+        self._committed = self._start
+
+    def append(self, metrics: List[Metric]) -> int:
+        """
+        Append metrics to the log, returning the offset following them. Metrics aren't durable until `sync`.
+        """
+        records = bytearray()
+        for (timestamp, name, value) in metrics:
+            records += _encode(timestamp, name, value)
+        self._file.write(records)
+        self._end += len(records)
+        return self._end
+
+    def sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def tell(self) -> int:
+        """Offset following the last appended metric"""
+        return self._end
+
+    def read(self, offset: int, count: int) -> Tuple[List[Metric], int]:
+        """
+        Read up to `count` metrics appended from `offset` on, returning them alongside the offset following them.
+        """
+        self._file.flush()
+        metrics: List[Metric] = []
+        try:
+            while len(metrics) < count and offset < self._end:
+                self._file.seek(offset)
+                chunk = self._file.read(min(self._end - offset, _READ_SIZE))
+                chunk_end = 0
+                for (metric, chunk_end) in itertools.islice(
+                    _records(chunk, 0), count - len(metrics)
+                ):
+                    metrics.append(metric)
+                if chunk_end == 0:
+                    raise ValueError(f"Unreadable metric at {offset} in {self.path}")
+                offset += chunk_end
+        finally:
+            self._file.seek(self._end)
+        return metrics, offset
+
+    def commit(self, offset: int) -> int:
+        """
+        Mark every metric before `offset` as sent to the endpoint, dropping them from the log. Returns how far the
+        metrics left in the log moved towards its start, which offsets into the log must be adjusted by.
+        """
+        if offset <= self._committed:
+            return 0
+        self._file.flush()
+        if offset == self._end:
+            self._file.truncate(self._start)
+            self._file.seek(self._start)
+            self._end = self._start
+            offset = self._start
+        elif offset - self._start >= max(
+            self.compact_size, self._end - offset + len(_END_OF_LOG)
+        ):
+            self._compact(offset)
+            return offset - self._start
+        self._committed = offset
+        _write_committed(self._file, offset)
+        return 0
+
+    def _compact(self, offset: int) -> None:
+        """
+        Move the metrics from `offset` on to the start of the log, over metrics already sent.
+
+        The log stays readable by `replay_metrics` throughout. The metrics moved are only written over sent metrics,
+        and are followed by a record that ends the log until it's truncated, rather than by the sent metrics behind it.
+        """
+        self._file.seek(offset)
+        unsent = self._file.read(self._end - offset)
+        _write_committed(self._file, offset)
+        os.fsync(self._file.fileno())
+        self._file.seek(self._start)
+        self._file.write(unsent + _END_OF_LOG)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        _write_committed(self._file, self._start)
+        self._end = self._start + len(unsent)
+        self._file.truncate(self._end)
+        self._file.seek(self._end)
+        self._committed = self._start
+
+    def close(self) -> None:
+        """Close the log, removing it if every metric has been sent"""
+        self.sync()
+        sent = self._committed == self._end
+        self._file.close()
+        if sent:
+            self.path.unlink(missing_ok=True)
+
+
+def _write_committed(file: BinaryIO, offset: int) -> None:
+    position = file.tell()
+    file.seek(len(_MAGIC))
+    file.write(_COMMITTED.pack(offset))
+    file.flush()
+    file.seek(position)
+
+
+def _encode(timestamp: datetime.datetime, name: str, value: float) -> bytes:
+    encoded_name = name.encode()
+    micros = (timestamp - _EPOCH) // datetime.timedelta(microseconds=1)
+    record = _RECORD.pack(micros, value, len(encoded_name)) + encoded_name
+    return _CRC.pack(zlib.crc32(record)) + record
+
+
+def _read(path: pathlib.Path) -> Tuple[_RunInfo, Iterator[Tuple[Metric, int]]]:
+    """Read the run a log belongs to, and each unsent metric alongside the offset following it"""
+    data = path.read_bytes()
+    if not data.startswith(_MAGIC):
+        raise ValueError(f"{path} is not a metric log")
+    (committed, run_length) = _HEADER.unpack_from(data, len(_MAGIC))
+    run_start = len(_MAGIC) + _HEADER.size
+    run_info = _RunInfo(**json.loads(data[run_start : run_start + run_length]))
+
+    return run_info, _records(data, committed)
+
+
+def _records(data: bytes, offset: int) -> Iterator[Tuple[Metric, int]]:
+    """Each metric in `data` from `offset` on, alongside the offset following it"""
+    while offset + _CRC.size + _RECORD.size <= len(data):
+        (crc,) = _CRC.unpack_from(data, offset)
+        record_start = offset + _CRC.size
+        (micros, value, name_length) = _RECORD.unpack_from(data, record_start)
+        end = record_start + _RECORD.size + name_length
+        # A record cut short or corrupted by a crash ends the log
+        if end > len(data) or zlib.crc32(data[record_start:end]) != crc:
+            return
+        name = data[record_start + _RECORD.size : end].decode()
+        yield (_EPOCH + datetime.timedelta(microseconds=micros), name, value), end
+        offset = end
+
+
+def _send(
+    endpoint: ArtefactEndpoint,
+    model_run: PyModelRun,
+    batch: List[Metric],
+    file: BinaryIO,
+    offset: int,
+) -> int:
+    with endpoint.registry_lock():
+        model_run.save_metrics(endpoint.endpoint, batch)
+    # Record progress, so that a replay interrupted here doesn't send these metrics again
+    _write_committed(file, offset)
+    return len(batch)
+
+
+def replay_metrics(
+    endpoint: ArtefactEndpoint,
+    directory: Optional[pathlib.Path] = None,
+    batch_size: int = 10_000,
+) -> int:
+    """
+    Send metrics left in logs by processes that exited before sending them, removing each log once sent.
+
+    Only logs of metrics bound for `endpoint` are sent, as logs of every endpoint may share a directory - so logs of
+    Endpoints built without `ArtefactEndpoint.local` or `ArtefactEndpoint.remote`, whose identity isn't known, are
+    never sent. Logs still in use by a running process are skipped, by way of the lock each process holds on its
+    logs. Where the platform has no file locks, no log can be told apart from one in use, so none are sent. Returns
+    the number of metrics sent.
+    """
+    if fcntl is None and msvcrt is None:  # pragma: no cover
+        LOGGER.warning(
+            "Metric logs can't be locked on this platform, so aren't replayed"
+        )
+        return 0
+    identity = endpoint.identity()
+    if identity is None:
+        return 0
+    directory = default_wal_directory() if directory is None else directory
+    sent = 0
+    for path in sorted(directory.glob("*.wal")):
+        with open(path, "r+b") as f:
+            if not _try_lock(f):
+                continue
+            try:
+                (run_info, records) = _read(path)
+            except (ValueError, TypeError, json.JSONDecodeError, struct.error) as e:
+                LOGGER.error(f"Skipping unreadable metric log {path}: {e}")
+                continue
+            if run_info.endpoint != identity:
+                continue
+            try:
+                model_run = run_info.model_run(endpoint)
+            except ValueError:
+                # The endpoint registers each Model Run once, so a run already registered by the process that wrote
+                #   the log can't be reopened - its metrics are recovered into a run of their own.
+                (_, run_info.run_id) = RunID.create(endpoint)
+                LOGGER.warning(
+                    f"Recovering metrics of {run_info.model_name} from {path} into run {run_info.run_id}"
+                )
+                model_run = run_info.model_run(endpoint)
+            batch: List[Metric] = []
+            for (record, offset) in records:
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    sent += _send(endpoint, model_run, batch, f, offset)
+                    batch = []
+            if batch:
+                sent += _send(endpoint, model_run, batch, f, offset)
+        path.unlink()
+    return sent
@@ -2,38 +2,89 @@ from __future__ import annotations
 
 __all__ = ["Resource"]
 
+import mmap
+import os
 import pathlib
 import tempfile
-from hashlib import md5
+from hashlib import md5, sha256
 from io import BytesIO
-from typing import Optional, SupportsBytes, Union
+from typing import Any, Optional, SupportsBytes, Union
 
 from artefact_link import PyArtefact
 
 
 class Resource:
-    inner: bytes
+    """
+    Serialized form of an Artefact.
+
+    Bytes, and any object supporting the buffer protocol such as a `memoryview` or `pyarrow.Buffer`, are wrapped
+    without being copied. Use `view` to read the Resource without copying it - `bytes(resource)` always copies
+    wrapped buffers. The view is writable only if the wrapped buffer is, i.e. a copy-on-write memory map.
+    """
+
+    inner: Union[bytes, memoryview]
     inner_hash: Optional[int]
 
-    def __init__(self, bytes_like: Union[bytes, SupportsBytes, BytesIO]):
-        if isinstance(bytes_like, SupportsBytes):
-            self.inner = bytes_like.__bytes__()
+    def __init__(self, bytes_like: Union[bytes, SupportsBytes, BytesIO, Any]):
+        if isinstance(bytes_like, bytes):
+            self.inner = bytes_like
+        elif isinstance(bytes_like, Resource):
+            self.inner = bytes_like.inner
         elif isinstance(bytes_like, BytesIO):
-            bytes_like.seek(0)
-            self.inner = bytes_like.getvalue()
+            self.inner = bytes_like.getbuffer()
+        elif isinstance(bytes_like, SupportsBytes):
+            self.inner = bytes_like.__bytes__()
         else:
-            self.inner = bytes_like
+            self.inner = memoryview(bytes_like).cast("B")
         self.inner_hash = None
 
     def __bytes__(self) -> bytes:
-        return self.inner
+        if isinstance(self.inner, bytes):
+            return self.inner
+        return self.inner.tobytes()
+
+    def __len__(self) -> int:
+        return (
+            self.inner.nbytes if isinstance(self.inner, memoryview) else len(self.inner)
+        )
 
     def __hash__(self) -> int:
         if self.inner_hash is None:
             self.inner_hash = int(md5(self.inner).hexdigest(), base=16)
         return self.inner_hash
 
+    def digest(self) -> str:
+        """SHA-256 digest of the Resource, identifying its content"""
+        return sha256(self.inner).hexdigest()
+
+    def view(self) -> memoryview:
+        """View over the Resource, without copying it"""
+        return memoryview(self.inner)
+
+    def to_file(self, filename: pathlib.Path) -> pathlib.Path:
+        with open(filename, "wb") as f:
+            f.write(self.inner)
+        return filename
+
+    @property
+    def memory_mapped(self) -> bool:
+        return isinstance(self.inner, memoryview) and isinstance(
+            self.inner.obj, mmap.mmap
+        )
+
     @staticmethod
-    def from_artefact(artefact: PyArtefact) -> Resource:
-        with tempfile.TemporaryDirectory() as t:
-            return Resource(open(artefact.path(pathlib.Path(t)), "rb").read())
+    def from_artefact(artefact: PyArtefact, memory_map: bool = False) -> Resource:
+        """
+        Read an Artefact into a Resource.
+
+        If `memory_map` is set, the Artefact is mapped into memory rather than read. The mapping is copy-on-write;
+        pages are only copied if they're written to. Artefacts held by a local endpoint are mapped where they're
+        stored, so pages are shared with every other process mapping the same Artefact through the OS page cache.
+        Artefacts from a remote endpoint are downloaded to a temporary file first, which only this process maps.
+        """
+        with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as t:
+            artefact_path = artefact.path(pathlib.Path(t))
+            with open(artefact_path, "rb") as f:
+                if memory_map and os.fstat(f.fileno()).st_size > 0:
+                    return Resource(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY))
+                return Resource(f.read())
@@ -1,25 +1,61 @@
+import re
+import uuid
 from multiprocessing import current_process
-from typing import Optional
+from typing import Optional, Tuple
 
 from artefact_link import PyRunID
 
 from jackdaw_ml.artefact_endpoint import ArtefactEndpoint
 
+# PyRunID only exposes its UUID through its representation, i.e. `RunID(<uuid>)`
+_RUN_ID_REPR = re.compile(r"RunID\((.*)\)")
+
+
+def _read_uuid(run_id: PyRunID) -> str:
+    match = _RUN_ID_REPR.fullmatch(str(run_id))
+    if match is None:
+        raise ValueError(f"Could not read the UUID of {run_id!r}")
+    # Normalized, and checked to be a UUID
+    return str(uuid.UUID(match.group(1)))
+
 
 class RunID:
     _id: Optional[PyRunID] = None
+    # UUID of `_id`, kept alongside it from when it's created
+    _uuid: Optional[str] = None
     _pid: Optional[int] = current_process().pid
+    # Set while a MetricCollector gathers the metrics of child processes into this run
+    _shared_id: Optional[str] = None
+
+    @staticmethod
+    def create(endpoint: ArtefactEndpoint) -> Tuple[PyRunID, str]:
+        """Register a new run with the endpoint, returning its ID alongside its UUID"""
+        run_id = PyRunID(endpoint.endpoint)
+        return run_id, _read_uuid(run_id)
 
     @staticmethod
     def id(endpoint: ArtefactEndpoint) -> PyRunID:
-        # If the process ID has changed, update the RunID
+        # If the process ID has changed, update the RunID - unless child processes share the parent's run
         if RunID._id is None or current_process().pid != RunID._pid:
-            RunID._id = PyRunID(endpoint.endpoint)
+            if RunID._shared_id is None:
+                (RunID._id, RunID._uuid) = RunID.create(endpoint)
+            else:
+                RunID._id = PyRunID.from_existing(RunID._shared_id)
+                RunID._uuid = RunID._shared_id
+            RunID._pid = current_process().pid
         return RunID._id
 
+    @staticmethod
+    def uuid(run_id: PyRunID) -> str:
+        """UUID of a run - kept from when the run was created for this process's own run"""
+        if run_id is RunID._id and RunID._uuid is not None:
+            return RunID._uuid
+        return _read_uuid(run_id)
+
     @staticmethod
     def reset_id() -> None:
         RunID._id = None
+        RunID._uuid = None
 
 
 def start_run() -> None:
@@ -1,17 +1,29 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
 import logging
 import pathlib
 import tempfile
-from typing import Any, Dict, List, Tuple, Type, TypeVar, Union
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import (Any, Dict, Hashable, List, Optional, Tuple, Type,
+                    TypeVar)
 from uuid import uuid4
 
-from artefact_link import LocalArtefactPath, ModelData, PyModelID
+from artefact_link import (LocalArtefactPath, LocalEndpoint, ModelData,
+                           PyModelID, PyVcsInfo, load_model_data)
 
-from jackdaw_ml.access_interface import AccessInterface, DefaultAccessInterface
-from jackdaw_ml.artefact_container import (SupportsArtefacts,
-                                           _detect_artefacts, _detect_children)
+from jackdaw_ml.artefact_container import SupportsArtefacts
 from jackdaw_ml.artefact_decorator import format_class_name
 from jackdaw_ml.artefact_endpoint import ArtefactEndpoint
-from jackdaw_ml.detectors import ArtefactDetector, ChildDetector
+from jackdaw_ml.artefact_plan import ArtefactPlan
+from jackdaw_ml.delta import DELTA_PARENT_SLOT, encode_delta, load_artefact
+from jackdaw_ml.lazy import LazyLoad
+from jackdaw_ml.resource import Resource
+from jackdaw_ml.search.cache import invalidate_search_cache
 from jackdaw_ml.serializers import Serializable
 from jackdaw_ml.vcs import get_vcs_info
 
@@ -20,83 +32,508 @@ LOGGER = logging.getLogger(__name__)
 LOGGER.setLevel("INFO")
 
 
-def _saves(
-    model_class: Union[SupportsArtefacts, Tuple[Any, AccessInterface]],
-    endpoint: ArtefactEndpoint,
-    artefact_detectors: List[ArtefactDetector],
-    child_detectors: List[ChildDetector],
-) -> PyModelID:
-    if isinstance(model_class, SupportsArtefacts):
-        access_interface = DefaultAccessInterface
-        child_detectors = model_class.__child_detectors__
-        artefact_detectors = model_class.__artefact_detectors__
-        existing_artefacts: Dict[
-            str, Type[Serializable]
-        ] = model_class.__artefact_slots__
-        model_children = _detect_children(
-            model_class, child_detectors, artefact_detectors, endpoint
+_DIGEST_CHUNK_SIZE = 1 << 20
+
+# Background saves run one after another on a single worker, so that each completes in the order it was requested.
+_BACKGROUND_EXECUTOR = ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="jackdaw_background_save"
+)
+
+
+class _SerialExecutor(Executor):
+    """
+    Executor that runs each task as soon as it is submitted.
+
+    Used when `saves` is not given an Executor, so that serial and parallel saves share one code path.
+    """
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+# Identifies a saved Model by its name, VCS ID, the digest of each of its artefacts, and the ID of each child.
+ModelKey = Tuple[
+    str, str, Tuple[Tuple[str, str], ...], Tuple[Tuple[str, str, str], ...]
+]
+
+
+@dataclass
+class _EndpointIndex:
+    """
+    Artefacts and Models already saved to an Endpoint by this process.
+
+    Artefacts are indexed by the digest of their serialized form, and point to the file the Endpoint stores them in.
+    Only local Endpoints have such files, so remote Endpoints index Models alone. Models are indexed by everything
+    that determines their Model ID - a Model matching an indexed one is not saved again.
+    """
+
+    endpoint: ArtefactEndpoint
+    artefacts: Dict[str, pathlib.Path] = field(default_factory=dict)
+    models: Dict[ModelKey, PyModelID] = field(default_factory=dict)
+
+    def stored_artefact(self, digest: str) -> Optional[pathlib.Path]:
+        stored_path = self.artefacts.get(digest)
+        if stored_path is not None and stored_path.exists():
+            return stored_path
+        return None
+
+    def add_artefacts(
+        self, model_id: PyModelID, artefact_files: List[Tuple[str, _ArtefactFile]]
+    ) -> None:
+        new_artefacts = [
+            (artefact_name, artefact_file.digest)
+            for (artefact_name, artefact_file) in artefact_files
+            if self.stored_artefact(artefact_file.digest) is None
+        ]
+        if not new_artefacts or not isinstance(self.endpoint.endpoint, LocalEndpoint):
+            return
+        with self.endpoint.registry_lock():
+            model_data = load_model_data(
+                model_name=model_id.name,
+                vcs_id=model_id.vcs_id,
+                artefact_schema_id=model_id.artefact_schema_id,
+                endpoint=self.endpoint.endpoint,
+            )
+        with tempfile.TemporaryDirectory() as td:
+            tempdir_path = pathlib.Path(td)
+            for (artefact_name, digest) in new_artefacts:
+                stored_path = pathlib.Path(
+                    model_data.artefact_by_slot(artefact_name).path(tempdir_path)
+                )
+                # Only files held by the Endpoint itself outlive this save
+                if tempdir_path not in stored_path.parents:
+                    self.artefacts[digest] = stored_path
+
+
+# Indexes of the Endpoints saved to by this process, most recently used last. Indexes are keyed on the registry behind
+#   each Endpoint, and bounded so that Endpoints no longer in use are eventually released.
+_ENDPOINT_INDEXES: OrderedDict[Hashable, _EndpointIndex] = OrderedDict()
+_ENDPOINT_INDEXES_LOCK = threading.Lock()
+_MAX_ENDPOINT_INDEXES = 16
+
+
+def _endpoint_index(endpoint: ArtefactEndpoint) -> _EndpointIndex:
+    key = endpoint.cache_key()
+    with _ENDPOINT_INDEXES_LOCK:
+        index = _ENDPOINT_INDEXES.get(key)
+        if index is None:
+            index = _ENDPOINT_INDEXES[key] = _EndpointIndex(endpoint)
+        _ENDPOINT_INDEXES.move_to_end(key)
+        while len(_ENDPOINT_INDEXES) > _MAX_ENDPOINT_INDEXES:
+            _ENDPOINT_INDEXES.popitem(last=False)
+        return index
+
+
+@dataclass
+class _DeltaParent:
+    """
+    Level of an earlier saved Model that artefacts on the same level of a new save are delta-encoded against.
+    """
+
+    model_id: PyModelID
+    model_data: ModelData
+    endpoint: ArtefactEndpoint
+    max_delta_chain: int
+
+    @staticmethod
+    def load(
+        model_id: PyModelID, endpoint: ArtefactEndpoint, max_delta_chain: int
+    ) -> _DeltaParent:
+        return _DeltaParent(
+            model_id=model_id,
+            model_data=load_model_data(
+                model_name=model_id.name,
+                vcs_id=model_id.vcs_id,
+                artefact_schema_id=model_id.artefact_schema_id,
+                endpoint=endpoint.endpoint,
+            ),
+            endpoint=endpoint,
+            max_delta_chain=max_delta_chain,
         )
-        # At this point, artefact_children have been picked up.
-        detected_artefacts = _detect_artefacts(
-            model_class, set(model_children.keys()), artefact_detectors
+
+    def child(
+        self, child_name: str, endpoint: ArtefactEndpoint
+    ) -> Optional[_DeltaParent]:
+        child_id = self.model_data.child_ids.get(child_name)
+        if child_id is None:
+            return None
+        return _DeltaParent.load(child_id, endpoint, self.max_delta_chain)
+
+    def encode(self, artefact_name: str, resource: Resource) -> Optional[Resource]:
+        if artefact_name not in self.model_data.artefact_slots():
+            return None
+        (parent, parent_chain_length) = load_artefact(
+            self.model_data, artefact_name, self.endpoint.endpoint
         )
-    elif isinstance(model_class, Tuple):
-        model_children = _detect_children(
-            model_class, child_detectors, artefact_detectors, endpoint
+        # Once a chain is long enough, the artefact is stored in full to bound the cost of rebuilding it
+        if parent_chain_length >= self.max_delta_chain:
+            return None
+        return encode_delta(resource, parent, parent_chain_length)
+
+
+@dataclass
+class _ArtefactFile:
+    path: pathlib.Path
+    digest: Optional[str]
+    delta: bool = False
+
+
+def _file_digest(filename: pathlib.Path) -> str:
+    """SHA-256 digest of a file, matching `Resource.digest` of the same bytes"""
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        while chunk := f.read(_DIGEST_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _serialize_artefact(
+    serializer: Type[Serializable], item: Any, filename: pathlib.Path
+) -> pathlib.Path:
+    # Runs on the Executor, so takes only what a `ProcessPoolExecutor` can pickle. Streamed straight to the file, so
+    #   that the serialized artefact is never held in memory.
+    return serializer.to_file(item, filename)
+
+
+def _stored_artefact(
+    artefact_name: str,
+    serializer: Type[Serializable],
+    path: pathlib.Path,
+    index: Optional[_EndpointIndex],
+    delta_parent: Optional[_DeltaParent],
+) -> _ArtefactFile:
+    delta = False
+    if delta_parent is not None and serializer.supports_delta:
+        # Delta encoding compares the serialized artefact against its parent, so needs it in memory
+        with open(path, "rb") as f:
+            encoded = delta_parent.encode(artefact_name, Resource(f.read()))
+        if encoded is not None:
+            encoded.to_file(path)
+            delta = True
+    if index is None:
+        return _ArtefactFile(path, None, delta)
+    digest = _file_digest(path)
+    stored_path = index.stored_artefact(digest)
+    if stored_path is not None:
+        path.unlink()
+        return _ArtefactFile(stored_path, digest, delta)
+    return _ArtefactFile(path, digest, delta)
+
+
+@dataclass
+class _PendingModel:
+    """
+    A Model whose artefacts have been submitted for serialization, but which has not yet been saved.
+
+    Children are saved before their parent, as the parent's `ModelData` requires the `PyModelID` of each child.
+    """
+
+    name: str
+    endpoint: ArtefactEndpoint
+    artefacts: List[Tuple[str, Type[Serializable], Future]]
+    children: Dict[str, _PendingModel]
+    index: Optional[_EndpointIndex]
+    delta_parent: Optional[_DeltaParent]
+    vcs_info: PyVcsInfo
+
+    def dumps(self) -> PyModelID:
+        child_ids = {
+            child_name: child.dumps() for (child_name, child) in self.children.items()
+        }
+        return self._save(child_ids)
+
+    async def adumps(self) -> PyModelID:
+        """
+        Save the Model without blocking the event loop, saving sibling children concurrently.
+        """
+        child_ids = await asyncio.gather(
+            *(child.adumps() for child in self.children.values())
         )
-        detected_artefacts = _detect_artefacts(
-            model_class, set(model_children.keys()), artefact_detectors
+        return await asyncio.to_thread(
+            self._save, dict(zip(self.children.keys(), child_ids))
         )
-        (model_class, access_interface) = model_class
-        existing_artefacts = dict()
-    else:
-        raise ValueError
-
-    child_ids = {}
-    for (child_name, child_interface) in model_children.items():
-        child = access_interface.get_artefact(model_class, child_name)
-        if (
-            isinstance(child, SupportsArtefacts)
-            and child_interface is DefaultAccessInterface
-        ):
-            child_ids[child_name] = _saves(
-                child, child.__artefact_endpoint__, artefact_detectors, child_detectors
-            )
-        else:
-            child_ids[child_name] = _saves(
-                (child, child_interface), endpoint, artefact_detectors, child_detectors
-            )
 
-    with tempfile.TemporaryDirectory() as td:
-        tempdir_path = pathlib.Path(td)
-        local_artefact_files: List[LocalArtefactPath] = []
-        for (artefact_name, serializer) in (
-            detected_artefacts | existing_artefacts
-        ).items():
-            item = access_interface.get_artefact(model_class, artefact_name)
-            filename = tempdir_path / f"{uuid4()}.artefact"
-            local_artefact_files.append(
-                LocalArtefactPath(artefact_name, serializer.to_file(item, filename))
+    def _save(self, child_ids: Dict[str, PyModelID]) -> PyModelID:
+        # Digests and deltas are found here rather than on the Executor, as the index and parent aren't picklable
+        artefact_files: List[Tuple[str, _ArtefactFile]] = [
+            (
+                artefact_name,
+                _stored_artefact(
+                    artefact_name,
+                    serializer,
+                    path.result(),
+                    self.index,
+                    self.delta_parent,
+                ),
             )
-        model = ModelData(
-            name=getattr(
-                model_class, "__name__", format_class_name(str(model_class.__class__))
+            for (artefact_name, serializer, path) in self.artefacts
+        ]
+        if self.delta_parent is not None and any(
+            artefact_file.delta for (_, artefact_file) in artefact_files
+        ):
+            child_ids[DELTA_PARENT_SLOT] = self.delta_parent.model_id
+        vcs_info = self.vcs_info
+        if self.index is None:
+            return self._dumps(vcs_info, artefact_files, child_ids)
+
+        model_key: ModelKey = (
+            self.name,
+            vcs_info.id().as_hex_string(),
+            tuple(
+                sorted(
+                    (artefact_name, artefact_file.digest)
+                    for (artefact_name, artefact_file) in artefact_files
+                )
             ),
-            vcs_info=get_vcs_info(),
-            local_artefacts=local_artefact_files,
+            tuple(
+                sorted(
+                    (child_name, child_id.name, child_id.artefact_schema_id.as_string())
+                    for (child_name, child_id) in child_ids.items()
+                )
+            ),
+        )
+        model_id = self.index.models.get(model_key)
+        if model_id is None:
+            model_id = self._dumps(vcs_info, artefact_files, child_ids)
+            self.index.models[model_key] = model_id
+            self.index.add_artefacts(model_id, artefact_files)
+        return model_id
+
+    def _dumps(
+        self,
+        vcs_info: PyVcsInfo,
+        artefact_files: List[Tuple[str, _ArtefactFile]],
+        child_ids: Dict[str, PyModelID],
+    ) -> PyModelID:
+        model = ModelData(
+            name=self.name,
+            vcs_info=vcs_info,
+            local_artefacts=[
+                LocalArtefactPath(artefact_name, artefact_file.path)
+                for (artefact_name, artefact_file) in artefact_files
+            ],
             children=child_ids,
         )
-        return model.dumps(endpoint.endpoint, None)  # TODO: Add RunID if present
+        with self.endpoint.registry_lock():
+            # TODO: Add RunID if present
+            model_id = model.dumps(self.endpoint.endpoint, None)
+        # Searches made before this save may no longer be complete
+        invalidate_search_cache()
+        return model_id
 
 
-def saves(model_class: SupportsArtefacts) -> PyModelID:
-    if isinstance(model_class, SupportsArtefacts):
-        return _saves(
+def _schedule_saves(
+    plan: ArtefactPlan,
+    model_class: Any,
+    executor: Executor,
+    tempdir_path: pathlib.Path,
+    deduplicate: bool,
+    delta_parent: Optional[_DeltaParent],
+    vcs_info: PyVcsInfo,
+    snapshot: bool = False,
+) -> _PendingModel:
+    index = _endpoint_index(plan.endpoint) if deduplicate else None
+    # Artefacts are submitted before descending into children, so that they serialize while children are scheduled.
+    artefact_files: List[Tuple[str, Type[Serializable], Future]] = []
+    for (artefact_name, serializer) in plan.artefacts.items():
+        item = plan.access_interface.get_artefact(model_class, artefact_name)
+        if snapshot:
+            item = serializer.snapshot(item)
+        filename = tempdir_path / f"{uuid4()}.artefact"
+        artefact_files.append(
+            (
+                artefact_name,
+                serializer,
+                executor.submit(_serialize_artefact, serializer, item, filename),
+            )
+        )
+
+    children = {
+        child_name: _schedule_saves(
+            child_plan,
+            plan.access_interface.get_artefact(model_class, child_name),
+            executor,
+            tempdir_path,
+            deduplicate,
+            delta_parent.child(child_name, child_plan.endpoint)
+            if delta_parent is not None
+            else None,
+            vcs_info,
+            snapshot,
+        )
+        for (child_name, child_plan) in plan.children.items()
+    }
+
+    return _PendingModel(
+        name=getattr(
+            model_class, "__name__", format_class_name(str(model_class.__class__))
+        ),
+        endpoint=plan.endpoint,
+        artefacts=artefact_files,
+        children=children,
+        index=index,
+        delta_parent=delta_parent,
+        vcs_info=vcs_info,
+    )
+
+
+def _schedule_model(
+    model_class: SupportsArtefacts,
+    executor: Executor,
+    tempdir_path: pathlib.Path,
+    deduplicate: bool,
+    delta_from: Optional[PyModelID],
+    max_delta_chain: int,
+    snapshot: bool = False,
+) -> _PendingModel:
+    lazy_load: Optional[LazyLoad] = getattr(model_class, "__lazy_load__", None)
+    if lazy_load is not None:
+        # Slots not yet loaded hold placeholders, which would otherwise be missed when saving
+        lazy_load.materialize()
+    plan = ArtefactPlan.for_model(model_class)
+    delta_parent = (
+        _DeltaParent.load(delta_from, plan.endpoint, max_delta_chain)
+        if delta_from is not None
+        else None
+    )
+    # VCS Info is read once for the Model and all of its children
+    return _schedule_saves(
+        plan,
+        model_class,
+        executor,
+        tempdir_path,
+        deduplicate,
+        delta_parent,
+        get_vcs_info(),
+        snapshot,
+    )
+
+
+def _saves(
+    model_class: SupportsArtefacts,
+    executor: Optional[Executor] = None,
+    deduplicate: bool = True,
+    delta_from: Optional[PyModelID] = None,
+    max_delta_chain: int = 8,
+) -> PyModelID:
+    with tempfile.TemporaryDirectory() as td:
+        pending_model = _schedule_model(
             model_class,
-            model_class.__artefact_endpoint__,
-            model_class.__artefact_detectors__,
-            model_class.__child_detectors__,
+            executor or _SerialExecutor(),
+            pathlib.Path(td),
+            deduplicate,
+            delta_from,
+            max_delta_chain,
         )
+        return pending_model.dumps()
+
+
+def saves(
+    model_class: SupportsArtefacts,
+    executor: Optional[Executor] = None,
+    deduplicate: bool = True,
+    delta_from: Optional[PyModelID] = None,
+    max_delta_chain: int = 8,
+) -> PyModelID:
+    """
+    Save a Model, returning the Model ID it was saved under.
+
+    :param model_class: Model initialised via @artefacts
+    :param executor: If set, artefacts across the model and its children are serialized in parallel on this
+        Executor, i.e. a `ThreadPoolExecutor` or `ProcessPoolExecutor`. A `ProcessPoolExecutor` requires each artefact
+        to be picklable. The Model ID returned is identical to a save without an Executor.
+    :param deduplicate: If set, artefacts and child models unchanged since an earlier save in this process are not
+        written or saved again. Serialized artefacts are compared by their digest.
+    :param delta_from: If set, tensor artefacts are stored as a compressed delta against the same artefact in this
+        earlier saved Model, when that's smaller than storing them in full. The earlier Model must stay available to
+        load this one.
+    :param max_delta_chain: Maximum number of deltas an artefact may be rebuilt from. Artefacts that would exceed this
+        are stored in full.
+    """
+    if isinstance(model_class, SupportsArtefacts):
+        return _saves(model_class, executor, deduplicate, delta_from, max_delta_chain)
+    else:
+        raise ValueError(
+            "Model Class provided must be initialised via @artefacts before calling loads or save"
+        )
+
+
+async def asaves(
+    model_class: SupportsArtefacts,
+    executor: Optional[Executor] = None,
+    deduplicate: bool = True,
+    delta_from: Optional[PyModelID] = None,
+    max_delta_chain: int = 8,
+) -> PyModelID:
+    """
+    Save a Model without blocking the event loop, returning the Model ID it was saved under.
+
+    Serialization and saving run on worker threads, and sibling children are saved concurrently. Arguments are as for
+    `saves`, and the Model ID returned is identical to one from `saves`.
+    """
+    if isinstance(model_class, SupportsArtefacts):
+        with tempfile.TemporaryDirectory() as td:
+            pending_model = await asyncio.to_thread(
+                _schedule_model,
+                model_class,
+                executor or _SerialExecutor(),
+                pathlib.Path(td),
+                deduplicate,
+                delta_from,
+                max_delta_chain,
+            )
+            return await pending_model.adumps()
+    else:
+        raise ValueError(
+            "Model Class provided must be initialised via @artefacts before calling loads or save"
+        )
+
+
+def _dumps_background(
+    pending_model: _PendingModel, tempdir: tempfile.TemporaryDirectory
+) -> PyModelID:
+    try:
+        return pending_model.dumps()
+    finally:
+        tempdir.cleanup()
+
+
+def saves_background(
+    model_class: SupportsArtefacts,
+    executor: Optional[Executor] = None,
+    deduplicate: bool = True,
+    delta_from: Optional[PyModelID] = None,
+    max_delta_chain: int = 8,
+) -> Future:
+    """
+    Save a Model in the background, returning a Future of the Model ID it was saved under.
+
+    A snapshot of every artefact is taken before returning - Torch Parameters are cloned - so the Model can continue to
+    change, i.e. through further training steps, while the snapshot is serialized and saved on a background thread.
+    Background saves complete in the order they were made. Arguments are as for `saves`.
+    """
+    if isinstance(model_class, SupportsArtefacts):
+        tempdir = tempfile.TemporaryDirectory()
+        try:
+            pending_model = _schedule_model(
+                model_class,
+                executor or _BACKGROUND_EXECUTOR,
+                pathlib.Path(tempdir.name),
+                deduplicate,
+                delta_from,
+                max_delta_chain,
+                snapshot=True,
+            )
+        except BaseException:
+            tempdir.cleanup()
+            raise
+        # Artefacts submitted to the background executor are serialized before the Model is saved.
+        return _BACKGROUND_EXECUTOR.submit(_dumps_background, pending_model, tempdir)
     else:
         raise ValueError(
             "Model Class provided must be initialised via @artefacts before calling loads or save"
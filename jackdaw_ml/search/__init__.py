@@ -1,18 +1,57 @@
 from __future__ import annotations
 
-__all__ = ["Searcher", "lookup_model_id"]
+__all__ = ["METRIC_SCHEMA", "Searcher", "lookup_model_id"]
 
+import heapq
+import itertools
+import sqlite3
+import uuid
 from dataclasses import dataclass
 from enum import Enum
-from typing import Dict, List, Set, Union
+from typing import Any, Dict, Hashable, Iterator, List, Set, Tuple, Union
 
+import numpy as np
+import pyarrow as pa
 from artefact_link import (PyMetricFilter, PyModelSearchResult, PyRunID,
                            PyVcsID, PyVcsInfo, search_for_models,
                            search_for_vcs_id, PyRemoteRepository)
 
 from jackdaw_ml.artefact_decorator import format_class_name
+from jackdaw_ml.run_id import RunID
+from jackdaw_ml.search.cache import SEARCH_CACHE
+from jackdaw_ml.search.index import connect_search_index, ensure_search_index
 from jackdaw_ml.vcs import get_vcs_info
 
+METRIC_SCHEMA = pa.schema(
+    [
+        ("run_id", pa.string()),
+        ("model_name", pa.string()),
+        ("vcs_sha", pa.string()),
+        ("branch", pa.string()),
+        ("metric_name", pa.string()),
+        ("metric_value", pa.float64()),
+        ("time", pa.timestamp("us", tz="UTC")),
+    ]
+)
+
+# Run IDs are stored as the bytes of their UUID, and formatted as in `RunID.uuid`
+_METRICS_QUERY = """
+SELECT
+  lower(substr(run_hex, 1, 8) || '-' || substr(run_hex, 9, 4) || '-' || substr(run_hex, 13, 4) || '-' ||
+    substr(run_hex, 17, 4) || '-' || substr(run_hex, 21)),
+  model_name, sha1, branch, metric_name, metric_value, time
+FROM (
+  SELECT
+    hex(model_run.run_id) AS run_hex, model_run.model_name, vcs.sha1, vcs.branch, metric.metric_name,
+    metric.metric_value, metric.time, metric.model_run_id
+  FROM metric
+  JOIN model_run ON metric.model_run_id = model_run.id
+  JOIN vcs ON model_run.vcs_id = vcs.id
+  {where}
+)
+ORDER BY time
+"""
+
 
 class Comparison(Enum):
     GT = ">"
@@ -89,6 +128,8 @@ class Searcher:
         self.repository_name: Optional[str] = None
         self.branch: Optional[str] = None
         self.include_children: bool = False
+        self.result_limit: Optional[int] = None
+        self.ordering: Optional[Tuple[str, bool]] = None
 
     def with_name(self, name: Union[str, List[str]]) -> Searcher:
         if isinstance(name, str):
@@ -140,47 +181,328 @@ class Searcher:
         self.vcs_information.append(vcs_information)
         return self
 
+    def limit(self, count: int) -> Searcher:
+        """Return at most `count` Models"""
+        self.result_limit = count
+        return self
+
+    def order_by(self, metric_name: str, descending: bool = False) -> Searcher:
+        """
+        Order Models by the latest value of a metric logged by runs of the Model at the same commit. Models without
+        the metric come last.
+        """
+        self.ordering = (metric_name, descending)
+        return self
+
     def _metric_filter(self) -> Optional[PyMetricFilter]:
         if len(self.metric_filters) == 0:
             return None
-        initial_local_metric = self.metric_filters.pop()
-        initial_metric = PyMetricFilter(
-            initial_local_metric.metric_name,
-            initial_local_metric.metric_value,
-            str(initial_local_metric.ordering),
-        )
-        for metric in self.metric_filters:
+        (initial_metric, *metrics) = [
+            PyMetricFilter(
+                metric.metric_name, metric.metric_value, str(metric.ordering)
+            )
+            for metric in self.metric_filters
+        ]
+        for metric in metrics:
             initial_metric = initial_metric.and_(metric)
         return initial_metric
 
-    def models(self) -> Set[PyModelSearchResult]:
+    def _query_key(self) -> Hashable:
+        return (
+            self.endpoint.cache_key(),
+            frozenset(self.names),
+            frozenset(RunID.uuid(run) for run in self.runs),
+            frozenset(self.metric_filters),
+            tuple(vcs.id().as_hex_string() for vcs in self.vcs_information),
+            self.repository_name,
+            self.branch,
+            self.include_children,
+        )
+
+    def models(
+        self, cache: bool = True
+    ) -> Union[Set[PyModelSearchResult], List[PyModelSearchResult]]:
+        """
+        Return a unique set of Models that match the search criteria - or, once `order_by` or `limit` is set, a list
+        of Models in order.
+
+        :param cache: If set, reuse the results of the same search made recently - see `SearchCache`.
+        """
+        if self.result_limit is not None or self.ordering is not None:
+            return list(itertools.chain.from_iterable(self.iter_models(cache=cache)))
+        return self._matching_models(cache)
+
+    def iter_models(
+        self, page_size: int = 1_000, cache: bool = True
+    ) -> Iterator[List[PyModelSearchResult]]:
         """
-        Return a unique set of Models that match the search criteria
+        Yield pages of up to `page_size` Models that match the search criteria, in the order set by `order_by`, or
+        newest first.
+
+        Local registries are read a page at a time, in order, with the ordering and `limit` applied by the registry -
+        so pages are yielded as they're read, and Models past the limit are never read. Searches of remote registries
+        can't be ordered by metrics, and are made once, then paged.
+        """
+        if self.endpoint.local_registry_path() is not None:
+            yield from self._iter_local_models(page_size)
+            return
+        if self.ordering is not None:
+            self.endpoint.require_local_registry_path(
+                "Models can only be ordered by metrics"
+            )
+        models = self._matching_models(cache)
+        newest = lambda model: -model.creation_time
+        ordered = (
+            sorted(models, key=newest)
+            if self.result_limit is None
+            else heapq.nsmallest(self.result_limit, models, key=newest)
+        )
+        for start in range(0, len(ordered), page_size):
+            yield ordered[start : start + page_size]
+
+    def _iter_local_models(self, page_size: int) -> Iterator[List[PyModelSearchResult]]:
+        vcs_ids = self._vcs_ids()
+        if vcs_ids is None:
+            return
+        connection = connect_search_index(self.endpoint)
+        if connection is None:
+            return
+        ensure_search_index(self.endpoint)
+        (query, parameters) = self._ordered_models_query(vcs_ids)
+        remaining = self.result_limit
+        page: List[PyModelSearchResult] = []
+        try:
+            cursor = connection.execute(query, parameters)
+            while remaining is None or remaining > 0:
+                wanted = page_size - len(page)
+                if remaining is not None:
+                    wanted = min(wanted, remaining - len(page))
+                rows = cursor.fetchmany(wanted)
+                if rows:
+                    page.extend(self._confirm_models(rows, vcs_ids))
+                    # Rows that didn't match are made up for by reading further rows into the same page
+                    if len(page) < page_size and (
+                        remaining is None or len(page) < remaining
+                    ):
+                        continue
+                if page:
+                    yield page
+                if not rows:
+                    return
+                if remaining is not None:
+                    remaining -= len(page)
+                page = []
+        finally:
+            connection.close()
+
+    def _exact_query(self) -> bool:
         """
+        Whether the registry query alone selects exactly the Models that match. Runs, metric filters, and child
+        Models are matched by artefact_link, so rows read are otherwise only candidates.
+        """
+        return not self.runs and not self.metric_filters and self.include_children
+
+    def _ordered_models_query(self, vcs_ids: List[PyVcsID]) -> Tuple[str, List[Any]]:
+        conditions: List[str] = []
+        parameters: List[Any] = []
+        ordering_join = ""
+        ordering = "max(model.creation_time) DESC"
+        if self.ordering is not None:
+            (metric_name, descending) = self.ordering
+            # Latest value of the metric over the runs of each Model name and VCS ID
+            ordering_join = (
+                "LEFT JOIN (SELECT model_run.model_name, model_run.vcs_id, latest.metric_value, max(latest.time) "
+                "FROM latest_metric AS latest "
+                "JOIN registry.model_run AS model_run ON latest.model_run_id = model_run.id "
+                "WHERE latest.metric_name = ? GROUP BY model_run.model_name, model_run.vcs_id) AS ordering "
+                "ON ordering.model_name = model.model_name AND ordering.vcs_id = model.vcs_id"
+            )
+            parameters.append(metric_name)
+            ordering = (
+                f"ordering.metric_value IS NULL, ordering.metric_value {'DESC' if descending else 'ASC'}, "
+                + ordering
+            )
+        if self.names:
+            conditions.append(
+                f"model.model_name IN ({', '.join('?' * len(self.names))})"
+            )
+            parameters.extend(sorted(self.names))
+        if vcs_ids:
+            conditions.append(f"model.vcs_id IN ({', '.join('?' * len(vcs_ids))})")
+            parameters.extend(
+                bytes.fromhex(vcs_id.as_hex_string().removeprefix("0x"))
+                for vcs_id in vcs_ids
+            )
+        limit = ""
+        if self.result_limit is not None and self._exact_query():
+            limit = "LIMIT ?"
+            parameters.append(self.result_limit)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        # The Artefact Schema ID is stored after its version and size, as in `as_hex_string`
+        return (
+            "SELECT model.model_name, substr(hex(model.artefact_schema_id), -64), hex(model.vcs_id) "
+            f"FROM registry.model_info AS model {ordering_join} {where} "
+            "GROUP BY model.artefact_schema_id, model.model_name, model.vcs_id "
+            f"ORDER BY {ordering} {limit}",
+            parameters,
+        )
+
+    def _confirm_models(
+        self, rows: List[Tuple[str, str, str]], vcs_ids: List[PyVcsID]
+    ) -> List[PyModelSearchResult]:
+        """Search for the Models read from the registry, keeping those that match in the order they were read"""
+        results = {
+            (
+                model.model_id.name,
+                model.model_id.artefact_schema_id.as_hex_string()
+                .removeprefix("0x")
+                .upper(),
+                _vcs_key(model.vcs_info),
+            ): model
+            for model in search_for_models(
+                endpoint=self.endpoint.endpoint,
+                names=sorted({name for (name, _, _) in rows}),
+                runs=list(self.runs),
+                metric_filter=self._metric_filter(),
+                vcs_id=vcs_ids,
+                include_children=self.include_children,
+            )
+        }
+        return [results[row] for row in rows if row in results]
+
+    def _vcs_ids(self) -> Optional[List[PyVcsID]]:
+        """VCS IDs to search within, or None if the repository searched for has none"""
+        vcs_ids = [vcs.id() for vcs in self.vcs_information]
         if self.repository_name is not None:
-            vcs_ids: List[PyVcsID] = search_for_vcs_id(
+            repository_ids: List[PyVcsID] = search_for_vcs_id(
                 self.endpoint.endpoint, self.repository_name, self.branch
             )
-            if len(vcs_ids) == 0:
-                return set()
-        else:
-            vcs_ids = list()
+            if len(repository_ids) == 0:
+                return None
+            vcs_ids.extend(repository_ids)
+        return vcs_ids
+
+    def _matching_models(self, cache: bool) -> Set[PyModelSearchResult]:
+        if not cache:
+            return self._search_models()
+        key = ("models", self._query_key())
+        models: Optional[Set[PyModelSearchResult]] = SEARCH_CACHE.get(key)
+        if models is None:
+            models = self._search_models()
+            SEARCH_CACHE.put(key, models, uses_metrics=bool(self.metric_filters))
+        return set(models)
+
+    def _search_models(self) -> Set[PyModelSearchResult]:
+        ensure_search_index(self.endpoint)
+        vcs_ids = self._vcs_ids()
+        if vcs_ids is None:
+            return set()
         return set(
             search_for_models(
                 endpoint=self.endpoint.endpoint,
                 names=list(self.names),
                 runs=list(self.runs),
                 metric_filter=self._metric_filter(),
-                vcs_id=[x.id() for x in self.vcs_information] + vcs_ids,
+                vcs_id=vcs_ids,
                 include_children=self.include_children,
             )
         )
 
-    def metrics(self) -> Dict[str, Union[List[str], List[float]]]:
+    def _metrics_where(self) -> Tuple[str, List[Any]]:
+        conditions: List[str] = []
+        parameters: List[Any] = []
+
+        def any_of(column: str, values: List[Any]) -> None:
+            conditions.append(f"{column} IN ({', '.join('?' * len(values))})")
+            parameters.extend(values)
+
+        if self.names:
+            any_of("model_run.model_name", sorted(self.names))
+        if self.runs:
+            any_of(
+                "model_run.run_id",
+                [uuid.UUID(RunID.uuid(run)).bytes for run in self.runs],
+            )
+        if self.vcs_information:
+            any_of(
+                "model_run.vcs_id",
+                [
+                    bytes.fromhex(vcs.id().as_hex_string().removeprefix("0x"))
+                    for vcs in self.vcs_information
+                ],
+            )
+        if self.repository_name is not None:
+            conditions.append("vcs.remote_repository LIKE ?")
+            parameters.append(self.repository_name)
+        if self.branch is not None:
+            conditions.append("vcs.branch = ?")
+            parameters.append(self.branch)
+        # As with `models`, metric filters select the Model Runs with a matching metric
+        for metric_filter in self.metric_filters:
+            conditions.append(
+                "metric.model_run_id IN (SELECT model_run_id FROM metric "
+                f"WHERE metric_name = ? AND metric_value {metric_filter.ordering.value} ?)"
+            )
+            parameters.extend([metric_filter.metric_name, metric_filter.metric_value])
+        if not conditions:
+            return "", parameters
+        return "WHERE " + " AND ".join(conditions), parameters
+
+    def iter_metrics(self, chunk_size: int = 65_536) -> Iterator[pa.RecordBatch]:
+        """
+        Stream the metrics of matching Model Runs as Arrow record batches of up to `chunk_size` metrics each, in order
+        of time.
+        """
+        registry_path = self.endpoint.require_local_registry_path(
+            "Metrics can only be retrieved"
+        )
+        if not registry_path.exists():
+            return
+        ensure_search_index(self.endpoint)
+        (where, parameters) = self._metrics_where()
+        connection = sqlite3.connect(f"file:{registry_path}?mode=ro", uri=True)
+        try:
+            cursor = connection.execute(_METRICS_QUERY.format(where=where), parameters)
+            while rows := cursor.fetchmany(chunk_size):
+                columns = list(zip(*rows))
+                yield pa.RecordBatch.from_arrays(
+                    [
+                        pa.array(column, type=field.type)
+                        for (column, field) in zip(columns[:-1], METRIC_SCHEMA)
+                    ]
+                    + [_parse_times(columns[-1])],
+                    schema=METRIC_SCHEMA,
+                )
+        finally:
+            connection.close()
+
+    def metrics_table(self, chunk_size: int = 65_536) -> pa.Table:
+        """
+        Return the metrics of matching Model Runs as an Arrow table, with one row per metric, in order of time
+        """
+        return pa.Table.from_batches(
+            list(self.iter_metrics(chunk_size)), schema=METRIC_SCHEMA
+        )
+
+    def metrics(self) -> Dict[str, np.ndarray]:
         """
         Return a Pandas-compatible dictionary of column names and attributes
         """
-        raise NotImplementedError
+        table = self.metrics_table()
+        return {name: table.column(name).to_numpy() for name in METRIC_SCHEMA.names}
+
+
+def _vcs_key(vcs_info: PyVcsInfo) -> str:
+    return vcs_info.id().as_hex_string().removeprefix("0x").upper()
+
+
+def _parse_times(times: Tuple[str, ...]) -> pa.Array:
+    strings = pa.array(times, type=pa.string())
+    try:
+        return strings.cast(METRIC_SCHEMA.field("time").type)
+    except pa.ArrowInvalid:
+        # Times stored without an offset are in UTC
+        return strings.cast(pa.timestamp("us")).cast(METRIC_SCHEMA.field("time").type)
 
 
 from typing import Optional
@@ -191,17 +513,44 @@ from artefact_link import (PyModelID, PyShortArtefactSchemaID,
 from jackdaw_ml.artefact_endpoint import ArtefactEndpoint
 
 
+# Endpoints used by `lookup_model_id`, kept so that lookups don't reconnect - keyed by API key, or None for local
+_LOOKUP_ENDPOINTS: Dict[Optional[str], ArtefactEndpoint] = dict()
+
+
+def _lookup_endpoint(api_key: Optional[str]) -> ArtefactEndpoint:
+    endpoint = _LOOKUP_ENDPOINTS.get(api_key)
+    if endpoint is None:
+        endpoint = (
+            ArtefactEndpoint.default()
+            if api_key is None
+            else ArtefactEndpoint.remote(api_key)
+        )
+        endpoint = _LOOKUP_ENDPOINTS.setdefault(api_key, endpoint)
+    return endpoint
+
+
 def lookup_model_id(
     model_name: str,
     short_vcs_hash: str,
     short_artefact_schema_id: str,
     api_key: Optional[str] = None,
+    cache: bool = True,
 ) -> PyModelID:
-    return search_by_model_id(
-        ArtefactEndpoint.default().endpoint
-        if api_key is None
-        else ArtefactEndpoint.remote(api_key).endpoint,
-        short_vcs_hash,
-        PyShortArtefactSchemaID.from_str(short_artefact_schema_id),
+    endpoint = _lookup_endpoint(api_key)
+    key = (
+        "model_id",
+        endpoint.cache_key(),
         model_name,
+        short_vcs_hash,
+        short_artefact_schema_id,
     )
+    model_id: Optional[PyModelID] = SEARCH_CACHE.get(key) if cache else None
+    if model_id is None:
+        model_id = search_by_model_id(
+            endpoint.endpoint,
+            short_vcs_hash,
+            PyShortArtefactSchemaID.from_str(short_artefact_schema_id),
+            model_name,
+        )
+        SEARCH_CACHE.put(key, model_id)
+    return model_id
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+__all__ = [
+    "SearchCache",
+    "SEARCH_CACHE",
+    "invalidate_search_cache",
+    "invalidate_metric_searches",
+]
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Set, Tuple
+
+
+class SearchCache:
+    """
+    LRU cache of search results, holding up to `max_size` results for at most `ttl` seconds each.
+
+    Results are keyed on the Endpoint searched and the normalized query. Saving a Model clears the cache, and sending
+    metrics to a local endpoint clears the results of searches filtered by metrics, so that searches of the local
+    registry see them immediately; the TTL bounds how stale results from remote registries, which others save to, can
+    be.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._results: OrderedDict[Hashable, Tuple[float, Any]] = OrderedDict()
+        # Keys of results that depend on the metrics logged so far
+        self._metric_keys: Set[Hashable] = set()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is None:
+                return None
+            (expiry, result) = cached
+            if expiry < time.monotonic():
+                del self._results[key]
+                self._metric_keys.discard(key)
+                return None
+            self._results.move_to_end(key)
+            return result
+
+    def put(self, key: Hashable, result: Any, uses_metrics: bool = False) -> None:
+        with self._lock:
+            self._results[key] = (time.monotonic() + self.ttl, result)
+            self._results.move_to_end(key)
+            if uses_metrics:
+                self._metric_keys.add(key)
+            else:
+                self._metric_keys.discard(key)
+            while len(self._results) > self.max_size:
+                (evicted, _) = self._results.popitem(last=False)
+                self._metric_keys.discard(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+            self._metric_keys.clear()
+
+    def clear_metric_results(self) -> None:
+        """Clear the results that depend on metrics, keeping the rest"""
+        with self._lock:
+            for key in self._metric_keys:
+                self._results.pop(key, None)
+            self._metric_keys.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._results)
+
+
+SEARCH_CACHE = SearchCache()
+
+
+def invalidate_search_cache() -> None:
+    """Clear cached search results, i.e. after saving Models from another process"""
+    SEARCH_CACHE.clear()
+
+
+def invalidate_metric_searches() -> None:
+    """Clear cached results of searches filtered by metrics, i.e. after logging metrics"""
+    SEARCH_CACHE.clear_metric_results()
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+__all__ = ["ensure_search_index", "connect_search_index"]
+
+import logging
+import pathlib
+import sqlite3
+import threading
+from typing import Optional, Set
+
+from jackdaw_ml.artefact_endpoint import ArtefactEndpoint
+
+LOGGER = logging.getLogger(__name__)
+
+# Secondary indexes over the local registry, covering the columns searches filter on. SQLite keeps these up to date
+#   itself, so they never disagree with the registry.
+_SEARCH_INDEX = """
+CREATE INDEX IF NOT EXISTS jackdaw_model_name_index ON model (model_name, vcs_id);
+CREATE INDEX IF NOT EXISTS jackdaw_model_vcs_index ON model (vcs_id);
+CREATE INDEX IF NOT EXISTS jackdaw_vcs_repository_index ON vcs (remote_repository, branch);
+CREATE INDEX IF NOT EXISTS jackdaw_vcs_branch_index ON vcs (branch);
+CREATE INDEX IF NOT EXISTS jackdaw_model_child_slots_child_index ON model_child_slots (child_artefact_schema_id);
+CREATE INDEX IF NOT EXISTS jackdaw_model_run_name_index ON model_run (model_name, vcs_id);
+CREATE INDEX IF NOT EXISTS jackdaw_metric_name_index ON metric (metric_name, metric_value);
+-- Derived data once kept in the registry itself, now kept alongside it
+DROP TRIGGER IF EXISTS jackdaw_latest_metric_insert;
+DROP TABLE IF EXISTS jackdaw_latest_metric;
+"""
+
+# Data derived from the registry is kept in a database of its own, alongside the registry, so that the registry's
+#   schema is left to artefact_link. It holds the latest value of each metric per Model Run, brought up to date with
+#   metrics logged since it was last read by way of the registry's rowids.
+_DERIVED_SCHEMA = """
+CREATE TABLE IF NOT EXISTS latest_metric (
+  model_run_id bytea NOT NULL,
+  metric_name text NOT NULL,
+  metric_value float8 NOT NULL,
+  time timestamptz NOT NULL,
+  PRIMARY KEY (model_run_id, metric_name)
+);
+CREATE INDEX IF NOT EXISTS latest_metric_value_index ON latest_metric (metric_name, metric_value);
+CREATE TABLE IF NOT EXISTS indexed_metrics (
+  id integer PRIMARY KEY CHECK (id = 0),
+  last_rowid integer NOT NULL
+);
+"""
+
+# SQLite takes the other columns from the row holding the maximum time
+_UPDATE_LATEST_METRIC = """
+INSERT INTO latest_metric (model_run_id, metric_name, metric_value, time)
+SELECT model_run_id, metric_name, metric_value, max(time) FROM registry.metric
+WHERE rowid > ? AND rowid <= ? GROUP BY model_run_id, metric_name
+ON CONFLICT (model_run_id, metric_name) DO UPDATE
+SET metric_value = excluded.metric_value, time = excluded.time
+WHERE excluded.time >= latest_metric.time
+"""
+
+_INDEXED: Set[str] = set()
+_INDEXED_LOCK = threading.Lock()
+
+
+def ensure_search_index(endpoint: ArtefactEndpoint) -> bool:
+    """
+    Create the search index over a local Endpoint's registry, once per registry and process.
+
+    Returns whether the registry is indexed - remote Endpoints, and local registries that don't exist yet or can't be
+    written to, are not.
+    """
+    registry_path = endpoint.local_registry_path()
+    if registry_path is None:
+        return False
+    with _INDEXED_LOCK:
+        if str(registry_path) in _INDEXED:
+            return True
+        if not registry_path.exists():
+            return False
+        try:
+            with endpoint.registry_lock():
+                connection = sqlite3.connect(registry_path, timeout=30)
+                try:
+                    connection.executescript(_SEARCH_INDEX)
+                finally:
+                    connection.close()
+        except sqlite3.Error as e:
+            LOGGER.warning(f"Could not index registry at {registry_path}: {e}")
+            return False
+        _INDEXED.add(str(registry_path))
+        return True
+
+
+def derived_index_path(registry_path: pathlib.Path) -> pathlib.Path:
+    """Path of the database holding data derived from the registry at `registry_path`"""
+    return registry_path.with_name(f"{registry_path.stem}.search.sqlite")
+
+
+def connect_search_index(endpoint: ArtefactEndpoint) -> Optional[sqlite3.Connection]:
+    """
+    Connect to the data derived from a local Endpoint's registry, brought up to date with the registry.
+
+    The registry is attached read-only as `registry`, so that derived tables such as `latest_metric` can be joined with
+    it. Returns None for Endpoints without a local registry, and for registries that don't exist yet.
+    """
+    registry_path = endpoint.local_registry_path()
+    if registry_path is None or not registry_path.exists():
+        return None
+    connection = sqlite3.connect(
+        f"file:{derived_index_path(registry_path)}",
+        uri=True,
+        timeout=30,
+        isolation_level=None,
+    )
+    try:
+        connection.executescript(_DERIVED_SCHEMA)
+        connection.execute(
+            "ATTACH DATABASE ? AS registry", (f"file:{registry_path}?mode=ro",)
+        )
+        _update_latest_metric(connection)
+    except BaseException:
+        connection.close()
+        raise
+    return connection
+
+
+def _update_latest_metric(connection: sqlite3.Connection) -> None:
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        row = connection.execute(
+            "SELECT last_rowid FROM indexed_metrics WHERE id = 0"
+        ).fetchone()
+        last_rowid = 0 if row is None else row[0]
+        (max_rowid,) = connection.execute(
+            "SELECT coalesce(max(rowid), 0) FROM registry.metric"
+        ).fetchone()
+        if max_rowid < last_rowid:
+            # Metrics were removed from the registry since it was last read, so the derived data is rebuilt
+            connection.execute("DELETE FROM latest_metric")
+            last_rowid = 0
+        if max_rowid > last_rowid:
+            connection.execute(_UPDATE_LATEST_METRIC, (last_rowid, max_rowid))
+        connection.execute(
+            "INSERT INTO indexed_metrics (id, last_rowid) VALUES (0, ?) "
+            "ON CONFLICT (id) DO UPDATE SET last_rowid = excluded.last_rowid",
+            (max_rowid,),
+        )
+        connection.execute("COMMIT")
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
@@ -1,5 +1,6 @@
 __all__ = ["Serializable"]
 
+import copy
 import pathlib
 from abc import abstractmethod
 from typing import Generic, Optional, TypeVar
@@ -10,6 +11,10 @@ T = TypeVar("T")
 
 
 class Serializable(Generic[T]):
+    # Whether items may be saved as a delta against an earlier save of the same item. Suited to large items of a
+    #   fixed size which change in place, such as tensors.
+    supports_delta: bool = False
+
     @staticmethod
     @abstractmethod
     def to_resource(item: T) -> Resource:
@@ -17,9 +22,22 @@ class Serializable(Generic[T]):
 
     @classmethod
     def to_file(cls, item: T, filename: pathlib.Path) -> pathlib.Path:
-        with open(filename, "wb") as f:
-            f.write(cls.to_resource(item).inner)
-        return filename
+        """
+        Serialize `item` to `filename`.
+
+        Serializers that can write directly to a file should override this, to avoid holding the serialized item
+        in memory before it is written.
+        """
+        return cls.to_resource(item).to_file(filename)
+
+    @staticmethod
+    def snapshot(item: T) -> T:
+        """
+        Copy `item`, so that it can be serialized later while the original continues to change.
+
+        Serializers of large items should override this with a cheaper copy than `copy.deepcopy`.
+        """
+        return copy.deepcopy(item)
 
     @staticmethod
     @abstractmethod
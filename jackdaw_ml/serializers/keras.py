@@ -1,3 +1,4 @@
+import pathlib
 from typing import Optional, TypeVar
 
 import numpy as np
@@ -12,8 +13,10 @@ T = TypeVar("T")
 
 
 class KerasSerializer(Serializable[tf.Variable]):
+    supports_delta = True
+
     @staticmethod
-    def to_resource(item: tf.Variable) -> Resource:
+    def _to_tensor(item: tf.Variable) -> pa.Tensor:
         if not isinstance(item, tf.Variable):
             raise ValueError(f"Received {item}, expected {tf.Variable}")
 
@@ -21,8 +24,19 @@ class KerasSerializer(Serializable[tf.Variable]):
         # `.numpy() can return a np.float value rather than a np.ndarray`
         if not isinstance(item_ndarray, np.ndarray):
             item_ndarray = np.array(item_ndarray)
-        item_ndarray = pa.Tensor.from_numpy(item_ndarray)
-        return TensorSerializer.to_resource(item_ndarray)
+        return pa.Tensor.from_numpy(item_ndarray)
+
+    @staticmethod
+    def to_resource(item: tf.Variable) -> Resource:
+        return TensorSerializer.to_resource(KerasSerializer._to_tensor(item))
+
+    @classmethod
+    def to_file(cls, item: tf.Variable, filename: pathlib.Path) -> pathlib.Path:
+        return TensorSerializer.to_file(KerasSerializer._to_tensor(item), filename)
+
+    @staticmethod
+    def snapshot(item: tf.Variable) -> tf.Variable:
+        return tf.Variable(item.read_value(), trainable=False)
 
     @staticmethod
     def from_resource(
@@ -1,5 +1,6 @@
 __all__ = ["PickleSerializer"]
 
+import pathlib
 import pickle
 from typing import Optional, TypeVar
 
@@ -14,6 +15,12 @@ class PickleSerializer(Serializable[T]):
     def to_resource(item: T) -> Resource:
         return Resource(pickle.dumps(item))
 
+    @classmethod
+    def to_file(cls, item: T, filename: pathlib.Path) -> pathlib.Path:
+        with open(filename, "wb") as f:
+            pickle.dump(item, f)
+        return filename
+
     @staticmethod
     def from_resource(uninitialised_item: Optional[T], buffer: Resource) -> T:
-        return pickle.loads(buffer.__bytes__())
+        return pickle.loads(buffer.view())
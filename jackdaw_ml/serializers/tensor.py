@@ -1,8 +1,20 @@
-__all__ = ["TensorSerializer", "TorchSerializer"]
+__all__ = [
+    "TensorSerializer",
+    "TorchSerializer",
+    "TorchModuleSerializer",
+    "TorchModuleState",
+]
 
+import json
+import logging
+import pathlib
+import struct
+import warnings
+from dataclasses import asdict, dataclass
+from io import BytesIO
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, TypeVar
 
-from typing import Optional, TypeVar
-
+import numpy as np
 import pyarrow as pa  # type: ignore
 import torch
 from pyarrow import BufferOutputStream, BufferReader
@@ -11,32 +23,371 @@ from jackdaw_ml.resource import Resource
 from jackdaw_ml.serializers import Serializable
 
 T = TypeVar("T")
+LOGGER = logging.getLogger(__name__)
 
 
 class TensorSerializer(Serializable[pa.Tensor]):
+    supports_delta = True
+
     @staticmethod
     def to_resource(item: pa.Tensor) -> Resource:
         output_stream = BufferOutputStream()
         pa.ipc.write_tensor(item, output_stream)
-        return Resource(output_stream.getvalue().to_pybytes())
+        return Resource(output_stream.getvalue())
+
+    @classmethod
+    def to_file(cls, item: pa.Tensor, filename: pathlib.Path) -> pathlib.Path:
+        with pa.OSFile(str(filename), "wb") as output_file:
+            pa.ipc.write_tensor(item, output_file)
+        return filename
+
+    @staticmethod
+    def snapshot(item: pa.Tensor) -> pa.Tensor:
+        # Arrow Tensors are immutable
+        return item
 
     @staticmethod
     def from_resource(uninitialised_item: Optional[T], buffer: Resource) -> pa.Tensor:
-        input_stream = BufferReader(buffer.__bytes__())
+        input_stream = BufferReader(buffer.view())
         return pa.ipc.read_tensor(input_stream)
 
+    @staticmethod
+    def to_numpy(buffer: Resource) -> np.ndarray:
+        """
+        Read a Tensor from `buffer` as a NumPy array, without copying it.
+
+        Arrow only provides read-only arrays. When `buffer` is writable, such as a memory mapped Artefact, the array
+        is taken directly over `buffer` instead so that it's writable as well.
+        """
+        array = TensorSerializer.from_resource(None, buffer).to_numpy()
+        view = buffer.view()
+        if view.readonly:
+            return array
+        base = np.frombuffer(view, dtype=np.uint8)
+        offset = (
+            array.__array_interface__["data"][0] - base.__array_interface__["data"][0]
+        )
+        return np.ndarray(
+            array.shape, array.dtype, buffer=view, offset=offset, strides=array.strides
+        )
+
+
+class TorchSerializer(Serializable[torch.Tensor]):
+    """Serializes a Parameter, or a plain tensor such as a Module's Buffer"""
+
+    supports_delta = True
+
+    @staticmethod
+    def _to_tensor(item: torch.Tensor) -> pa.Tensor:
+        if not isinstance(item, torch.Tensor):
+            raise ValueError(f"Received {item}, expected {torch.Tensor}")
+        # `.numpy()` shares memory with the tensor, so no copy is made before serialization
+        return pa.Tensor.from_numpy(item.detach().numpy())
+
+    @staticmethod
+    def to_resource(item: torch.Tensor) -> Resource:
+        return TensorSerializer.to_resource(TorchSerializer._to_tensor(item))
+
+    @classmethod
+    def to_file(cls, item: torch.Tensor, filename: pathlib.Path) -> pathlib.Path:
+        return TensorSerializer.to_file(TorchSerializer._to_tensor(item), filename)
+
+    @staticmethod
+    def snapshot(item: torch.Tensor) -> torch.Tensor:
+        if isinstance(item, torch.nn.Parameter):
+            return torch.nn.Parameter(
+                item.detach().clone(), requires_grad=item.requires_grad
+            )
+        return item.detach().clone()
+
+    @staticmethod
+    def _wrap(tensor: torch.Tensor, like: Optional[torch.Tensor]) -> torch.Tensor:
+        """`tensor` as a Parameter, unless it replaces a plain tensor"""
+        if like is None:
+            return torch.nn.Parameter(tensor)
+        if isinstance(like, torch.nn.Parameter):
+            return torch.nn.Parameter(tensor, requires_grad=like.requires_grad)
+        return tensor
+
+    @staticmethod
+    def from_resource(
+        uninitialised_item: Optional[torch.Tensor], buffer: Resource
+    ) -> torch.Tensor:
+        """
+        Load a Parameter, or a plain tensor if `uninitialised_item` is one, from `buffer`.
+
+        If `uninitialised_item` is a tensor of the same shape and dtype, it's loaded in place and returned, keeping
+        its identity (and any optimizer references to it). A memory mapped `buffer` replaces the storage of a CPU
+        tensor without copying; otherwise the data is copied into the tensor's existing storage.
+        """
+        array = TensorSerializer.to_numpy(buffer)
+        if not isinstance(uninitialised_item, torch.Tensor):
+            return TorchSerializer._wrap(_writable_tensor(array), None)
+        if uninitialised_item.dtype == torch.bool and array.dtype == np.uint8:
+            # Arrow holds booleans as bytes
+            array = array.view(np.bool_)
+        if (
+            uninitialised_item.shape != array.shape
+            or uninitialised_item.dtype != _torch_dtype(array.dtype)
+        ):
+            LOGGER.warning(
+                f"Loaded tensor of shape {array.shape} and dtype {_torch_dtype(array.dtype)} does not match "
+                f"existing tensor of shape {tuple(uninitialised_item.shape)} and dtype {uninitialised_item.dtype}, "
+                f"replacing it"
+            )
+            return TorchSerializer._wrap(_writable_tensor(array), uninitialised_item)
+        if uninitialised_item.device.type != "cpu":
+            with torch.no_grad():
+                uninitialised_item.copy_(_writable_tensor(array))
+        elif buffer.memory_mapped and array.flags.writeable:
+            uninitialised_item.data = torch.from_numpy(array)
+        else:
+            np.copyto(uninitialised_item.detach().numpy(), array)
+        return uninitialised_item
+
+
+def _torch_dtype(dtype: np.dtype) -> torch.dtype:
+    return torch.from_numpy(np.empty(0, dtype=dtype)).dtype
+
+
+def _writable_tensor(array: np.ndarray) -> torch.Tensor:
+    """A tensor over `array`, copying it first if it's read-only, such as an array over bytes"""
+    return torch.from_numpy(array if array.flags.writeable else array.copy())
+
+
+_MODULE_MAGIC = b"JDTMOD01"
+# Length of the table of tensors that follows the header
+_MODULE_HEADER = struct.Struct("<Q")
+# Tensors are aligned within the artefact, so that each can be read in place from a memory map
+_ALIGNMENT = 64
+
+
+@dataclass
+class _TensorEntry:
+    """Where a tensor is held in a packed Module artefact, and what it's restored to"""
+
+    name: str
+    parameter: bool
+    requires_grad: bool
+    dtype: str
+    shape: List[int]
+    offset: int
+    nbytes: int
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def _tensor_bytes(tensor: torch.Tensor) -> np.ndarray:
+    # Viewed as bytes, so that dtypes without a NumPy equivalent such as bfloat16 are written as they are
+    return tensor.detach().cpu().contiguous().reshape(-1).view(torch.uint8).numpy()
+
+
+class TorchModuleState:
+    """
+    Every Parameter and persistent Buffer of a Module and its children, by their dotted name - as in `state_dict`.
+
+    Tensors are read from `module` as they're needed. A state loaded without a Module to load into, or snapshotted,
+    holds its own tensors instead.
+    """
+
+    def __init__(
+        self,
+        module: Optional[torch.nn.Module],
+        tensors: Optional[Dict[str, Tuple[bool, torch.Tensor]]] = None,
+    ):
+        self.module = module
+        self._tensors = tensors
+
+    def named_tensors(self) -> Iterator[Tuple[str, bool, torch.Tensor]]:
+        """Each tensor by its dotted name, alongside whether it's a Parameter"""
+        if self._tensors is not None:
+            for (name, (parameter, tensor)) in self._tensors.items():
+                yield name, parameter, tensor
+            return
+        if self.module is None:
+            return
+        # One pass over the Module's own registries. Parameters shared between Modules are saved once.
+        seen = set()
+        for (prefix, module) in self.module.named_modules():
+            prefix = f"{prefix}." if prefix else ""
+            for (name, parameter) in module._parameters.items():
+                if parameter is not None and id(parameter) not in seen:
+                    seen.add(id(parameter))
+                    yield f"{prefix}{name}", True, parameter
+            for (name, buffer) in module._buffers.items():
+                if (
+                    buffer is not None
+                    and name not in module._non_persistent_buffers_set
+                    and id(buffer) not in seen
+                ):
+                    seen.add(id(buffer))
+                    yield f"{prefix}{name}", False, buffer
+
+    def load(
+        self,
+        tensors: Iterator[Tuple[str, bool, torch.Tensor]],
+        memory_mapped: bool = False,
+    ) -> None:
+        """
+        Load `tensors` into the Module in place, as `TorchSerializer` does for each Parameter.
+
+        A memory mapped tensor replaces the storage of a CPU tensor without copying. Tensors whose shape or dtype differ
+        from the existing tensor replace it, and tensors with nowhere to go on the Module are skipped, with a warning.
+        """
+        if self.module is None:
+            self._tensors = {
+                name: (parameter, tensor if memory_mapped else tensor.clone())
+                for (name, parameter, tensor) in tensors
+            }
+            return
+        for (name, parameter, tensor) in tensors:
+            (prefix, _, attribute) = name.rpartition(".")
+            try:
+                owner = self.module.get_submodule(prefix)
+            except AttributeError:
+                LOGGER.warning(f"Module has no submodule for '{name}', skipping it")
+                continue
+            registry = owner._parameters if parameter else owner._buffers
+            current = registry.get(attribute)
+            if current is None:
+                LOGGER.warning(f"Module has no tensor '{name}', skipping it")
+                continue
+            if current.shape != tensor.shape or current.dtype != tensor.dtype:
+                LOGGER.warning(
+                    f"Loaded tensor '{name}' of shape {tuple(tensor.shape)} and dtype {tensor.dtype} does not match "
+                    f"existing tensor of shape {tuple(current.shape)} and dtype {current.dtype}, replacing it"
+                )
+                tensor = tensor if memory_mapped else tensor.clone()
+                registry[attribute] = (
+                    torch.nn.Parameter(tensor, requires_grad=current.requires_grad)
+                    if parameter
+                    else tensor
+                )
+            elif memory_mapped and current.device.type == "cpu":
+                current.data = tensor
+            else:
+                with torch.no_grad():
+                    current.copy_(tensor)
+
+
+class TorchModuleSerializer(Serializable[TorchModuleState]):
+    """
+    Serializes every Parameter and persistent Buffer of a Module tree into a single artefact.
+
+    The artefact holds a table of each tensor's name, dtype, shape and offset, followed by the tensors themselves,
+    packed end to end and aligned so that each can be read in place from a memory map.
+    """
+
+    supports_delta = True
+
+    @staticmethod
+    def _entries(item: TorchModuleState) -> Tuple[bytes, List[Tuple[int, np.ndarray]]]:
+        """The encoded header and table, and each tensor's bytes alongside their offset within the artefact"""
+        entries: List[_TensorEntry] = []
+        data: List[np.ndarray] = []
+        offset = 0
+        for (name, parameter, tensor) in item.named_tensors():
+            tensor_bytes = _tensor_bytes(tensor)
+            offset = _aligned(offset)
+            entries.append(
+                _TensorEntry(
+                    name=name,
+                    parameter=parameter,
+                    requires_grad=tensor.requires_grad,
+                    dtype=str(tensor.dtype).removeprefix("torch."),
+                    shape=list(tensor.shape),
+                    offset=offset,
+                    nbytes=tensor_bytes.nbytes,
+                )
+            )
+            data.append(tensor_bytes)
+            offset += tensor_bytes.nbytes
+        table = json.dumps([asdict(entry) for entry in entries]).encode()
+        header = _MODULE_MAGIC + _MODULE_HEADER.pack(len(table)) + table
+        start = _aligned(len(header))
+        return header, [
+            (start + entry.offset, tensor_bytes)
+            for (entry, tensor_bytes) in zip(entries, data)
+        ]
+
+    @staticmethod
+    def _write(item: TorchModuleState, output: BinaryIO) -> None:
+        (header, data) = TorchModuleSerializer._entries(item)
+        output.write(header)
+        position = len(header)
+        for (offset, tensor_bytes) in data:
+            output.write(bytes(offset - position))
+            output.write(memoryview(tensor_bytes))
+            position = offset + tensor_bytes.nbytes
+
+    @staticmethod
+    def to_resource(item: TorchModuleState) -> Resource:
+        output = BytesIO()
+        TorchModuleSerializer._write(item, output)
+        return Resource(output)
+
+    @classmethod
+    def to_file(cls, item: TorchModuleState, filename: pathlib.Path) -> pathlib.Path:
+        with open(filename, "wb") as output:
+            TorchModuleSerializer._write(item, output)
+        return filename
+
+    @staticmethod
+    def snapshot(item: TorchModuleState) -> TorchModuleState:
+        return TorchModuleState(
+            None,
+            {
+                name: (parameter, tensor.detach().clone())
+                for (name, parameter, tensor) in item.named_tensors()
+            },
+        )
 
-class TorchSerializer(Serializable[torch.nn.Parameter]):
     @staticmethod
-    def to_resource(item: torch.nn.Parameter) -> Resource:
-        if not isinstance(item, torch.nn.Parameter):
-            raise ValueError(f"Received {item}, expected {torch.nn.Parameter}")
-        item_weight = pa.Tensor.from_numpy(item.detach().numpy())
-        return TensorSerializer.to_resource(item_weight)
+    def read(buffer: Resource) -> Iterator[Tuple[str, bool, torch.Tensor]]:
+        """Each tensor in a packed artefact, read in place from `buffer`"""
+        view = buffer.view()
+        if bytes(view[: len(_MODULE_MAGIC)]) != _MODULE_MAGIC:
+            raise RuntimeError("Artefact is not a packed Torch Module")
+        (table_length,) = _MODULE_HEADER.unpack_from(view, len(_MODULE_MAGIC))
+        table_start = len(_MODULE_MAGIC) + _MODULE_HEADER.size
+        entries = [
+            _TensorEntry(**entry)
+            for entry in json.loads(
+                bytes(view[table_start : table_start + table_length])
+            )
+        ]
+        start = _aligned(table_start + table_length)
+        for entry in entries:
+            dtype = getattr(torch, entry.dtype)
+            if entry.nbytes == 0:
+                tensor = torch.empty(entry.shape, dtype=dtype)
+            else:
+                with warnings.catch_warnings():
+                    # Tensors over bytes are never held - `TorchModuleState.load` copies or clones them
+                    warnings.filterwarnings(
+                        "ignore", message="The given buffer is not writable"
+                    )
+                    tensor = torch.frombuffer(
+                        view,
+                        dtype=dtype,
+                        count=entry.nbytes // dtype.itemsize,
+                        offset=start + entry.offset,
+                    ).reshape(entry.shape)
+            yield entry.name, entry.parameter, tensor
 
     @staticmethod
     def from_resource(
-        uninitialised_item: Optional[torch.nn.Parameter], buffer: Resource
-    ) -> torch.nn.Parameter:
-        item_weight: pa.Tensor = TensorSerializer.from_resource(None, buffer)
-        return torch.nn.Parameter(torch.from_numpy(item_weight.to_numpy()))
+        uninitialised_item: Optional[TorchModuleState], buffer: Resource
+    ) -> TorchModuleState:
+        """
+        Load every tensor of a Module from `buffer`, in place into the Module of `uninitialised_item` if there is one.
+        """
+        state = (
+            uninitialised_item
+            if isinstance(uninitialised_item, TorchModuleState)
+            else TorchModuleState(None)
+        )
+        state.load(TorchModuleSerializer.read(buffer), buffer.memory_mapped)
+        return state
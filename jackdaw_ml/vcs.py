@@ -1,12 +1,16 @@
 from __future__ import annotations
 
-__all__ = ["get_vcs_info"]
+__all__ = ["get_vcs_info", "set_check_dirty"]
 
 import logging
+import os
 import pathlib
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
 
 from artefact_link import PyRemoteRepository, PyVcsInfo
-from git import InvalidGitRepositoryError, Repo
+from git import Repo
 from gitdb.exc import BadName
 from giturlparse import parse as git_parse
 
@@ -14,17 +18,79 @@ LOGGER = logging.getLogger(__name__)
 
 _PARENTS_SEARCH = 10
 
+# Modification times of the files that determine VCS Info - HEAD, the ref it points to, packed refs, the index, and the
+#   config holding the remotes.
+Stamp = Tuple[Optional[int], ...]
 
-def get_vcs_info(path=pathlib.Path.cwd(), parent_search: int = 0) -> PyVcsInfo:
+
+@dataclass
+class _CachedVcsInfo:
+    stamp: Stamp
+    vcs_info: PyVcsInfo
+    dirty_checked: bool
+
+
+_VCS_CACHE: Dict[pathlib.Path, _CachedVcsInfo] = dict()
+_VCS_CACHE_LOCK = threading.Lock()
+
+# Whether VCS Info is checked for uncommitted changes when the caller doesn't say - i.e. when saving models, logging
+#   metrics, or searching the current repository.
+_CHECK_DIRTY = os.getenv("JACKDAW_CHECK_DIRTY", "1").lower() not in ("0", "false", "no")
+
+
+def set_check_dirty(check_dirty: bool) -> None:
+    """
+    Set whether VCS Info is checked for uncommitted changes by default, overriding the `JACKDAW_CHECK_DIRTY`
+    environment variable.
+    """
+    global _CHECK_DIRTY
+    _CHECK_DIRTY = check_dirty
+
+
+def _find_repo(
+    path: pathlib.Path, parent_search: int
+) -> Optional[Tuple[pathlib.Path, pathlib.Path]]:
+    """Find the working tree containing `path`, and its Git directory"""
+    for working_tree in [path, *path.parents][: _PARENTS_SEARCH + 2 - parent_search]:
+        git_path = working_tree / ".git"
+        if git_path.is_dir():
+            return working_tree, git_path.resolve()
+        if git_path.is_file():
+            # Worktrees and submodules point to their Git directory from a `.git` file
+            git_dir = git_path.read_text().strip().removeprefix("gitdir:").strip()
+            return working_tree, (working_tree / git_dir).resolve()
+    return None
+
+
+def _mtime(path: pathlib.Path) -> Optional[int]:
     try:
-        repo = Repo(path)
-    except InvalidGitRepositoryError:
-        if parent_search > _PARENTS_SEARCH:
-            LOGGER.error("Could not find Git Repo")
-            return PyVcsInfo("NoSHAProvided", "NoBranchFound", None)
-        else:
-            return get_vcs_info(path.parent, parent_search + 1)
-    if repo.is_dirty():
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _stamp(git_dir: pathlib.Path) -> Stamp:
+    common_dir = git_dir
+    if (git_dir / "commondir").is_file():
+        common_dir = (git_dir / (git_dir / "commondir").read_text().strip()).resolve()
+    files = [
+        git_dir / "HEAD",
+        git_dir / "index",
+        common_dir / "packed-refs",
+        common_dir / "config",
+    ]
+    try:
+        head = (git_dir / "HEAD").read_text().strip()
+    except OSError:
+        head = ""
+    if head.startswith("ref:"):
+        files.append(common_dir / head.removeprefix("ref:").strip())
+    return tuple(_mtime(file) for file in files)
+
+
+def _read_vcs_info(working_tree: pathlib.Path, check_dirty: bool) -> PyVcsInfo:
+    repo = Repo(working_tree)
+    if check_dirty and repo.is_dirty():
         LOGGER.info(
             "Current Repo is dirty - this hash may not represent the current working state"
         )
@@ -54,3 +120,41 @@ def get_vcs_info(path=pathlib.Path.cwd(), parent_search: int = 0) -> PyVcsInfo:
             if remote
             else None,
         )
+
+
+def get_vcs_info(
+    path: Optional[pathlib.Path] = None,
+    parent_search: int = 0,
+    check_dirty: Optional[bool] = None,
+) -> PyVcsInfo:
+    """
+    VCS Info for the Git repository containing `path`, which defaults to the current directory.
+
+    Results are cached per repository for the life of the process, and refreshed when HEAD, the checked out branch,
+    the index, or the repository's config change.
+
+    :param check_dirty: If set, log when the working tree has uncommitted changes. This requires a full status of the
+        working tree, which is slow for large repositories, and is only repeated when the cached result is refreshed.
+        Defaults to the setting made by `set_check_dirty`, or the `JACKDAW_CHECK_DIRTY` environment variable, which
+        are respected wherever Jackdaw reads VCS Info itself.
+    """
+    if check_dirty is None:
+        check_dirty = _CHECK_DIRTY
+    repo = _find_repo(pathlib.Path.cwd() if path is None else path, parent_search)
+    if repo is None:
+        LOGGER.error("Could not find Git Repo")
+        return PyVcsInfo("NoSHAProvided", "NoBranchFound", None)
+    (working_tree, git_dir) = repo
+    with _VCS_CACHE_LOCK:
+        cached = _VCS_CACHE.get(git_dir)
+        if (
+            cached is not None
+            and cached.stamp == _stamp(git_dir)
+            and (cached.dirty_checked or not check_dirty)
+        ):
+            return cached.vcs_info
+    vcs_info = _read_vcs_info(working_tree, check_dirty)
+    with _VCS_CACHE_LOCK:
+        # Checking for changes can refresh the index, so the stamp is taken after reading
+        _VCS_CACHE[git_dir] = _CachedVcsInfo(_stamp(git_dir), vcs_info, check_dirty)
+    return vcs_info
@@ -0,0 +1,65 @@
+from typing import Dict, List, Set
+
+from jackdaw_ml.detectors import is_type
+from jackdaw_ml.detectors.container_types import ContainerTypeCache
+
+
+class FlaggedMeta(type):
+    def __instancecheck__(cls, instance):
+        return super().__instancecheck__(instance) or getattr(
+            instance, "flagged", False
+        )
+
+
+class Flagged(metaclass=FlaggedMeta):
+    pass
+
+
+class Plain:
+    flagged = True
+
+
+def test_container_types():
+    assert is_type([1, 2, 3], List[int])
+    assert not is_type([1, 2, "3"], List[int])
+    assert not is_type([], List[int])
+    assert is_type({1, 2}, Set[int])
+    assert is_type({"a": 1, "b": 2}, Dict[str, int])
+    assert not is_type({"a": 1, "b": "2"}, Dict[str, int])
+    assert is_type([[1], [2]], List[List[int]])
+    assert not is_type([[1], ["2"]], List[List[int]])
+    assert is_type([Flagged(), Plain()], List[Flagged])
+
+
+def test_container_types_cached():
+    cache = ContainerTypeCache()
+    values = [1, 2.0, 3]
+    assert cache.element_types(values) == (frozenset({int, float}),)
+    assert len(cache) == 1
+    assert cache.element_types(values) == (frozenset({int, float}),)
+    assert len(cache) == 1
+
+    values[-1] = "3"
+    assert cache.element_types(values) == (frozenset({int, float, str}),)
+    values.append(4)
+    assert len(cache.element_types(values)[0]) == 3
+    assert len(cache) == 2
+
+
+def test_cache_bounded():
+    cache = ContainerTypeCache(max_size=2)
+    containers = [[i] for i in range(3)]
+    for container in containers:
+        cache.element_types(container)
+    assert len(cache) == 2
+
+
+def test_sampled_container_types():
+    cache = ContainerTypeCache(sample_size=10)
+    values = list(range(1_000))
+    values[1] = "1"
+    assert cache.element_types(values) == (frozenset({int}),)
+    assert cache.element_types({str(i): i for i in range(1_000)}) == (
+        frozenset({str}),
+        frozenset({int}),
+    )
@@ -0,0 +1,97 @@
+from typing import List
+
+from jackdaw_ml.access_interface import DefaultAccessInterface
+from jackdaw_ml.access_interface.list_interface import ListAccessInterface
+from jackdaw_ml.detectors import ArtefactDetector, ChildDetector
+from jackdaw_ml.detectors.class_detector import ChildModelDetector
+from jackdaw_ml.detectors.dispatch import artefact_dispatch, child_dispatch
+from jackdaw_ml.serializers.pickle import PickleSerializer
+
+
+class Weights:
+    pass
+
+
+class ScaledWeights(Weights):
+    pass
+
+
+class Layer:
+    pass
+
+
+class FlaggedMeta(type):
+    def __instancecheck__(cls, instance):
+        return super().__instancecheck__(instance) or getattr(
+            instance, "flagged", False
+        )
+
+
+class Flagged(metaclass=FlaggedMeta):
+    pass
+
+
+class Plain:
+    def __init__(self, flagged: bool = False):
+        self.flagged = flagged
+
+
+class NamedLayer(ChildModelDetector):
+    def __call__(self, item):
+        return getattr(item, "name", None) == "layer"
+
+
+WeightsDetector = ArtefactDetector(
+    artefact_types={Weights}, serializer=PickleSerializer
+)
+FlaggedDetector = ArtefactDetector(
+    artefact_types={Flagged}, serializer=PickleSerializer
+)
+LayerDetector = ChildDetector(
+    child_models={
+        List[Layer]: ListAccessInterface,
+        Layer: DefaultAccessInterface,
+    }
+)
+
+
+def test_subclasses_dispatched():
+    dispatch = artefact_dispatch([WeightsDetector])
+    assert dispatch.serializer(ScaledWeights()) is PickleSerializer
+    assert dispatch.serializer(ScaledWeights()) is PickleSerializer
+    assert dispatch.serializer(Layer()) is None
+    assert len(dispatch.table) == 2
+
+
+def test_dispatch_shared():
+    assert artefact_dispatch([WeightsDetector]) is artefact_dispatch([WeightsDetector])
+
+
+def test_instance_checks_run_per_item():
+    dispatch = artefact_dispatch([FlaggedDetector])
+    assert dispatch.serializer(Flagged()) is PickleSerializer
+    assert dispatch.serializer(Plain()) is None
+    assert dispatch.serializer(Plain(flagged=True)) is PickleSerializer
+
+
+def test_children_dispatched():
+    dispatch = child_dispatch([LayerDetector, WeightsDetector])
+    assert dispatch.child_interface(Layer()) is DefaultAccessInterface
+    assert dispatch.child_interface(Weights()) is None
+
+
+def test_containers_detected_by_contents():
+    dispatch = child_dispatch([LayerDetector, WeightsDetector])
+    layers = [Layer(), Layer()]
+    assert dispatch.child_interface(layers) is ListAccessInterface
+    assert dispatch.child_interface([Weights()]) is ListAccessInterface
+    layers.append(1)
+    assert dispatch.child_interface(layers) is None
+
+
+def test_child_model_detectors_run_per_item():
+    dispatch = child_dispatch([ChildDetector(child_models={NamedLayer(): None})])
+    named = Plain()
+    assert dispatch.child_interface(named) is None
+    named.name = "layer"
+    assert dispatch.child_interface(named) is DefaultAccessInterface
@@ -0,0 +1,100 @@
+import subprocess
+import sys
+import types
+
+from jackdaw_ml.artefact_decorator import artefacts
+from jackdaw_ml.artefact_plan import ArtefactPlan
+from jackdaw_ml.detectors.hook import DefaultDetectors
+
+DETECTOR_MODULE = """
+from jackdaw_ml.detectors import ArtefactDetector
+from jackdaw_ml.detectors.hook import DefaultDetectors
+from jackdaw_ml.serializers.pickle import PickleSerializer
+
+
+class FakeArtefact:
+    pass
+
+
+FakeDetector = ArtefactDetector(artefact_types={FakeArtefact}, serializer=PickleSerializer)
+DefaultDetectors.add_detector(FakeDetector)
+"""
+
+
+def test_decorating_imports_no_frameworks():
+    imported = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys\n"
+            "from jackdaw_ml.artefact_decorator import artefacts\n"
+            "artefacts()(type('Model', (), {}))\n"
+            "print(sorted({'torch', 'tensorflow', 'keras', 'sklearn', 'lightgbm'} & set(sys.modules)))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert imported.strip() == "[]"
+
+
+def test_detector_activated_with_framework(tmp_path, monkeypatch):
+    (tmp_path / "fake_framework_detectors.py").write_text(DETECTOR_MODULE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    DefaultDetectors.add_lazy_detector("fake_framework", "fake_framework_detectors")
+
+    @artefacts()
+    class FakeModel:
+        def __init__(self):
+            self.x = 5
+
+    assert "fake_framework_detectors" not in sys.modules
+
+    monkeypatch.setitem(
+        sys.modules, "fake_framework", types.ModuleType("fake_framework")
+    )
+    from fake_framework_detectors import FakeArtefact
+
+    model = FakeModel()
+    model.item = FakeArtefact()
+    assert "item" in ArtefactPlan.for_model(model).artefacts
+
+
+SPECIFIC_DETECTOR_MODULE = """
+from jackdaw_ml.detectors import ArtefactDetector
+from jackdaw_ml.detectors.hook import DefaultDetectors, DetectionLevel
+from jackdaw_ml.serializers.pickle import PickleSerializer
+
+
+class SpecificArtefact(dict):
+    pass
+
+
+SpecificDetector = ArtefactDetector(artefact_types={SpecificArtefact}, serializer=PickleSerializer)
+DefaultDetectors.add_detector(SpecificDetector, DetectionLevel.Specific)
+"""
+
+
+def test_lazy_specific_detector_ordered_first(tmp_path, monkeypatch):
+    (tmp_path / "specific_framework_detectors.py").write_text(SPECIFIC_DETECTOR_MODULE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    DefaultDetectors.add_lazy_detector(
+        "specific_framework", "specific_framework_detectors"
+    )
+
+    @artefacts()
+    class SpecificModel:
+        def __init__(self):
+            self.x = 5
+
+    monkeypatch.setitem(
+        sys.modules, "specific_framework", types.ModuleType("specific_framework")
+    )
+    from specific_framework_detectors import SpecificArtefact, SpecificDetector
+
+    model = SpecificModel()
+    model.item = SpecificArtefact()
+    ArtefactPlan.for_model(model)
+    detectors = SpecificModel.__artefact_detectors__
+    assert detectors == list(DefaultDetectors.artefact_detectors())
+    assert detectors.index(SpecificDetector) < len(DefaultDetectors._specific_detectors)
@@ -1,3 +1,7 @@
+import json
+import pathlib
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, OrderedDict
 
 import torch
@@ -10,8 +14,15 @@ from jackdaw_ml.access_interface.list_interface import ListAccessInterface
 from jackdaw_ml.artefact_container import SupportsArtefacts
 from jackdaw_ml.artefact_decorator import _add_artefacts, artefacts
 from jackdaw_ml.artefact_endpoint import ArtefactEndpoint
+from jackdaw_ml.artefact_plan import ArtefactPlan
 from jackdaw_ml.detectors import is_type
 from jackdaw_ml.detectors.hook import DefaultDetectors
+from jackdaw_ml.search import Searcher
+
+# A registry holding a model saved before TorchDetector matched plain tensors, when Buffers weren't saved
+PRE_TENSOR_DETECTION = (
+    pathlib.Path(__file__).parent.parent / "fixtures" / "pre_tensor_detection"
+)
 
 
 @artefacts({})
@@ -94,3 +105,135 @@ def test_sequential():
     y = Model()
     loads(y, model_id)
     assert torch.equal(x.seq_model._modules["0"].bias, y.seq_model._modules["0"].bias)
+
+
+def test_parallel_sequential():
+    x = Model()
+    serial_id = saves(x)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        parallel_id = saves(x, executor=executor)
+    assert (
+        serial_id.artefact_schema_id.as_string()
+        == parallel_id.artefact_schema_id.as_string()
+    )
+
+    y = Model()
+    loads(y, parallel_id)
+    assert torch.equal(
+        x.seq_model._modules["0"].weight, y.seq_model._modules["0"].weight
+    )
+
+
+def test_memory_mapped_sequential():
+    x = Model()
+    model_id = saves(x)
+
+    y = Model()
+    loads(y, model_id, memory_map=True)
+    weight = y.seq_model._modules["0"].weight
+    assert torch.equal(x.seq_model._modules["0"].weight, weight)
+
+    # Writes to a memory mapped Parameter are copy-on-write, and never reach the saved artefact
+    with torch.no_grad():
+        weight += 1
+    z = Model()
+    loads(z, model_id, memory_map=True)
+    assert torch.equal(
+        x.seq_model._modules["0"].weight, z.seq_model._modules["0"].weight
+    )
+
+
+def test_loads_keeps_parameters():
+    x = Model()
+    model_id = saves(x)
+
+    y = Model()
+    weight = y.seq_model._modules["0"].weight
+    optimizer = torch.optim.SGD(y.seq_model.parameters(), lr=0.1)
+    loads(y, model_id)
+    assert y.seq_model._modules["0"].weight is weight
+    assert optimizer.param_groups[0]["params"][0] is weight
+    assert torch.equal(x.seq_model._modules["0"].weight, weight)
+
+
+def test_deduplicated_saves():
+    x = Model()
+    first_id = saves(x)
+    assert first_id.artefact_schema_id.as_string() == (
+        saves(x).artefact_schema_id.as_string()
+    )
+
+    with torch.no_grad():
+        x.seq_model._modules["0"].bias += 1
+    deduplicated_id = saves(x)
+    full_id = saves(x, deduplicate=False)
+    assert (
+        deduplicated_id.artefact_schema_id.as_string()
+        == full_id.artefact_schema_id.as_string()
+    )
+    assert (
+        deduplicated_id.artefact_schema_id.as_string()
+        != first_id.artefact_schema_id.as_string()
+    )
+
+    y = Model()
+    loads(y, deduplicated_id)
+    assert torch.equal(x.seq_model._modules["0"].bias, y.seq_model._modules["0"].bias)
+
+
+@artefacts({})
+class NormModel:
+    def __init__(self):
+        self.norm = nn.BatchNorm1d(4)
+        self.norm.register_buffer("scratch", torch.zeros(4), persistent=False)
+
+
+def test_buffers_saved():
+    x = NormModel()
+    x.norm.train()
+    x.norm(torch.rand(8, 4))
+    assert {"norm.running_mean", "norm.running_var", "norm.num_batches_tracked"} <= set(
+        ArtefactPlan.for_model(x).artefact_paths()
+    )
+    assert "norm.scratch" not in ArtefactPlan.for_model(x).artefact_paths()
+
+    y = NormModel()
+    running_mean = y.norm.running_mean
+    loads(y, saves(x))
+    assert y.norm.running_mean is running_mean
+    for (name, tensor) in x.norm.state_dict().items():
+        assert torch.equal(tensor, y.norm.state_dict()[name]), name
+
+
+def normalised_classifier(endpoint: ArtefactEndpoint) -> type:
+    @artefacts({}, name="NormalisedClassifier", endpoint=endpoint)
+    class NormalisedClassifier(nn.Module):
+        def __init__(self):
+            super(NormalisedClassifier, self).__init__()
+            self.net = nn.Sequential(nn.Linear(4, 3), nn.BatchNorm1d(3))
+
+    return NormalisedClassifier
+
+
+def test_loads_checkpoint_without_buffers(tmp_path):
+    shutil.copytree(PRE_TENSOR_DETECTION, tmp_path, dirs_exist_ok=True)
+    endpoint = ArtefactEndpoint.local(
+        tmp_path / "registry.sqlite", tmp_path / "storage"
+    )
+    (result,) = Searcher(endpoint).with_name("NormalisedClassifier").models()
+
+    model = normalised_classifier(endpoint)()
+    loads(model, result.model_id)
+    state = model.state_dict()
+    parameters = json.loads((tmp_path / "parameters.json").read_text())
+    for (name, values) in parameters.items():
+        assert torch.equal(state[name], torch.tensor(values)), name
+    # The checkpoint has no running statistics, so those the model was built with are kept
+    assert torch.equal(model.net[1].running_mean, torch.zeros(3))
+    assert torch.equal(model.net[1].running_var, torch.ones(3))
+
+    # Saving the model again adds its Buffers
+    reloaded = normalised_classifier(endpoint)()
+    loads(reloaded, saves(model))
+    for (name, tensor) in state.items():
+        assert torch.equal(tensor, reloaded.state_dict()[name]), name
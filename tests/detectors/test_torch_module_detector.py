@@ -0,0 +1,111 @@
+import torch
+import torch.nn as nn
+
+from jackdaw_ml import loads, saves
+from jackdaw_ml.artefact_decorator import artefacts
+from jackdaw_ml.artefact_plan import ArtefactPlan
+from jackdaw_ml.detectors.hook import DefaultDetectors
+from jackdaw_ml.detectors.torch import (TorchModuleAccessInterface,
+                                        TorchModuleDetector)
+from jackdaw_ml.saves import saves_background
+from jackdaw_ml.serializers.pickle import PickleSerializer
+from jackdaw_ml.serializers.tensor import TorchModuleSerializer
+
+
+@artefacts(child_detectors=[TorchModuleDetector, *DefaultDetectors.child_detectors()])
+class PackedModel:
+    def __init__(self):
+        self.net = nn.Sequential(
+            nn.Conv2d(1, 4, 3), nn.BatchNorm2d(4), nn.ReLU(), nn.Flatten()
+        )
+
+
+@artefacts(
+    {PickleSerializer: "labels"},
+    child_detectors=[TorchModuleDetector, *DefaultDetectors.child_detectors()],
+)
+class PackedModule(nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.encoder = nn.Linear(4, 4)
+        self.norm = nn.BatchNorm1d(4)
+        self.scale = nn.Parameter(torch.ones(1))
+        self.labels = ["a", "b"]
+
+
+def trained_model() -> PackedModel:
+    model = PackedModel()
+    model.net.train()
+    model.net(torch.rand(8, 1, 6, 6))
+    return model
+
+
+def assert_same_state(source: nn.Module, target: nn.Module):
+    for (name, tensor) in source.state_dict().items():
+        assert torch.equal(tensor, target.state_dict()[name]), name
+
+
+def test_module_packed():
+    plan = ArtefactPlan.for_model(PackedModel())
+    assert plan.children["net"].access_interface is TorchModuleAccessInterface
+    assert plan.artefact_paths() == {"net.state": TorchModuleSerializer}
+
+
+def test_packed_roundtrip():
+    source = trained_model()
+    target = PackedModel()
+    weight = target.net[0].weight
+    loads(target, saves(source))
+    assert target.net[0].weight is weight
+    # Buffers such as BatchNorm's running statistics are saved alongside Parameters
+    assert_same_state(source.net, target.net)
+
+
+def test_packed_memory_map():
+    source = trained_model()
+    target = PackedModel()
+    loads(target, saves(source), memory_map=True)
+    assert_same_state(source.net, target.net)
+
+
+def test_packed_lazy_load():
+    source = trained_model()
+    target = PackedModel()
+    loads(target, saves(source), lazy=True)
+    target.net.eval()
+    target.net(torch.rand(2, 1, 6, 6))
+    assert_same_state(source.net, target.net)
+
+
+def test_packed_background_save():
+    source = trained_model()
+    expected = {
+        name: tensor.clone() for (name, tensor) in source.net.state_dict().items()
+    }
+    future = saves_background(source)
+    with torch.no_grad():
+        source.net[0].weight.add_(1)
+    target = PackedModel()
+    loads(target, future.result())
+    for (name, tensor) in expected.items():
+        assert torch.equal(tensor, target.net.state_dict()[name]), name
+
+
+def test_top_level_module_packed():
+    source = PackedModule()
+    source.train()
+    source.norm(source.encoder(torch.rand(8, 4)))
+    source.labels = ["c"]
+    plan = ArtefactPlan.for_model(source)
+    assert plan.access_interface is TorchModuleAccessInterface
+    assert plan.artefact_paths() == {
+        "state": TorchModuleSerializer,
+        "labels": PickleSerializer,
+    }
+
+    target = PackedModule()
+    weight = target.encoder.weight
+    loads(target, saves(source))
+    assert target.encoder.weight is weight
+    assert target.labels == ["c"]
+    assert_same_state(source, target)
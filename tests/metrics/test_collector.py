@@ -0,0 +1,38 @@
+import multiprocessing
+
+from jackdaw_ml.artefact_decorator import artefacts
+from jackdaw_ml.artefact_endpoint import ArtefactEndpoint
+from jackdaw_ml.metric_collector import MetricCollector
+from jackdaw_ml.run_id import RunID
+
+
+@artefacts()
+class WorkerModel:
+    def __init__(self):
+        self.x = 5
+
+
+def log_from_worker(model: WorkerModel, run_ids: multiprocessing.Queue) -> None:
+    for step in range(50):
+        model._log_metric("Loss", float(step))
+    run_ids.put(RunID.uuid(RunID.id(ArtefactEndpoint.default())))
+
+
+def test_metrics_collected_from_workers():
+    context = multiprocessing.get_context("fork")
+    model = WorkerModel()
+    model._log_metric("Loss", 0.0)
+    run_ids = context.Queue()
+    with MetricCollector(context=context) as collector:
+        workers = [
+            context.Process(target=log_from_worker, args=(model, run_ids))
+            for _ in range(2)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        worker_run_ids = {run_ids.get(), run_ids.get()}
+    assert collector.collected == 100
+    assert len(collector._loggers) == 1
+    assert worker_run_ids == {collector.sink.run_id}
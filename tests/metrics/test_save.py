@@ -1,4 +1,18 @@
+import datetime
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
 from jackdaw_ml.artefact_decorator import artefacts
+from jackdaw_ml.artefact_endpoint import ArtefactEndpoint
+from jackdaw_ml import metric_logging
+from jackdaw_ml.metric_logging import MetricQueue
+from jackdaw_ml.metric_wal import MetricWAL, _RunInfo
+from jackdaw_ml.run_id import RunID
+from jackdaw_ml.vcs import get_vcs_info
 
 
 @artefacts()
@@ -10,3 +24,134 @@ class MyModel:
 def test_save_metric():
     model = MyModel()
     model._log_metric("MyMetric", 0)
+
+
+class RecordingRun:
+    def __init__(self):
+        self.batches = []
+        self.sent = threading.Event()
+
+    def save_metrics(self, endpoint, metrics):
+        self.batches.append(list(metrics))
+        self.sent.set()
+
+
+def test_save_many_metrics():
+    model = MyModel()
+    for step in range(1_000):
+        model._log_metric("Loss", 1 / (step + 1))
+    model._logger.queue.flush()
+
+
+def test_metrics_sent_in_batches():
+    run = RecordingRun()
+    queue = MetricQueue(ArtefactEndpoint.default(), run, max_size=10)
+    for step in range(25):
+        queue.log("Loss", float(step))
+    assert run.sent.wait(timeout=5)
+    queue.close()
+    metrics = [metric for batch in run.batches for metric in batch]
+    assert [value for (_, _, value) in metrics] == [float(step) for step in range(25)]
+    assert len(run.batches) < 25
+
+
+def test_metrics_sent_on_interval():
+    run = RecordingRun()
+    queue = MetricQueue(ArtefactEndpoint.default(), run, flush_interval=0.01)
+    queue.log("Loss", 1.0)
+    assert run.sent.wait(timeout=5)
+    queue.close()
+
+
+class FailingRun:
+    def __init__(self):
+        self.attempts = 0
+
+    def save_metrics(self, endpoint, metrics):
+        self.attempts += 1
+        raise ConnectionError("Endpoint unavailable")
+
+
+def test_full_queue_drops_metrics():
+    run = FailingRun()
+    queue = MetricQueue(
+        ArtefactEndpoint.default(),
+        run,
+        max_size=10,
+        max_pending=10,
+        flush_interval=60,
+        block_timeout=0.01,
+    )
+    for step in range(15):
+        queue.log("Loss", float(step))
+    assert len(queue._inner) == 10
+    assert queue._dropped == 5
+    queue.model_run = RecordingRun()
+    queue.close()
+
+
+def test_full_queue_spills_to_wal(tmp_path):
+    endpoint = ArtefactEndpoint.default()
+    run_info = _RunInfo.from_run(
+        endpoint, RunID.id(endpoint), "SpilledModel", "SpilledModel", get_vcs_info()
+    )
+    # Compacted on every commit, moving the spilled metrics within the log
+    wal = MetricWAL(tmp_path / "run.wal", run_info, compact_size=0)
+    queue = MetricQueue(
+        endpoint, FailingRun(), max_size=10, max_pending=10, flush_interval=60, wal=wal
+    )
+    start = time.monotonic()
+    for step in range(35):
+        queue.log("Loss", float(step))
+    # Metrics beyond the queue are held in the log, without waiting for the endpoint
+    assert time.monotonic() - start < 1
+    assert queue._spilled_from is not None
+    assert len(queue._inner) <= 10
+    assert queue._dropped == 0
+    queue.model_run = RecordingRun()
+    queue.close()
+    sent = [value for batch in queue.model_run.batches for (_, _, value) in batch]
+    assert sent == [float(step) for step in range(35)]
+    assert not (tmp_path / "run.wal").exists()
+
+
+def test_failed_sends_back_off():
+    run = FailingRun()
+    queue = MetricQueue(ArtefactEndpoint.default(), run, flush_interval=0.01)
+    queue.log("Loss", 1.0)
+    time.sleep(0.5)
+    # Retried after 0.02s, 0.04s, 0.08s, 0.16s and so on, rather than every 0.01s
+    assert 1 < run.attempts <= 7
+    queue.model_run = RecordingRun()
+    queue.close()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="Requires fork")
+def test_fork_while_creating_queue():
+    with metric_logging._MODEL_RUN_QUEUES_LOCK:
+        pid = os.fork()
+        if pid == 0:
+            acquired = metric_logging._MODEL_RUN_QUEUES_LOCK.acquire(timeout=5)
+            os._exit(0 if acquired else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
+
+
+def test_save_metric_array():
+    model = MyModel()
+    model._log_metrics("Loss", np.linspace(1, 0, 1_000))
+    model._logger.queue.flush()
+
+
+def test_metric_array_steps():
+    run = RecordingRun()
+    queue = MetricQueue(ArtefactEndpoint.default(), run)
+    before = datetime.datetime.now()
+    queue.log_many("Loss", np.array([0.3, 0.1, 0.2]), steps=np.array([3, 1, 2]))
+    after = datetime.datetime.now()
+    queue.close()
+    metrics = [metric for batch in run.batches for metric in batch]
+    assert [value for (_, _, value) in metrics] == [0.1, 0.2, 0.3]
+    assert all(name == "Loss" for (_, name, _) in metrics)
+    # Timestamped with the time they were logged, rather than offset by their steps
+    assert all(before <= timestamp <= after for (timestamp, _, _) in metrics)
@@ -0,0 +1,164 @@
+import datetime
+import uuid
+
+from jackdaw_ml.artefact_decorator import artefacts
+from jackdaw_ml.artefact_endpoint import ArtefactEndpoint
+from jackdaw_ml.metric_logging import MetricLogger, MetricQueue
+from jackdaw_ml.metric_wal import (_END_OF_LOG, MetricWAL, _encode, _read,
+                                   _RunInfo, replay_metrics)
+from jackdaw_ml.run_id import RunID
+from jackdaw_ml.vcs import get_vcs_info
+
+
+class FailingRun:
+    def save_metrics(self, endpoint, metrics):
+        raise ConnectionError("Endpoint unavailable")
+
+
+def run_info() -> _RunInfo:
+    return _RunInfo.from_run(
+        ArtefactEndpoint.default(),
+        RunID.id(ArtefactEndpoint.default()),
+        str(uuid.uuid4()),
+        "WALModel",
+        get_vcs_info(),
+    )
+
+
+def metrics(count: int):
+    start = datetime.datetime(2023, 1, 1)
+    return [
+        (start + datetime.timedelta(seconds=step), "Loss", float(step))
+        for step in range(count)
+    ]
+
+
+def test_wal_roundtrip(tmp_path):
+    wal = MetricWAL(tmp_path / "run.wal", run_info())
+    wal.append(metrics(10))
+    wal.sync()
+    (_, records) = _read(wal.path)
+    assert [metric for (metric, _) in records] == metrics(10)
+
+
+def test_wal_ignores_torn_record(tmp_path):
+    wal = MetricWAL(tmp_path / "run.wal", run_info())
+    wal.append(metrics(10))
+    wal.sync()
+    with open(wal.path, "r+b") as f:
+        f.truncate(wal.tell() - 3)
+    (_, records) = _read(wal.path)
+    assert [metric for (metric, _) in records] == metrics(9)
+
+
+def test_wal_commit(tmp_path):
+    wal = MetricWAL(tmp_path / "run.wal", run_info())
+    first = wal.append(metrics(5))
+    wal.append(metrics(10)[5:])
+    wal.commit(first)
+    (_, records) = _read(wal.path)
+    assert [metric for (metric, _) in records] == metrics(10)[5:]
+
+    wal.commit(wal.tell())
+    (_, records) = _read(wal.path)
+    assert list(records) == []
+    wal.close()
+    assert not wal.path.exists()
+
+
+def test_wal_compacted(tmp_path):
+    wal = MetricWAL(tmp_path / "run.wal", run_info(), compact_size=0)
+    start = wal.tell()
+    sent = wal.append(metrics(10))
+    wal.append(metrics(12)[10:])
+    wal.commit(sent)
+    # Sent metrics are dropped, leaving the unsent metrics at the start of the log
+    assert wal.path.stat().st_size == wal.tell() < sent
+    (_, records) = _read(wal.path)
+    assert [metric for (metric, _) in records] == metrics(12)[10:]
+
+    wal.commit(wal.append(metrics(15)[12:]) - len(_encode(*metrics(15)[14])))
+    (_, records) = _read(wal.path)
+    assert [metric for (metric, _) in records] == metrics(15)[14:]
+    assert wal.tell() - start == len(_encode(*metrics(15)[14]))
+
+
+def test_wal_compaction_interrupted(tmp_path):
+    wal = MetricWAL(tmp_path / "run.wal", run_info())
+    start = wal.tell()
+    sent = wal.append(metrics(10))
+    wal.append(metrics(12)[10:])
+    wal.sync()
+    # As left by a process that died after moving its unsent metrics, but before truncating the log
+    unsent = wal.path.read_bytes()[sent:]
+    with open(wal.path, "r+b") as f:
+        f.seek(start)
+        f.write(unsent + _END_OF_LOG)
+    (_, records) = _read(wal.path)
+    assert [metric for (metric, _) in records] == metrics(12)[10:]
+
+
+def test_failed_metrics_replayed(tmp_path):
+    info = run_info()
+    queue = MetricQueue(
+        ArtefactEndpoint.default(),
+        FailingRun(),
+        wal=MetricWAL(tmp_path / "run.wal", info),
+    )
+    for step in range(100):
+        queue.log("Loss", float(step))
+    try:
+        queue.close()
+    except ConnectionError:
+        pass
+    assert (tmp_path / "run.wal").exists()
+
+    assert replay_metrics(ArtefactEndpoint.default(), tmp_path, batch_size=30) == 100
+    assert not (tmp_path / "run.wal").exists()
+
+
+def test_replay_skips_logs_in_use(tmp_path):
+    wal = MetricWAL(tmp_path / "run.wal", run_info())
+    wal.append(metrics(10))
+    wal.sync()
+    assert replay_metrics(ArtefactEndpoint.default(), tmp_path) == 0
+    assert wal.path.exists()
+
+
+def test_replay_only_sends_to_own_endpoint(tmp_path):
+    wal = MetricWAL(tmp_path / "logs" / "run.wal", run_info())
+    wal.append(metrics(10))
+    wal.sync()
+    wal._file.close()
+    other = ArtefactEndpoint.local(tmp_path / "registry.sqlite", tmp_path / "storage")
+    assert replay_metrics(other, tmp_path / "logs") == 0
+    assert replay_metrics(ArtefactEndpoint(other.endpoint), tmp_path / "logs") == 0
+    assert wal.path.exists()
+    assert replay_metrics(ArtefactEndpoint.default(), tmp_path / "logs") == 10
+
+
+def test_registered_run_replayed(tmp_path):
+    logger = MetricLogger(
+        "RegisteredModel", uuid.uuid4(), ArtefactEndpoint.default(), tmp_path
+    )
+    logger.queue.model_run = FailingRun()
+    for step in range(10):
+        logger.queue.log("Loss", float(step))
+    try:
+        logger.queue.close()
+    except ConnectionError:
+        pass
+
+    assert replay_metrics(ArtefactEndpoint.default(), tmp_path) == 10
+    assert list(tmp_path.glob("*.wal")) == []
+
+
+def test_wal_directory_set_by_decorator(tmp_path):
+    @artefacts({}, name="WALDirectoryModel", wal_directory=tmp_path)
+    class WALDirectoryModel:
+        pass
+
+    model = WALDirectoryModel()
+    model._log_metric("Loss", 1.0)
+    assert [path.parent for path in tmp_path.glob("*.wal")] == [tmp_path]
+    model._logger.queue.close()
@@ -0,0 +1,130 @@
+import datetime
+import sqlite3
+import uuid
+
+import pyarrow as pa
+import pytest
+from artefact_link import PyModelRun, PyRunID
+
+from jackdaw_ml import saves
+from jackdaw_ml.artefact_decorator import artefacts
+from jackdaw_ml.artefact_endpoint import ArtefactEndpoint
+from jackdaw_ml.run_id import RunID
+from jackdaw_ml.search import METRIC_SCHEMA, Searcher
+from jackdaw_ml.serializers.pickle import PickleSerializer
+from jackdaw_ml.vcs import get_vcs_info
+
+
+def register_metrics(
+    model_name: str, values: list, metric_name: str = "Loss"
+) -> PyRunID:
+    """Register a Model Run, and record its metrics in the local registry"""
+    endpoint = ArtefactEndpoint.default()
+    run_id = PyRunID(endpoint.endpoint)
+    PyModelRun(
+        endpoint=endpoint.endpoint,
+        run_id=run_id,
+        model_uuid=str(uuid.uuid4()),
+        model_name=model_name,
+        vcs=get_vcs_info(),
+    )
+    start = datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc)
+    with endpoint.registry_lock(), sqlite3.connect(
+        endpoint.local_registry_path()
+    ) as connection:
+        (model_run_id,) = connection.execute(
+            "SELECT id FROM model_run WHERE run_id = ? AND model_name = ?",
+            (uuid.UUID(RunID.uuid(run_id)).bytes, model_name),
+        ).fetchone()
+        connection.executemany(
+            "INSERT INTO metric (model_run_id, metric_name, metric_value, time, tags) VALUES (?, ?, ?, ?, '{}')",
+            [
+                (
+                    model_run_id,
+                    metric_name,
+                    value,
+                    (start + datetime.timedelta(microseconds=step)).isoformat(),
+                )
+                for (step, value) in enumerate(values)
+            ],
+        )
+    return run_id
+
+
+def test_search_metrics():
+    model_name = f"MetricSearchModel{uuid.uuid4().hex}"
+    run_id = register_metrics(model_name, [0.5, 0.4, 0.3])
+
+    table = Searcher(ArtefactEndpoint.default()).with_name(model_name).metrics_table()
+    assert table.schema == METRIC_SCHEMA
+    assert table.column("metric_value").to_pylist() == [0.5, 0.4, 0.3]
+    assert set(table.column("run_id").to_pylist()) == {RunID.uuid(run_id)}
+    assert table.column("time").to_pylist()[1] == datetime.datetime(
+        2023, 1, 1, microsecond=1, tzinfo=datetime.timezone.utc
+    )
+
+    columns = Searcher(ArtefactEndpoint.default()).with_name(model_name).metrics()
+    assert list(columns["metric_value"]) == [0.5, 0.4, 0.3]
+
+
+def test_search_metrics_in_chunks():
+    model_name = f"MetricSearchModel{uuid.uuid4().hex}"
+    register_metrics(model_name, [float(step) for step in range(10)])
+    batches = list(
+        Searcher(ArtefactEndpoint.default()).with_name(model_name).iter_metrics(4)
+    )
+    assert [batch.num_rows for batch in batches] == [4, 4, 2]
+
+
+def test_search_metrics_by_run_and_filter():
+    model_name = f"MetricSearchModel{uuid.uuid4().hex}"
+    first_run = register_metrics(model_name, [0.9, 0.8])
+    register_metrics(model_name, [0.2, 0.1])
+
+    searcher = Searcher(ArtefactEndpoint.default()).with_name(model_name)
+    assert searcher.metrics_table().num_rows == 4
+    assert Searcher(ArtefactEndpoint.default()).with_name(model_name).with_runs(
+        first_run
+    ).metrics_table().column("metric_value").to_pylist() == [0.9, 0.8]
+    assert Searcher(ArtefactEndpoint.default()).with_name(model_name).with_metric(
+        "<", "Loss", 0.15
+    ).metrics_table().column("metric_value").to_pylist() == [0.2, 0.1]
+
+
+def test_search_metrics_empty():
+    table = (
+        Searcher(ArtefactEndpoint.default())
+        .with_name(f"MetricSearchModel{uuid.uuid4().hex}")
+        .metrics_table()
+    )
+    assert table.num_rows == 0
+    assert isinstance(table, pa.Table)
+
+
+def test_metrics_need_known_registry(tmp_path):
+    endpoint = ArtefactEndpoint.local(tmp_path / "registry.sqlite", tmp_path)
+    assert endpoint.local_registry_path() == tmp_path / "registry.sqlite"
+    assert Searcher(endpoint).metrics_table().num_rows == 0
+    assert (
+        ArtefactEndpoint.local(tmp_path / "registry").local_registry_path()
+        == tmp_path / "registry.sqlite"
+    )
+
+    # The registry of an Endpoint built directly could be anywhere, so isn't guessed
+    unknown = ArtefactEndpoint(endpoint.endpoint)
+    assert unknown.local_registry_path() is None
+    with pytest.raises(NotImplementedError):
+        Searcher(unknown).metrics_table()
+
+
+def test_local_registry_path_is_written(tmp_path):
+    endpoint = ArtefactEndpoint.local(tmp_path / "registry.sqlite", tmp_path)
+
+    @artefacts({PickleSerializer: ["value"]}, endpoint=endpoint)
+    class LocalModel:
+        def __init__(self):
+            self.value = 1
+
+    saves(LocalModel())
+    assert endpoint.local_registry_path().exists()
+    assert len(Searcher(endpoint).with_name("LocalModel").models()) == 1
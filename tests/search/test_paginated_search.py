@@ -0,0 +1,72 @@
+import uuid
+
+from jackdaw_ml import saves
+from jackdaw_ml.artefact_decorator import artefacts
+from jackdaw_ml.artefact_endpoint import ArtefactEndpoint
+from jackdaw_ml.search import Searcher
+from jackdaw_ml.serializers.pickle import PickleSerializer
+from tests.search.test_metric_search import register_metrics
+
+
+def model_class(accuracy: float) -> type:
+    class RankedModel:
+        def __init__(self):
+            self.model = accuracy
+
+    # Models are saved under their class name, so each class is given its own
+    RankedModel.__qualname__ = f"RankedModel{uuid.uuid4().hex}"
+    return artefacts({PickleSerializer: ["model"]})(RankedModel)
+
+
+def test_top_models_by_metric():
+    accuracies = [0.7, 0.9, 0.5, 0.8]
+    names = []
+    for accuracy in accuracies:
+        model = model_class(accuracy)
+        saves(model())
+        register_metrics(model.__model_name__, [accuracy], metric_name="Accuracy")
+        names.append(model.__model_name__)
+
+    pages = list(
+        Searcher(ArtefactEndpoint.default())
+        .with_name(names)
+        .order_by("Accuracy", descending=True)
+        .limit(3)
+        .iter_models(page_size=2)
+    )
+    assert [len(page) for page in pages] == [2, 1]
+    assert [model.model_id.name for page in pages for model in page] == [
+        names[1],
+        names[3],
+        names[0],
+    ]
+
+
+def test_limit_models():
+    names = []
+    for _ in range(3):
+        model = model_class(0.0)
+        saves(model())
+        names.append(model.__model_name__)
+    searcher = Searcher(ArtefactEndpoint.default()).with_name(names)
+    assert len(searcher.models()) == 3
+    assert len(searcher.limit(2).models()) == 2
+
+
+def test_ordered_models_listed_in_order():
+    accuracies = [0.2, 0.6, 0.4]
+    names = []
+    for accuracy in accuracies:
+        model = model_class(accuracy)
+        saves(model())
+        register_metrics(model.__model_name__, [accuracy], metric_name="Accuracy")
+        names.append(model.__model_name__)
+
+    models = (
+        Searcher(ArtefactEndpoint.default())
+        .with_name(names)
+        .order_by("Accuracy")
+        .models()
+    )
+    assert isinstance(models, list)
+    assert [model.model_id.name for model in models] == [names[0], names[2], names[1]]
@@ -0,0 +1,104 @@
+import time
+
+import jackdaw_ml.search
+from jackdaw_ml import saves
+from jackdaw_ml.artefact_decorator import artefacts
+from jackdaw_ml.artefact_endpoint import ArtefactEndpoint
+from jackdaw_ml.metric_logging import MetricQueue
+from jackdaw_ml.search import Searcher
+from jackdaw_ml.search.cache import SearchCache, invalidate_search_cache
+from jackdaw_ml.serializers.pickle import PickleSerializer
+
+
+@artefacts({PickleSerializer: ["model"]})
+class CachedSearchModel:
+    def __init__(self):
+        self.model = 4
+
+
+class CountingSearch:
+    def __init__(self, monkeypatch):
+        self.calls = 0
+        search_for_models = jackdaw_ml.search.search_for_models
+
+        def counting_search(*args, **kwargs):
+            self.calls += 1
+            return search_for_models(*args, **kwargs)
+
+        monkeypatch.setattr(jackdaw_ml.search, "search_for_models", counting_search)
+
+
+class RecordingRun:
+    def save_metrics(self, endpoint, metrics):
+        pass
+
+
+def searcher() -> Searcher:
+    return Searcher(ArtefactEndpoint.default()).with_name("CachedSearchModel")
+
+
+def test_repeated_search_cached(monkeypatch):
+    search = CountingSearch(monkeypatch)
+    saves(CachedSearchModel())
+    assert searcher().models() == searcher().models()
+    assert search.calls == 1
+    searcher().models(cache=False)
+    assert search.calls == 2
+
+
+def test_search_cache_invalidated_by_saves(monkeypatch):
+    search = CountingSearch(monkeypatch)
+    invalidate_search_cache()
+    before = searcher().models()
+    x = CachedSearchModel()
+    x.model = time.time_ns()
+    saves(x)
+    assert len(searcher().models()) == len(before) + 1
+    assert search.calls == 2
+
+
+def test_search_cache_expiry():
+    cache = SearchCache(max_size=2, ttl=0.05)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    # "b" was used least recently
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert len(cache) == 1
+
+
+def test_metric_searches_invalidated_by_metrics(monkeypatch):
+    search = CountingSearch(monkeypatch)
+    invalidate_search_cache()
+    metric_searcher = searcher().with_metric(">", "accuracy", 0.5)
+    metric_searcher.models()
+    searcher().models()
+    assert search.calls == 2
+
+    queue = MetricQueue(ArtefactEndpoint.default(), RecordingRun())
+    queue.log("accuracy", 0.9)
+    queue.close()
+    metric_searcher.models()
+    assert search.calls == 3
+    # Searches that don't depend on metrics are kept
+    searcher().models()
+    assert search.calls == 3
+
+
+def test_cache_keys_identify_endpoints():
+    assert (
+        ArtefactEndpoint.remote("key-a").cache_key()
+        == ArtefactEndpoint.remote("key-a").cache_key()
+    )
+    assert (
+        ArtefactEndpoint.remote("key-a").cache_key()
+        != ArtefactEndpoint.remote("key-b").cache_key()
+    )
+    assert ArtefactEndpoint.default().cache_key() == ArtefactEndpoint.local().cache_key()
+    # Endpoints of unknown identity never share results
+    endpoint = ArtefactEndpoint.remote("key-a").endpoint
+    assert ArtefactEndpoint(endpoint).cache_key() != ArtefactEndpoint(endpoint).cache_key()
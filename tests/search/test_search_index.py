@@ -0,0 +1,57 @@
+import sqlite3
+import uuid
+
+from jackdaw_ml import saves
+from jackdaw_ml.artefact_endpoint import ArtefactEndpoint
+from jackdaw_ml.search.index import connect_search_index, ensure_search_index
+from tests.search.test_metric_search import register_metrics
+from tests.search.test_paginated_search import model_class
+
+
+def test_latest_metric_indexed():
+    endpoint = ArtefactEndpoint.default()
+    model_name = f"IndexedModel{uuid.uuid4().hex}"
+    register_metrics(model_name, [0.5])
+    connect_search_index(endpoint).close()
+    register_metrics(model_name, [0.4, 0.3, 0.2])
+
+    connection = connect_search_index(endpoint)
+    try:
+        values = connection.execute(
+            "SELECT latest.metric_value FROM latest_metric AS latest "
+            "JOIN registry.model_run AS model_run ON latest.model_run_id = model_run.id "
+            "WHERE model_run.model_name = ? ORDER BY latest.metric_value",
+            (model_name,),
+        ).fetchall()
+    finally:
+        connection.close()
+    assert values == [(0.2,), (0.5,)]
+
+
+def test_registry_schema_left_to_artefact_link():
+    endpoint = ArtefactEndpoint.default()
+    register_metrics(f"IndexedModel{uuid.uuid4().hex}", [0.5])
+    ensure_search_index(endpoint)
+    connect_search_index(endpoint).close()
+    with sqlite3.connect(endpoint.local_registry_path()) as connection:
+        derived = connection.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') AND name LIKE 'jackdaw%'"
+        ).fetchall()
+    assert derived == []
+
+
+def test_repository_search_uses_index():
+    endpoint = ArtefactEndpoint.default()
+    saves(model_class(0.0)())
+    assert ensure_search_index(endpoint)
+    with sqlite3.connect(endpoint.local_registry_path()) as connection:
+        plan = connection.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM vcs WHERE remote_repository = ? AND branch = ?",
+            ("jackdaw", "main"),
+        ).fetchall()
+    assert "jackdaw_vcs_repository_index" in str(plan)
+
+
+def test_only_local_registries_indexed():
+    assert not ensure_search_index(ArtefactEndpoint.remote("api-key"))
+    assert connect_search_index(ArtefactEndpoint.remote("api-key")) is None
@@ -0,0 +1,113 @@
+import warnings
+
+import numpy as np
+import pyarrow as pa
+import torch
+
+from jackdaw_ml.resource import Resource
+from jackdaw_ml.serializers.pickle import PickleSerializer
+from jackdaw_ml.serializers.tensor import (TensorSerializer,
+                                           TorchModuleSerializer,
+                                           TorchModuleState, TorchSerializer)
+
+
+def test_resource_wraps_buffer_without_copy():
+    buffer = pa.py_buffer(np.arange(100, dtype=np.float32))
+    resource = Resource(buffer)
+    assert resource.view().obj is buffer
+    assert len(resource) == buffer.size
+    assert bytes(resource) == buffer.to_pybytes()
+
+
+def test_tensor_to_file_matches_resource(tmp_path):
+    tensor = pa.Tensor.from_numpy(np.random.rand(16, 8))
+    filename = TensorSerializer.to_file(tensor, tmp_path / "tensor.artefact")
+    assert filename.read_bytes() == bytes(TensorSerializer.to_resource(tensor))
+
+
+def test_torch_roundtrip_file(tmp_path):
+    parameter = torch.nn.Parameter(torch.rand(4, 3))
+    filename = TorchSerializer.to_file(parameter, tmp_path / "torch.artefact")
+    loaded = TorchSerializer.from_resource(None, Resource(filename.read_bytes()))
+    assert torch.equal(parameter, loaded)
+
+
+def test_pickle_to_file_matches_resource(tmp_path):
+    item = {"a": list(range(1_000))}
+    filename = PickleSerializer.to_file(item, tmp_path / "pickle.artefact")
+    assert filename.read_bytes() == bytes(PickleSerializer.to_resource(item))
+
+
+def test_torch_loads_in_place():
+    source = torch.nn.Parameter(torch.rand(4, 3))
+    existing = torch.nn.Parameter(torch.zeros(4, 3))
+    storage = existing.data_ptr()
+    loaded = TorchSerializer.from_resource(
+        existing, TorchSerializer.to_resource(source)
+    )
+    assert loaded is existing
+    assert existing.data_ptr() == storage
+    assert torch.equal(source, existing)
+
+
+def test_torch_replaces_mismatched_shape():
+    source = torch.nn.Parameter(torch.rand(4, 3))
+    existing = torch.nn.Parameter(torch.zeros(2, 3), requires_grad=False)
+    loaded = TorchSerializer.from_resource(
+        existing, TorchSerializer.to_resource(source)
+    )
+    assert loaded is not existing
+    assert not loaded.requires_grad
+    assert torch.equal(source, loaded)
+
+
+def test_torch_loads_from_bytes_writable():
+    source = torch.nn.Parameter(torch.rand(4, 3))
+    resource = Resource(bytes(TorchSerializer.to_resource(source)))
+    for existing in [None, torch.nn.Parameter(torch.zeros(2, 3))]:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            loaded = TorchSerializer.from_resource(existing, resource)
+        with torch.no_grad():
+            loaded.add_(1)
+        assert torch.equal(source + 1, loaded)
+
+
+def test_torch_module_roundtrip(tmp_path):
+    source = torch.nn.Sequential(
+        torch.nn.Linear(4, 3), torch.nn.BatchNorm1d(3), torch.nn.Linear(3, 2)
+    )
+    source.train()
+    source(torch.rand(8, 4))
+    source[2].to(torch.bfloat16)
+    filename = TorchModuleSerializer.to_file(
+        TorchModuleState(source), tmp_path / "module.artefact"
+    )
+    assert filename.read_bytes() == bytes(
+        TorchModuleSerializer.to_resource(TorchModuleState(source))
+    )
+
+    target = torch.nn.Sequential(
+        torch.nn.Linear(4, 3), torch.nn.BatchNorm1d(3), torch.nn.Linear(3, 2)
+    )
+    target[2].to(torch.bfloat16)
+    weight = target[0].weight
+    TorchModuleSerializer.from_resource(
+        TorchModuleState(target), Resource(filename.read_bytes())
+    )
+    assert target[0].weight is weight
+    for (name, tensor) in source.state_dict().items():
+        assert torch.equal(tensor, target.state_dict()[name])
+
+
+def test_torch_module_snapshot():
+    module = torch.nn.Linear(4, 3)
+    expected = module.weight.detach().clone()
+    snapshot = TorchModuleSerializer.snapshot(TorchModuleState(module))
+    with torch.no_grad():
+        module.weight.add_(1)
+    loaded = TorchModuleSerializer.from_resource(
+        None, TorchModuleSerializer.to_resource(snapshot)
+    )
+    (_, _, weight) = next(loaded.named_tensors())
+    assert torch.equal(weight, expected)
@@ -0,0 +1,95 @@
+import inspect
+
+import torch.nn as nn
+
+import jackdaw_ml.detectors.torch  # noqa: F401
+from jackdaw_ml.access_interface import DefaultAccessInterface
+
+
+class Counted:
+    _reads = 0
+    weight = 1.0
+
+    def __init__(self):
+        self.bias = 2.0
+        self._private = 3.0
+
+    @property
+    def scaled(self) -> float:
+        Counted._reads += 1
+        return self.weight * 2
+
+    def predict(self, x: float) -> float:
+        return x * self.weight
+
+    @classmethod
+    def create(cls) -> "Counted":
+        return cls()
+
+    @staticmethod
+    def helper() -> None:
+        pass
+
+
+class CustomDir:
+    def __init__(self):
+        self.visible = 1
+
+    def __dir__(self):
+        return ["hidden", "visible"]
+
+    def __getattr__(self, name):
+        if name == "hidden":
+            return 2
+        raise AttributeError(name)
+
+
+def dir_keys(container):
+    return [
+        name
+        for name in dir(container)
+        if not name.startswith("_")
+        and not inspect.ismethod(getattr(container, name))
+        and not inspect.isfunction(getattr(container, name))
+    ]
+
+
+def test_attributes_read_once():
+    Counted._reads = 0
+    items = dict(DefaultAccessInterface._named_items(Counted()))
+    assert items == {"bias": 2.0, "scaled": 2.0, "weight": 1.0}
+    assert Counted._reads == 1
+
+
+def test_instance_attributes_hide_methods():
+    model = Counted()
+    model.predict = 5.0
+    assert DefaultAccessInterface._keys(model) == [
+        "bias",
+        "predict",
+        "scaled",
+        "weight",
+    ]
+
+
+def test_class_attributes_added():
+    model = Counted()
+    assert "added" not in DefaultAccessInterface._keys(model)
+    Counted.added = 4.0
+    try:
+        assert "added" in DefaultAccessInterface._keys(model)
+    finally:
+        del Counted.added
+
+
+def test_custom_dir():
+    assert DefaultAccessInterface._keys(CustomDir()) == ["hidden", "visible"]
+
+
+def test_torch_registries():
+    for module in [
+        nn.Sequential(nn.Linear(2, 2), nn.BatchNorm1d(2)),
+        nn.BatchNorm1d(2),
+        nn.LSTM(2, 2),
+    ]:
+        assert DefaultAccessInterface._keys(module) == dir_keys(module)
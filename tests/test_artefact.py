@@ -1,3 +1,5 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 import pytest
 
 from jackdaw_ml import loads, saves
@@ -57,3 +59,38 @@ def test_dump_loads(test_model):
     model2 = test_model()
     loads(model2, artefact_ids)
     assert model2.m == model.m
+
+
+@pytest.mark.parametrize("test_model", models)
+def test_parallel_dump_loads(test_model):
+    model = test_model()
+    model.m = 400
+    serial_id = saves(model)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        parallel_id = saves(model, executor=executor)
+    assert (
+        serial_id.artefact_schema_id.as_string()
+        == parallel_id.artefact_schema_id.as_string()
+    )
+    model2 = test_model()
+    loads(model2, parallel_id)
+    assert model2.m == model.m
+
+
+@pytest.mark.parametrize("test_model", models)
+def test_process_pool_dump_loads(test_model):
+    model = test_model()
+    model.m = 401
+    serial_id = saves(model)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        # Deduplicated against the serial save, as well as saved without deduplication
+        parallel_id = saves(model, executor=executor)
+        undeduplicated_id = saves(model, executor=executor, deduplicate=False)
+    for model_id in (parallel_id, undeduplicated_id):
+        assert (
+            serial_id.artefact_schema_id.as_string()
+            == model_id.artefact_schema_id.as_string()
+        )
+        model2 = test_model()
+        loads(model2, model_id)
+        assert model2.m == model.m
@@ -0,0 +1,107 @@
+import torch
+import torch.nn as nn
+
+from jackdaw_ml import loads, saves
+from jackdaw_ml.artefact_decorator import artefacts
+from jackdaw_ml.artefact_plan import ArtefactPlan
+from jackdaw_ml.serializers.pickle import PickleSerializer
+from jackdaw_ml.serializers.tensor import TorchSerializer
+from jackdaw_ml.trace import trace_artefacts
+
+
+@artefacts({PickleSerializer: "m"})
+class PlanModel:
+    def __init__(self) -> None:
+        self.m = 3
+
+
+@artefacts({})
+class NestedTorchModel(nn.Module):
+    def __init__(self):
+        super(NestedTorchModel, self).__init__()
+        self.encoder = nn.Sequential(nn.Linear(4, 4), nn.ReLU(), nn.Linear(4, 2))
+        self.head = nn.Linear(2, 1)
+
+
+def test_plan_is_cached():
+    model = PlanModel()
+    plan = ArtefactPlan.for_model(model)
+    _ = saves(model)
+    assert ArtefactPlan.for_model(model) is plan
+
+
+def test_plan_recompiles_on_structure_change():
+    model = NestedTorchModel()
+    plan = ArtefactPlan.for_model(model)
+    model.decoder = nn.Linear(1, 2)
+    new_plan = ArtefactPlan.for_model(model)
+    assert new_plan is not plan
+    assert "decoder" in new_plan.children
+
+
+def test_plan_artefact_paths():
+    model = NestedTorchModel()
+    paths = ArtefactPlan.for_model(model).artefact_paths()
+    assert paths == {
+        "encoder.0.bias": TorchSerializer,
+        "encoder.0.weight": TorchSerializer,
+        "encoder.2.bias": TorchSerializer,
+        "encoder.2.weight": TorchSerializer,
+        "head.bias": TorchSerializer,
+        "head.weight": TorchSerializer,
+    }
+
+
+def test_plan_survives_loads():
+    model = NestedTorchModel()
+    model_id = saves(model)
+    new_model = NestedTorchModel()
+    loads(new_model, model_id)
+    plan = ArtefactPlan.for_model(new_model)
+    loads(new_model, model_id)
+    assert ArtefactPlan.for_model(new_model) is plan
+
+
+@artefacts({PickleSerializer: "m"})
+class PropertyModel:
+    reads = 0
+
+    def __init__(self) -> None:
+        self.m = 3
+
+    @property
+    def computed(self) -> int:
+        PropertyModel.reads += 1
+        return self.m
+
+
+def test_plan_check_skips_other_items():
+    model = PropertyModel()
+    plan = ArtefactPlan.for_model(model)
+    reads = PropertyModel.reads
+    assert ArtefactPlan.for_model(model) is plan
+    assert PropertyModel.reads == reads
+
+
+def test_plan_recompiles_on_artefact_type_change():
+    model = PlanModel()
+    plan = ArtefactPlan.for_model(model)
+    model.m = "three"
+    assert ArtefactPlan.for_model(model) is not plan
+
+
+@artefacts({})
+class LateModel:
+    def __init__(self) -> None:
+        self.model = None
+
+
+def test_attribute_assigned_after_first_trace():
+    model = LateModel()
+    trace_artefacts(model)
+    model.model = nn.Linear(2, 1)
+    model_id = saves(model)
+    new_model = LateModel()
+    new_model.model = nn.Linear(2, 1)
+    loads(new_model, model_id)
+    assert torch.equal(new_model.model.weight, model.model.weight)
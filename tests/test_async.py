@@ -0,0 +1,77 @@
+import asyncio
+import threading
+
+import torch
+import torch.nn as nn
+
+from jackdaw_ml import aloads, asaves, saves, saves_background
+from jackdaw_ml.artefact_decorator import artefacts
+from jackdaw_ml.artefact_plan import ArtefactPlan
+from jackdaw_ml.serializers.pickle import PickleSerializer
+
+
+@artefacts({})
+class Ensemble(nn.Module):
+    def __init__(self):
+        super(Ensemble, self).__init__()
+        self.members = nn.ModuleList([nn.Linear(4, 1) for _ in range(3)])
+
+
+def test_asaves_matches_saves():
+    x = Ensemble()
+    model_id = asyncio.run(asaves(x))
+    assert (
+        model_id.artefact_schema_id.as_string()
+        == saves(x, deduplicate=False).artefact_schema_id.as_string()
+    )
+
+
+def test_aloads():
+    x = Ensemble()
+    model_id = saves(x)
+
+    y = Ensemble()
+    asyncio.run(aloads(y, model_id))
+    for (x_member, y_member) in zip(x.members, y.members):
+        assert torch.equal(x_member.weight, y_member.weight)
+
+
+def test_saves_background_snapshots():
+    x = Ensemble()
+    expected_id = saves(x, deduplicate=False)
+
+    future = saves_background(x)
+    with torch.no_grad():
+        x.members[0].weight += 1
+    assert (
+        future.result().artefact_schema_id.as_string()
+        == expected_id.artefact_schema_id.as_string()
+    )
+
+
+@artefacts({PickleSerializer: ["lookup", "labels"]})
+class LookupModel:
+    def __init__(self):
+        self.lookup = {"a": 1}
+        self.labels = ["a"]
+
+
+def test_aloads_sets_artefacts_on_calling_thread(monkeypatch):
+    x = LookupModel()
+    x.lookup = {"b": 2}
+    x.labels = ["b"]
+    model_id = saves(x)
+
+    y = LookupModel()
+    access_interface = ArtefactPlan.for_model(y).access_interface
+    set_artefact = access_interface.set_artefact
+    threads = []
+
+    def record_thread(model, artefact_name, artefact):
+        threads.append(threading.get_ident())
+        set_artefact(model, artefact_name, artefact)
+
+    monkeypatch.setattr(access_interface, "set_artefact", record_thread)
+    asyncio.run(aloads(y, model_id))
+    assert y.lookup == {"b": 2} and y.labels == ["b"]
+    assert threads == [threading.get_ident()] * 2
@@ -0,0 +1,64 @@
+import numpy as np
+import torch
+import torch.nn as nn
+
+from jackdaw_ml import loads, saves
+from jackdaw_ml.artefact_decorator import artefacts
+from jackdaw_ml.delta import _apply_delta, chain_length, encode_delta, is_delta
+from jackdaw_ml.resource import Resource
+from jackdaw_ml.serializers.tensor import TorchSerializer
+
+
+@artefacts({})
+class DeltaModel(nn.Module):
+    def __init__(self):
+        super(DeltaModel, self).__init__()
+        self.encoder = nn.Linear(64, 64)
+        self.head = nn.Linear(64, 1)
+
+
+def test_delta_roundtrip():
+    parent = np.random.rand(1_000)
+    child = parent.copy()
+    child[:10] += 1
+    delta = encode_delta(Resource(child.tobytes()), Resource(parent.tobytes()), 0)
+    assert delta is not None
+    assert is_delta(delta)
+    assert chain_length(delta) == 1
+    assert len(delta) < child.nbytes
+    assert bytes(_apply_delta(delta, Resource(parent.tobytes()))) == child.tobytes()
+
+
+def test_delta_requires_equal_size():
+    assert encode_delta(Resource(b"\x00" * 8), Resource(b"\x00" * 16), 0) is None
+
+
+def test_delta_chain():
+    model = DeltaModel()
+    model_id = saves(model)
+    for _ in range(4):
+        with torch.no_grad():
+            model.encoder.weight[0] += 1
+        model_id = saves(model, delta_from=model_id, max_delta_chain=2)
+
+        loaded = DeltaModel()
+        loads(loaded, model_id)
+        assert torch.equal(model.encoder.weight, loaded.encoder.weight)
+        assert torch.equal(model.head.weight, loaded.head.weight)
+
+
+def test_deduplicated_saves_streamed(monkeypatch):
+    def to_resource(*_):
+        raise AssertionError("Artefacts without a delta parent are streamed to file")
+
+    monkeypatch.setattr(TorchSerializer, "to_resource", classmethod(to_resource))
+    model = DeltaModel()
+    first_id = saves(model)
+    assert (
+        saves(model).artefact_schema_id.as_string()
+        == first_id.artefact_schema_id.as_string()
+    )
+
+    loaded = DeltaModel()
+    loads(loaded, first_id)
+    assert torch.equal(model.encoder.weight, loaded.encoder.weight)
@@ -0,0 +1,136 @@
+import torch
+import torch.nn as nn
+
+from jackdaw_ml import loads, saves
+from jackdaw_ml.artefact_decorator import artefacts
+from jackdaw_ml.lazy import LazyArtefact
+from jackdaw_ml.serializers.pickle import PickleSerializer
+
+
+@artefacts({})
+class RegionalModel(nn.Module):
+    def __init__(self):
+        super(RegionalModel, self).__init__()
+        self.heads = nn.ModuleDict({"eu": nn.Linear(4, 1), "us": nn.Linear(4, 1)})
+
+    def forward(self, region: str, x: torch.Tensor) -> torch.Tensor:
+        return self.heads[region](x)
+
+
+@artefacts({PickleSerializer: "lookup"})
+class LookupModel:
+    def __init__(self):
+        self.lookup = {"a": 1}
+
+
+def test_lazy_torch_children():
+    x = RegionalModel()
+    model_id = saves(x)
+
+    y = RegionalModel()
+    lazy_load = loads(y, model_id, lazy=True)
+    assert lazy_load.pending == {"heads.eu", "heads.us"}
+    assert type(y.heads["eu"]) is not nn.Linear
+
+    inputs = torch.rand(2, 4)
+    assert torch.equal(x("eu", inputs), y("eu", inputs))
+    assert lazy_load.materialized == {"heads.eu"}
+    assert lazy_load.pending == {"heads.us"}
+    assert type(y.heads["eu"]) is nn.Linear
+
+
+def test_lazy_torch_state_dict():
+    x = RegionalModel()
+    model_id = saves(x)
+
+    y = RegionalModel()
+    lazy_load = loads(y, model_id, lazy=True)
+    state = y.heads["eu"].state_dict()
+    for (name, tensor) in x.heads["eu"].state_dict().items():
+        assert torch.equal(tensor, state[name]), name
+    assert lazy_load.materialized == {"heads.eu"}
+
+
+def test_lazy_torch_parameters():
+    x = RegionalModel()
+    model_id = saves(x)
+
+    y = RegionalModel()
+    lazy_load = loads(y, model_id, lazy=True)
+    for (expected, loaded) in zip(
+        x.heads["us"].parameters(), y.heads["us"].parameters()
+    ):
+        assert torch.equal(expected, loaded)
+    assert lazy_load.materialized == {"heads.us"}
+
+    assert torch.equal(x.heads["eu"].weight, y.heads["eu"].weight)
+    assert lazy_load.pending == set()
+
+
+def test_lazy_torch_reload():
+    x = RegionalModel()
+    model_id = saves(x)
+
+    y = RegionalModel()
+    loads(y, model_id, lazy=True)
+    loads(y, model_id)
+    assert type(y.heads["eu"]) is nn.Linear
+    assert torch.equal(x.heads["eu"].weight, y.heads["eu"].weight)
+
+
+def test_lazy_artefact():
+    x = LookupModel()
+    x.lookup = {"b": 2}
+    model_id = saves(x)
+
+    y = LookupModel()
+    lazy_load = loads(y, model_id, lazy=True)
+    assert isinstance(y.lookup, LazyArtefact)
+    assert lazy_load.pending == {"lookup"}
+
+    assert y.lookup["b"] == 2
+    assert y.lookup == {"b": 2}
+    assert lazy_load.materialized == {"lookup"}
+
+
+@artefacts({PickleSerializer: "scale"})
+class ScaleModel:
+    def __init__(self):
+        self.scale = 1
+
+
+def test_lazy_scalar():
+    x = ScaleModel()
+    x.scale = 400
+    model_id = saves(x)
+
+    y = ScaleModel()
+    lazy_load = loads(y, model_id, lazy=True)
+    assert y.scale == 400
+    assert lazy_load.materialized == {"scale"}
+
+    lazy = LazyArtefact(lambda: 400)
+    assert lazy == 400
+    assert lazy != 401
+    assert lazy < 401
+    assert lazy + 1 == 401
+    assert 1 + lazy == 401
+    assert lazy * 2 == 800
+    assert -lazy == -400
+    assert bool(lazy)
+    assert not LazyArtefact(lambda: 0)
+    assert hash(lazy) == hash(400)
+    assert 2 in LazyArtefact(lambda: [1, 2])
+
+
+def test_saves_materializes_lazy_load():
+    x = RegionalModel()
+    model_id = saves(x)
+
+    y = RegionalModel()
+    lazy_load = loads(y, model_id, lazy=True)
+    assert (
+        saves(y).artefact_schema_id.as_string()
+        == model_id.artefact_schema_id.as_string()
+    )
+    assert lazy_load.pending == set()
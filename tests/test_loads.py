@@ -0,0 +1,34 @@
+import torch
+import torch.nn as nn
+
+from jackdaw_ml import loads, saves
+from jackdaw_ml.artefact_decorator import artefacts
+
+
+@artefacts({})
+class Seq2Seq(nn.Module):
+    def __init__(self):
+        super(Seq2Seq, self).__init__()
+        self.encoder = nn.Sequential(nn.Linear(4, 4), nn.ReLU(), nn.Linear(4, 2))
+        self.decoder = nn.Sequential(nn.Linear(2, 4), nn.ReLU(), nn.Linear(4, 4))
+
+
+def test_partial_loads():
+    x = Seq2Seq()
+    model_id = saves(x)
+
+    y = Seq2Seq()
+    loads(y, model_id, include=["encoder.*"], exclude=["encoder.2.bias"])
+    assert torch.equal(x.encoder[0].weight, y.encoder[0].weight)
+    assert torch.equal(x.encoder[2].weight, y.encoder[2].weight)
+    assert not torch.equal(x.encoder[2].bias, y.encoder[2].bias)
+    assert not torch.equal(x.decoder[0].weight, y.decoder[0].weight)
+
+
+def test_partial_lazy_loads():
+    x = Seq2Seq()
+    model_id = saves(x)
+
+    y = Seq2Seq()
+    lazy_load = loads(y, model_id, lazy=True, exclude=["decoder.*"])
+    assert lazy_load.pending == {"encoder"}
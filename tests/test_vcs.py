@@ -0,0 +1,49 @@
+from git import Actor, Repo
+
+from jackdaw_ml import saves
+from jackdaw_ml.artefact_decorator import artefacts
+from jackdaw_ml.serializers.pickle import PickleSerializer
+from jackdaw_ml.vcs import get_vcs_info, set_check_dirty
+
+AUTHOR = Actor("jackdaw", "jackdaw@example.com")
+
+
+def test_vcs_info_cached_until_head_changes(tmp_path):
+    repo = Repo.init(tmp_path)
+    (tmp_path / "a.txt").write_text("a")
+    repo.index.add(["a.txt"])
+    first_commit = repo.index.commit("first", author=AUTHOR, committer=AUTHOR)
+
+    vcs_info = get_vcs_info(tmp_path / "a.txt")
+    assert vcs_info.sha == str(first_commit)
+    assert get_vcs_info(tmp_path, check_dirty=False) is vcs_info
+
+    (tmp_path / "b.txt").write_text("b")
+    repo.index.add(["b.txt"])
+    second_commit = repo.index.commit("second", author=AUTHOR, committer=AUTHOR)
+    assert get_vcs_info(tmp_path).sha == str(second_commit)
+
+
+@artefacts({PickleSerializer: ["value"]})
+class ValueModel:
+    def __init__(self):
+        self.value = 1
+
+
+def test_check_dirty_setting_respected_by_saves(tmp_path, monkeypatch):
+    repo = Repo.init(tmp_path)
+    (tmp_path / "a.txt").write_text("a")
+    repo.index.add(["a.txt"])
+    commit = repo.index.commit("first", author=AUTHOR, committer=AUTHOR)
+
+    def is_dirty(*_, **__):
+        raise AssertionError("Working tree checked for changes")
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(Repo, "is_dirty", is_dirty)
+    set_check_dirty(False)
+    try:
+        assert saves(ValueModel()).vcs_id is not None
+        assert get_vcs_info().sha == str(commit)
+    finally:
+        set_check_dirty(True)